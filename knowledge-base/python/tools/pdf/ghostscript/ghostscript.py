@@ -99,3 +99,87 @@ def merge_pdfs_with_gs(sources: Iterable[str | Path], dst: str | Path) -> None:
         *src_list,
     ]
     ghostscript.Ghostscript(*args)
+
+
+# Пример 5. Пул долгоживущих интерпретаторов Ghostscript
+"""
+Каждый вызов ghostscript.Ghostscript(*args) заново инициализирует интерпретатор:
+загружает начальные PostScript-ресурсы, шрифты, создаёт устройство. На маленьких
+файлах это основная часть времени. Интерпретатор можно создать один раз и дальше
+подавать ему задания через run_string — устройство и выходной файл меняются
+PostScript-командами selectdevice / setpagedevice, а PDF запускается оператором run.
+
+Ghostscript допускает только ОДИН экземпляр интерпретатора на процесс, поэтому
+пул — это процессы, каждый со своим интерпретатором. После max_jobs заданий
+процесс перезапускается (max_tasks_per_child, Python 3.11+): так не копятся
+утечки памяти и состояние интерпретатора. После ошибки задания интерпретатор
+процесса закрывается (ghostscript.cleanup()) и создаётся заново перед следующим
+заданием. health_check() проверяет каждый процесс пула и, если хоть один
+не ответил, перезапускает пул целиком.
+
+С -dSAFER Ghostscript читает и пишет только разрешённые каталоги: их нужно
+перечислить в allowed_dirs (--permit-file-read / --permit-file-write).
+
+Сам пул — GhostscriptPool в пакете pdftools (../pdftools/gs.py): одна реализация
+на всю базу. Здесь — сравнение с новым интерпретатором на каждый файл.
+Пакет импортируется, когда python/tools/pdf есть в PYTHONPATH.
+"""
+import os
+import time
+
+from pdftools.gs import GhostscriptPool
+
+
+def bench_gs_pool(files: list[str | Path], out_dir: str | Path, workers: int = 4) -> None:
+    """Среднее время на файл: новый интерпретатор на каждый вызов против пула."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    for i, src in enumerate(files):
+        optimize_pdf(src, out_dir / f"fresh-{i}.pdf")
+    fresh = (time.perf_counter() - start) / len(files)
+
+    allowed = {str(Path(f).parent) for f in files} | {str(out_dir)}
+    for n in (1, workers):
+        with GhostscriptPool(sorted(allowed), workers=n) as pool:
+            pool.health_check()  # прогрев: интерпретаторы уже созданы
+            start = time.perf_counter()
+            futures = [pool.submit_optimize(src, out_dir / f"pool{n}-{i}.pdf") for i, src in enumerate(files)]
+            for future in futures:
+                future.result()
+            pooled = (time.perf_counter() - start) / len(files)
+        print(f"пул из {n}: {pooled * 1e3:8.1f} мс/файл")
+    print(f"новый интерпретатор на файл: {fresh * 1e3:8.1f} мс/файл")
+
+# Пример вызова:
+# with GhostscriptPool(allowed_dirs=["in", "out"], workers=4, max_jobs=200) as pool:
+#     futures = [pool.submit_optimize(f"in/{name}", f"out/{name}") for name in os.listdir("in")]
+#     for future in futures:
+#         future.result()
+
+
+# Пример 6. Параллельный рендеринг страниц в PNG
+"""
+pdf_to_png рендерит весь документ одним вызовом Ghostscript — на одном ядре.
+При 300 dpi большой документ рендерится минутами, а остальные ядра простаивают.
+
+Диапазон страниц делится на куски (-dFirstPage / -dLastPage), куски рендерятся
+в отдельных процессах, а готовые страницы отдаются вызывающему коду сразу,
+как только готов их кусок, — не дожидаясь конца всего документа. Кусков больше,
+чем процессов: быстрые куски не ждут медленных, первые страницы приходят раньше.
+
+out_pattern=None рендерит в ppmraw (несжатый RGB) и возвращает RawPage вместо
+PNG-файлов: если картинка дальше идёт в OCR или numpy, кодировать её в PNG
+и сразу же декодировать обратно — лишняя работа.
+
+Реализация — pdf_to_png_parallel в пакете pdftools (../pdftools/gs.py).
+"""
+from pdftools.gs import RawPage, pdf_to_png_parallel, read_ppm
+
+# Пример вызова:
+# for page, path in pdf_to_png_parallel("scan.pdf", "out/page-%04d.png", dpi=300, workers=8):
+#     print("готова страница", page, path)
+#
+# for page, raw in pdf_to_png_parallel("scan.pdf", out_pattern=None, dpi=150):
+#     image = numpy.frombuffer(raw.rgb, numpy.uint8).reshape(raw.height, raw.width, 3)
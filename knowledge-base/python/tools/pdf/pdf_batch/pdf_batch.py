@@ -0,0 +1,616 @@
+# =============================================================================
+# Тема: Пакетная обработка PDF
+# Раздел: python/tools/pdf
+# Документация: pdf_batch.md
+# =============================================================================
+
+# Функции из qpdf.py и ghostscript.py обрабатывают ровно один файл. Здесь — как
+# прогнать такую функцию по каталогу из тысяч PDF: пул процессов, пропуск уже
+# готовых файлов, повторы при сбоях и отчёт по времени каждого задания.
+# Операции берутся из пакета pdftools: python/tools/pdf должен быть в PYTHONPATH
+# (рабочие процессы пула наследуют его вместе с окружением).
+
+import csv
+import glob
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+
+# --- Пример 1: Операции — обычные функции src → dst ---
+# Операции — функции пакета pdftools: та же реализация, что в темах qpdf
+# и ghostscript, с метриками каждого вызова. Движки pdftools загружает при
+# первом вызове: процессу, который только сжимает через qpdf, не нужен
+# ни pikepdf, ни Ghostscript. Свои функции (auto_compress ниже) обёрнуты
+# в тот же @instrumented — события о них такие же.
+
+from pdftools.gs import optimize_pdf, ps2pdf
+from pdftools.gs import pdf_to_png as render_png
+from pdftools.metrics import JsonLinesHook, add_hook, instrumented
+from pdftools.pages import rotate_all
+from pdftools.qpdf_cli import compress_pdf, encrypt_with_qpdf, page_count, run_qpdf
+
+
+def pdf_to_png(src: str, dst: str, dpi: int = 150) -> None:
+    """dst — каталог: в нём появятся page-001.png, page-002.png, …"""
+    os.makedirs(dst, exist_ok=True)
+    render_png(src, os.path.join(dst, "page-%03d.png"), dpi)
+
+
+# Имя операции → функция. Рабочий процесс находит функцию по имени:
+# передавать в пул имя дешевле и надёжнее, чем pickle функции.
+OPERATIONS = {
+    "compress": compress_pdf,
+    "encrypt": encrypt_with_qpdf,
+    "rotate": rotate_all,
+    "ps2pdf": ps2pdf,
+    "optimize": optimize_pdf,
+    "png": pdf_to_png,
+}
+
+
+# --- Пример 2: Задание и его результат ---
+
+@dataclass
+class Job:
+    src: str
+    dst: str
+    operation: str
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass
+class JobResult:
+    src: str
+    dst: str
+    operation: str
+    status: str          # "ok", "skipped", "cached", "failed"
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    cache: str = ""      # "hit", "miss"; пусто — задание шло без кэша
+    cache_bytes: int = 0  # сколько байт задание добавило в кэш
+
+
+def is_up_to_date(src: str, dst: str) -> bool:
+    """Результат уже есть и не старше исходника — как в make."""
+    try:
+        return os.stat(dst).st_mtime >= os.stat(src).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+# --- Пример 3: Список заданий из glob или манифеста ---
+
+def glob_root(pattern: str) -> Path:
+    """Часть шаблона до первого «*», «?» или «[»: "scans/**/*.pdf" → scans."""
+    root = []
+    for part in Path(pattern).parts:
+        if any(char in part for char in "*?["):
+            break
+        root.append(part)
+    return Path(*root)
+
+
+def jobs_from_glob(pattern: str, out_dir: str | Path, operation: str, **kwargs) -> list[Job]:
+    """
+    "scans/**/*.pdf" → задания с тем же относительным путём в out_dir:
+    scans/2024/a.pdf → out_dir/2024/a.pdf. Одноимённые файлы из разных
+    подкаталогов не перезаписывают друг друга.
+    """
+    out_dir = Path(out_dir)
+    root = glob_root(pattern)
+    sources = sorted(glob.glob(pattern, recursive=True))
+    return [Job(src, str(out_dir / Path(src).relative_to(root)), operation, kwargs) for src in sources]
+
+
+def parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "yes", "y"):
+        return True
+    if lowered in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+# Тип параметра (аннотация или тип значения по умолчанию) → разбор строки из CSV.
+# Аннотации модулей с from __future__ import annotations — строки, поэтому и имена.
+CSV_CONVERTERS = {int: int, float: float, bool: parse_bool, "int": int, "float": float, "bool": parse_bool}
+
+
+def convert_kwargs(operation: str, values: dict[str, str]) -> dict:
+    """
+    Значения из CSV — строки. Приводим их к типам параметров операции:
+    angle="90" → 90 для rotate. Неизвестная колонка — ValueError, пустая
+    ячейка — параметр не передаётся (остаётся значение по умолчанию).
+    """
+    parameters = inspect.signature(OPERATIONS[operation]).parameters
+    kwargs = {}
+    for name, value in values.items():
+        parameter = parameters.get(name)
+        if parameter is None or name in ("src", "dst"):
+            raise ValueError(f"operation {operation!r} has no parameter {name!r}")
+        if value is None or value == "":
+            continue
+        kind = parameter.annotation
+        if kind is parameter.empty:
+            kind = type(parameter.default)
+        convert = CSV_CONVERTERS.get(kind)
+        try:
+            kwargs[name] = convert(value) if convert else value
+        except ValueError as e:
+            raise ValueError(f"{operation}: bad value for {name!r}: {e}") from None
+    return kwargs
+
+
+def jobs_from_manifest(manifest: str | Path, operation: str, **kwargs) -> list[Job]:
+    """
+    CSV с колонками src,dst. Дополнительные колонки передаются операции
+    как именованные аргументы (например, password для encrypt) и приводятся
+    к типам её параметров. Ошибка в строке — ValueError с номером строки.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"unknown operation {operation!r}, expected one of {sorted(OPERATIONS)}")
+    jobs = []
+    with open(manifest, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            src, dst = row.pop("src"), row.pop("dst")
+            try:
+                jobs.append(Job(src, dst, operation, {**kwargs, **convert_kwargs(operation, row)}))
+            except ValueError as e:
+                raise ValueError(f"{manifest}:{reader.line_num}: {e}") from None
+    return jobs
+
+
+# --- Пример 4: Кэш результатов по содержимому входного файла ---
+# is_up_to_date смотрит только на mtime рядом лежащего dst. Кэш помнит результат
+# по содержимому: тот же PDF, пришедший под другим именем или в другой каталог,
+# не обрабатывается заново. Ключ — sha256 от (хэш входа, операция, аргументы).
+
+CACHE_VERSION = 1
+FICLONE = 0x40049409  # ioctl reflink в Linux: btrfs, xfs, …
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remove_path(path: str | Path) -> None:
+    """Удалить файл или каталог, если он есть."""
+    path = Path(path)
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def clone_file(src: str | Path, dst: str | Path) -> str:
+    """
+    Дешёвая копия: reflink (копия при записи), затем жёсткая ссылка, затем обычное
+    копирование. Возвращает, какой способ сработал.
+    """
+    try:
+        import fcntl  # только POSIX; на Windows сразу пробуем жёсткую ссылку
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflink"
+        except OSError:
+            Path(dst).unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copyfile(src, dst)
+        return "copy"
+
+
+def clone_tree(src: Path, dst: Path) -> None:
+    """Результат операции — файл или каталог (как у png)."""
+    if src.is_dir():
+        dst.mkdir(parents=True, exist_ok=True)
+        for child in src.iterdir():
+            clone_tree(child, dst / child.name)
+    else:
+        clone_file(src, dst)
+
+
+def tree_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(tree_size(child) for child in path.iterdir())
+    return path.stat().st_size
+
+
+class OutputCache:
+    """
+    Каталог root/<2 символа ключа>/<ключ> с результатами операций.
+    Вытеснение LRU: mtime записи обновляется при каждом попадании, при переполнении
+    max_bytes удаляются записи с самым старым mtime.
+
+    Объект можно передавать в пул процессов, но у каждого задания своя копия.
+    Поэтому рабочие процессы только читают (fetch) и добавляют (insert) записи,
+    а счётчики, занятое место и вытеснение ведёт процесс-владелец: run_batch
+    передаёт ему итог каждого задания через record().
+    """
+
+    def __init__(self, root: str | Path = ".pdf_cache", max_bytes: int = 5 * 2**30) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None  # оценка занятого места; None — ещё не считали
+
+    def key(self, src: str | Path, operation: str, kwargs: dict) -> str:
+        """
+        Аргументы нормализуются: подставляются значения по умолчанию и всё
+        приводится к строке, поэтому optimize(src) и optimize(src, settings="/ebook"),
+        dpi=150 и dpi="150" из CSV-манифеста дают один ключ.
+        """
+        bound = inspect.signature(OPERATIONS[operation]).bind("src", "dst", **kwargs)
+        bound.apply_defaults()
+        args = {name: str(value) for name, value in bound.arguments.items() if name not in ("src", "dst")}
+        payload = json.dumps([CACHE_VERSION, operation, file_sha256(src), args], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def fetch(self, key: str, dst: str | Path) -> bool:
+        """Попадание — результат кладётся в dst и возвращается True."""
+        entry = self._entry(key)
+        if not entry.exists():
+            self.misses += 1
+            return False
+        remove_path(dst)
+        clone_tree(entry, Path(dst))
+        os.utime(entry)
+        self.hits += 1
+        return True
+
+    def insert(self, key: str, produced: str | Path) -> int:
+        """
+        Положить готовый результат в кэш (produced остаётся на месте), не трогая
+        счётчиков. Возвращает, сколько байт добавлено (0 — запись уже была).
+        """
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{key}.{os.getpid()}.tmp")
+        remove_path(tmp)
+        clone_tree(Path(produced), tmp)
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Другой процесс уже положил этот каталог — результат тот же.
+            remove_path(tmp)
+            return 0
+        return tree_size(entry)
+
+    def store(self, key: str, produced: str | Path) -> None:
+        """insert и учёт места — для кэша, которым пользуется один процесс."""
+        self.account(self.insert(key, produced))
+
+    def account(self, added: int) -> None:
+        """Учесть добавленные байты; при переполнении вытеснить старые записи."""
+        if self._size is None:
+            # Один обход каталога на время жизни объекта; added уже на диске и в сумме.
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += added
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def record(self, result: JobResult) -> None:
+        """Учесть итог задания, выполненного в другом процессе."""
+        if result.cache == "hit":
+            self.hits += 1
+        elif result.cache == "miss":
+            self.misses += 1
+        if result.cache_bytes:
+            self.account(result.cache_bytes)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for entry in self.root.glob("*/*"):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, tree_size(entry), entry))
+            except FileNotFoundError:
+                pass  # запись удалил другой процесс
+        return entries
+
+    def evict(self) -> int:
+        """Удалять самые давно использованные записи, пока кэш больше max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            remove_path(entry)
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# Жёсткая ссылка делит с кэшем один inode: правка результата «на месте»
+# испортит и запись в кэше. reflink и копия этим не страдают.
+
+# Пример вызова:
+# cache = OutputCache("/var/cache/pdf", max_bytes=20 * 2**30)
+# key = cache.key("scan.pdf", "optimize", {"settings": "/ebook"})
+# if not cache.fetch(key, "out/scan.pdf"):
+#     optimize_pdf("scan.pdf", "out/scan.pdf", settings="/ebook")
+#     cache.store(key, "out/scan.pdf")
+# print(cache.stats())
+
+
+# --- Пример 5: Пул процессов с повторами и отчётом ---
+
+def run_job(
+    job: Job,
+    retries: int = 2,
+    backoff: float = 0.5,
+    cache: OutputCache | None = None,
+) -> JobResult:
+    """Выполняется в рабочем процессе. Исключения не выпускает — всё попадает в отчёт."""
+    func = OPERATIONS[job.operation]
+    Path(job.dst).parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    tmp = f"{job.dst}.part"
+    error = ""
+    # Итог для кэша возвращается в отчёте: копия cache в этом процессе исчезнет вместе с заданием.
+    lookup = ""
+    for attempt in range(1, retries + 2):
+        try:
+            key = cache.key(job.src, job.operation, job.kwargs) if cache else None
+            if cache and cache.fetch(key, job.dst):
+                return JobResult(job.src, job.dst, job.operation, "cached", attempt, time.perf_counter() - start,
+                                 cache="hit")
+            lookup = "miss" if cache else ""
+            # Пишем во временный файл: прерванная операция не оставит «готовый» битый dst,
+            # который is_up_to_date потом примет за результат.
+            remove_path(tmp)
+            func(job.src, tmp, **job.kwargs)
+            added = cache.insert(key, tmp) if cache else 0
+            remove_path(job.dst)
+            os.replace(tmp, job.dst)
+            return JobResult(job.src, job.dst, job.operation, "ok", attempt, time.perf_counter() - start,
+                             cache=lookup, cache_bytes=added)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt <= retries:
+                time.sleep(backoff * 2 ** (attempt - 1))
+    remove_path(tmp)
+    return JobResult(job.src, job.dst, job.operation, "failed", retries + 1, time.perf_counter() - start, error,
+                     cache=lookup)
+
+
+def log_events(path: str | Path) -> None:
+    """Инициализатор рабочего процесса: хуки pdftools живут в процессе, где их добавили."""
+    add_hook(JsonLinesHook(path))
+
+
+def run_batch(
+    jobs: list[Job],
+    workers: int | None = None,
+    retries: int = 2,
+    force: bool = False,
+    report: str | Path | None = "batch_report.jsonl",
+    cache: OutputCache | None = None,
+    events: str | Path | None = None,
+) -> list[JobResult]:
+    """
+    Выполнить задания на пуле из workers процессов.
+    Готовые результаты (dst новее src) пропускаются, если не force.
+    cache — результаты берутся из OutputCache, если такой вход уже обрабатывался.
+    report — JSON Lines: одна строка на задание со статусом, числом попыток и временем.
+    events — JSON Lines событий pdftools.metrics из всех рабочих процессов: время,
+    CPU, память и байты каждой операции, включая вложенные (auto_compress → run_qpdf).
+    """
+    results: list[JobResult] = []
+    pending = []
+    for job in jobs:
+        if job.operation not in OPERATIONS:
+            raise ValueError(f"unknown operation {job.operation!r}, expected one of {sorted(OPERATIONS)}")
+        if not force and is_up_to_date(job.src, job.dst):
+            results.append(JobResult(job.src, job.dst, job.operation, "skipped"))
+        else:
+            pending.append(job)
+
+    start = time.perf_counter()
+    # Строка события пишется одним write в режиме "a": процессы пула не перемешают строки.
+    init = {"initializer": log_events, "initargs": (events,)} if events else {}
+    with ProcessPoolExecutor(max_workers=workers, **init) as pool:
+        futures = [pool.submit(run_job, job, retries, cache=cache) for job in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            if cache:
+                cache.record(result)
+            if result.status == "failed":
+                print(f"[!] {result.src}: {result.error}")
+            if done % 100 == 0:
+                print(f"... {done}/{len(pending)}")
+
+    if report:
+        with open(report, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+
+    counts = {status: sum(r.status == status for r in results) for status in ("ok", "skipped", "cached", "failed")}
+    print(f"[OK] {counts['ok']} готово, {counts['skipped']} пропущено, {counts['cached']} из кэша, "
+          f"{counts['failed']} с ошибкой за {time.perf_counter() - start:.1f} с")
+    if cache:
+        stats = cache.stats()
+        print(f"    кэш: {stats['hits']} попаданий, {stats['misses']} промахов ({stats['hit_rate']:.0%})")
+    return results
+
+
+# Пример вызова (под Windows и macOS — только внутри if __name__ == "__main__":,
+# потому что рабочие процессы заново импортируют этот модуль):
+# if __name__ == "__main__":
+#     jobs = jobs_from_glob("incoming/**/*.pdf", "compressed", "compress")
+#     run_batch(jobs, workers=8, retries=2, report="compress_report.jsonl")
+#
+#     jobs = jobs_from_manifest("to_encrypt.csv", "encrypt")   # колонки: src,dst,password
+#     jobs = jobs_from_manifest("to_rotate.csv", "rotate")     # колонки: src,dst,angle → int
+#     run_batch(jobs, workers=4)
+#
+#     cache = OutputCache(".pdf_cache", max_bytes=10 * 2**30)
+#     jobs = jobs_from_glob("incoming/**/*.pdf", "previews", "png", dpi=100)
+#     run_batch(jobs, workers=8, cache=cache)   # previews/<подкаталог>/<имя>.pdf/page-001.png, …
+#
+#     # События каждой операции — в один файл; медленные: jq 'select(.wall_s > 10)'
+#     run_batch(jobs, workers=8, events="pdf_events.jsonl")
+
+
+# --- Пример 6: Автовыбор профиля сжатия по пробе страниц ---
+# compress_pdf (qpdf, без потерь) и optimize_pdf (Ghostscript, /printer, /ebook…)
+# дают очень разный результат на разных файлах: скан ужимается /ebook в разы,
+# а текстовый отчёт Ghostscript иногда даже увеличивает — и тратит на это
+# в десятки раз больше времени. Вместо одного профиля на всё:
+#   1) вырезаем несколько страниц, равномерно по документу (qpdf --pages);
+#   2) прогоняем пробу через каждый профиль, меряем размер и время;
+#   3) экстраполируем на весь файл и выбираем минимум «байты + цена времени»;
+#   4) применяем выбранный профиль к полному файлу и пишем строку в лог.
+
+PROFILES = {
+    "qpdf": (compress_pdf, {}),
+    "gs-printer": (optimize_pdf, {"settings": "/printer"}),
+    "gs-ebook": (optimize_pdf, {"settings": "/ebook"}),
+    "gs-screen": (optimize_pdf, {"settings": "/screen"}),  # 72 dpi — только для превью
+}
+DEFAULT_PROFILES = "qpdf,gs-printer,gs-ebook"
+
+
+@dataclass
+class ProfileTrial:
+    profile: str
+    est_bytes: int        # ожидаемый размер всего файла
+    est_seconds: float    # ожидаемое время на весь файл
+    score: float
+
+
+@instrumented(inputs="src", output="dst")
+def sample_pdf(src: str, dst: str, pages: int, count: int) -> int:
+    """count страниц, равномерно по документу, в отдельный PDF. Возвращает число страниц пробы."""
+    numbers = sorted({1 + i * (pages - 1) // max(count - 1, 1) for i in range(count)})
+    run_qpdf(["--empty", "--pages", src, ",".join(map(str, numbers)), "--", dst])
+    return len(numbers)
+
+
+@instrumented(inputs="src")
+def choose_profile(
+    src: str,
+    profiles: str = DEFAULT_PROFILES,
+    sample_size: int = 3,
+    cpu_second_bytes: int = 2**20,
+    workdir: str | None = None,
+) -> tuple[str, list[ProfileTrial]]:
+    """
+    Выбрать профиль для src. cpu_second_bytes — во сколько байт оценивается
+    секунда работы: 1 МиБ значит «профиль на 10 с медленнее должен сэкономить
+    больше 10 МиБ». Профиль "none" (оставить как есть) участвует всегда.
+    """
+    original = os.path.getsize(src)
+    pages = page_count(src)
+    trials = [ProfileTrial("none", original, 0.0, float(original))]
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        # Короткий документ пробовать по кускам незачем — пробой будет он сам.
+        if pages > sample_size * 2:
+            sample = os.path.join(tmp, "sample.pdf")
+            sampled = sample_pdf(src, sample, pages, sample_size)
+        else:
+            sample, sampled = src, pages
+        sample_bytes = os.path.getsize(sample)
+
+        for name in profiles.split(","):
+            func, kwargs = PROFILES[name]
+            out = os.path.join(tmp, f"{name}.pdf")
+            start = time.perf_counter()
+            try:
+                func(sample, out, **kwargs)
+            except Exception as e:
+                print(f"[!] {src}: профиль {name} не сработал на пробе: {type(e).__name__}: {e}")
+                continue
+            seconds = time.perf_counter() - start
+            # Шрифты и общие ресурсы в пробе копируются целиком, поэтому оценка
+            # для маленькой пробы пессимистична: это ориентир, а не прогноз.
+            est_bytes = round(os.path.getsize(out) / sample_bytes * original)
+            est_seconds = seconds * pages / sampled
+            trials.append(ProfileTrial(name, est_bytes, est_seconds, est_bytes + cpu_second_bytes * est_seconds))
+
+    best = min(trials, key=lambda t: t.score)
+    return best.profile, trials
+
+
+@instrumented(inputs="src", output="dst")
+def auto_compress(
+    src: str,
+    dst: str,
+    profiles: str = DEFAULT_PROFILES,
+    sample_size: int = 3,
+    cpu_second_bytes: int = 2**20,
+    log: str | None = "compress_profiles.jsonl",
+) -> None:
+    """Сжать src выбранным по пробе профилем. Если результат вышел больше исходника — копия исходника."""
+    start = time.perf_counter()
+    profile, trials = choose_profile(src, profiles, sample_size, cpu_second_bytes)
+    probe_seconds = time.perf_counter() - start
+
+    if profile != "none":
+        func, kwargs = PROFILES[profile]
+        func(src, dst, **kwargs)
+    if profile == "none" or os.path.getsize(dst) >= os.path.getsize(src):
+        profile = "none"
+        shutil.copyfile(src, dst)
+
+    record = {
+        "src": src,
+        "profile": profile,
+        "original_bytes": os.path.getsize(src),
+        "output_bytes": os.path.getsize(dst),
+        "saved_bytes": os.path.getsize(src) - os.path.getsize(dst),
+        "probe_seconds": round(probe_seconds, 3),
+        "seconds": round(time.perf_counter() - start, 3),
+        "trials": [asdict(t) for t in trials],
+    }
+    print(f"{src}: {profile}, сэкономлено {record['saved_bytes']} байт за {record['seconds']} с")
+    if log:
+        # Одна строка за один write в режиме "a": процессы пула не перемешают строки.
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+OPERATIONS["auto"] = auto_compress
+
+# Пример вызова:
+# profile, trials = choose_profile("report.pdf")
+# for t in trials:
+#     print(f"{t.profile:<12} ~{t.est_bytes:>12} байт  ~{t.est_seconds:6.1f} с")
+#
+# if __name__ == "__main__":
+#     jobs = jobs_from_glob("incoming/**/*.pdf", "compressed", "auto", profiles="qpdf,gs-ebook")
+#     run_batch(jobs, workers=8, cache=OutputCache())
@@ -0,0 +1,60 @@
+"""
+Функции из тем qpdf и ghostscript, собранные в пакет без побочных эффектов.
+
+`import pdftools` не импортирует ни pikepdf, ни Ghostscript и не запускает qpdf:
+модуль с функцией загружается при первом обращении к ней (PEP 562,
+__getattr__ модуля), а движок — при первом вызове функции. Если движка нет,
+вызов бросает BackendUnavailable с подсказкой, как его установить.
+
+    import pdftools
+
+    pdftools.merge_pdfs(["a.pdf", "b.pdf"], "ab.pdf")    # pikepdf
+    pdftools.compress_pdf("big.pdf", "small.pdf")        # CLI qpdf
+    pdftools.optimize_pdf("scan.pdf", "web.pdf")         # Ghostscript
+
+Каждый вызов функции пакета измеряется (время, CPU, память, байты, страницы),
+см. pdftools.metrics:
+
+    pdftools.add_hook(pdftools.JsonLinesHook("pdf_events.jsonl"))
+    pdftools.metrics.stats("compress_pdf")               # {"count": ..., "p99_s": ...}
+"""
+
+import importlib
+
+# Имя → подмодуль, в котором оно определено.
+_EXPORTS = {
+    "pages": (
+        "copy_pdf", "merge_pdfs", "split_pdf", "rotate_all", "reorder_pages", "encrypt_pdf",
+        "remove_password", "parse_page_spec", "page_chunks", "split_by_specs",
+        "split_by_specs_parallel", "merge_tree", "PdfPipeline",
+    ),
+    "qpdf_cli": (
+        "QpdfError", "run_qpdf", "page_count", "extract_pages", "merge_with_qpdf",
+        "encrypt_with_qpdf", "decrypt_with_qpdf", "compress_pdf",
+    ),
+    "qpdf_async": ("run_qpdf_async", "run_qpdf_many"),
+    "gs": (
+        "ps2pdf", "optimize_pdf", "pdf_to_png", "merge_pdfs_with_gs", "pdf_to_png_parallel",
+        "RawPage", "GhostscriptPool",
+    ),
+    "metrics": ("add_hook", "remove_hook", "JsonLinesHook", "PrometheusFileHook"),
+    "_backends": ("BackendUnavailable", "available_backends"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS and not name.startswith("_"):
+        return importlib.import_module(f".{name}", __name__)  # pdftools.metrics и т.п.
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # следующее обращение не дойдёт до __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,58 @@
+"""Загрузка движков по первому требованию и понятная ошибка, если движка нет."""
+
+import importlib
+
+# Движок → (модуль Python или имя программы, как установить).
+BACKENDS = {
+    "pikepdf": ("pikepdf", "pip install pikepdf"),
+    "ghostscript": ("ghostscript", "pip install ghostscript (и сам Ghostscript в системе)"),
+    "qpdf": ("qpdf", "apt install qpdf / brew install qpdf / choco install qpdf"),
+}
+CLI_BACKENDS = {"qpdf"}
+
+
+class BackendUnavailable(ImportError):
+    def __init__(self, backend: str) -> None:
+        hint = BACKENDS[backend][1]
+        where = "not found in PATH" if backend in CLI_BACKENDS else "is not installed"
+        super().__init__(f"{backend} {where}: {hint}")
+        self.backend = backend
+
+
+def require(backend: str):
+    """Импортировать модуль движка (или найти программу) при первом вызове функции."""
+    name = BACKENDS[backend][0]
+    if backend in CLI_BACKENDS:
+        import shutil
+
+        path = shutil.which(name)
+        if path is None:
+            raise BackendUnavailable(backend)
+        return path
+    try:
+        module = importlib.import_module(name)
+    except ImportError as e:
+        raise BackendUnavailable(backend) from e
+    if getattr(module, "__file__", None) is None:
+        raise BackendUnavailable(backend)
+    return module
+
+
+def _module_installed(name: str) -> bool:
+    # Каталог темы python/tools/pdf/ghostscript без __init__.py тоже находится как
+    # пакет (namespace package), если python/tools/pdf лежит в sys.path. Настоящий
+    # модуль всегда имеет origin — файл, из которого он загружается.
+    import importlib.util
+
+    spec = importlib.util.find_spec(name)
+    return spec is not None and spec.origin is not None
+
+
+def available_backends() -> dict[str, bool]:
+    """Какие движки есть в системе. Ничего не импортирует."""
+    import shutil
+
+    return {
+        backend: shutil.which(name) is not None if backend in CLI_BACKENDS else _module_installed(name)
+        for backend, (name, _) in BACKENDS.items()
+    }
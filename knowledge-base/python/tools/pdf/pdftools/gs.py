@@ -0,0 +1,348 @@
+"""Ghostscript: PS → PDF, «перепечатка» PDF, рендеринг в PNG, пул интерпретаторов."""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import namedtuple
+
+from ._backends import require
+from .metrics import Measurement, instrumented, note
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Iterable, Iterator
+
+GS_BASE_ARGS = ("-dNOPAUSE", "-dBATCH", "-dSAFER")
+
+
+def _run_gs(name: str, *args: str) -> None:
+    ghostscript = require("ghostscript")
+    ghostscript.Ghostscript(name, *GS_BASE_ARGS, *args)
+
+
+@instrumented(inputs="src", output="dst")
+def ps2pdf(src: str | Path, dst: str | Path) -> None:
+    _run_gs("ps2pdf", "-sDEVICE=pdfwrite", f"-sOutputFile={dst}", str(src))
+
+
+@instrumented(inputs="src", output="dst")
+def optimize_pdf(src: str | Path, dst: str | Path, settings: str = "/ebook") -> None:
+    """settings — предустановка -dPDFSETTINGS: /screen, /ebook, /printer, /prepress."""
+    _run_gs(
+        "pdfopt", "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.4",
+        f"-dPDFSETTINGS={settings}", f"-sOutputFile={dst}", str(src),
+    )
+
+
+@instrumented(inputs="src", output="out_pattern")
+def pdf_to_png(src: str | Path, out_pattern: str | Path = "page-%03d.png", dpi: int = 300) -> None:
+    _run_gs("pdf2png", f"-r{dpi}", "-sDEVICE=png16m", f"-sOutputFile={out_pattern}", str(src))
+
+
+@instrumented(inputs="sources", output="dst")
+def merge_pdfs_with_gs(sources: Iterable[str | Path], dst: str | Path) -> None:
+    src_list = [os.fspath(s) for s in sources]
+    if not src_list:
+        raise ValueError("no sources")
+    _run_gs("mergepdf", "-sDEVICE=pdfwrite", f"-sOutputFile={dst}", *src_list)
+
+
+# --- Параллельный рендеринг страниц ---
+
+# rgb — width * height * 3 байт, строки сверху вниз.
+RawPage = namedtuple("RawPage", "width height rgb")
+
+
+def read_ppm(data: bytes) -> RawPage:
+    """Разобрать PPM (P6): заголовок «P6 ширина высота 255», затем RGB. Строки # — комментарии."""
+    fields: list[bytes] = []
+    pos = 0
+    while len(fields) < 4:
+        end = data.index(b"\n", pos)
+        line = data[pos:end]
+        pos = end + 1
+        if not line.startswith(b"#"):
+            fields += line.split()
+    magic, width, height, _maxval = fields
+    if magic != b"P6":
+        raise ValueError(f"unexpected PPM magic {magic!r}")
+    return RawPage(int(width), int(height), data[pos:])
+
+
+def _page_count(src: str | Path) -> int:
+    """Через pikepdf, а если его нет — через CLI qpdf."""
+    from ._backends import BackendUnavailable
+
+    try:
+        pikepdf = require("pikepdf")
+    except BackendUnavailable:
+        from .qpdf_cli import page_count
+
+        return page_count(src)
+    with pikepdf.Pdf.open(src) as pdf:
+        return len(pdf.pages)
+
+
+def _render_chunk(src: str, first: int, last: int, dpi: int, out_pattern: str | None) -> list[tuple[int, object]]:
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        device, ext = ("png16m", "png") if out_pattern else ("ppmraw", "ppm")
+        _run_gs(
+            "pdf2png", f"-r{dpi}", f"-sDEVICE={device}", f"-dFirstPage={first}", f"-dLastPage={last}",
+            f"-sOutputFile={os.path.join(tmp, f'p-%05d.{ext}')}", src,
+        )
+        # Ghostscript нумерует файлы с 1 в каждом вызове — переводим в номера страниц документа.
+        results = []
+        for i, page in enumerate(range(first, last + 1), start=1):
+            chunk_file = os.path.join(tmp, f"p-{i:05d}.{ext}")
+            if out_pattern:
+                dst = out_pattern % page
+                shutil.move(chunk_file, dst)
+                results.append((page, dst))
+            else:
+                with open(chunk_file, "rb") as f:
+                    results.append((page, read_ppm(f.read())))
+        return results
+
+
+def pdf_to_png_parallel(
+    src: str | Path,
+    out_pattern: str | Path | None = "page-%03d.png",
+    dpi: int = 300,
+    workers: int | None = None,
+    pages_per_task: int | None = None,
+) -> Iterator[tuple[int, str | RawPage]]:
+    """
+    Рендерить страницы в нескольких процессах. Отдаёт (номер страницы, путь к PNG)
+    по мере готовности — НЕ по порядку страниц.
+    out_pattern=None — вместо файлов отдаются RawPage с несжатым RGB.
+    Если перестать читать результат раньше (break, close()), ещё не начатые
+    куски отменяются: дожидаемся только тех, что уже рендерятся.
+    """
+    pattern = None if out_pattern is None else str(out_pattern)
+    if pattern is not None:
+        # Проверяем сразу при вызове, а не в рабочем процессе после рендеринга куска.
+        try:
+            pattern % 1
+        except (TypeError, ValueError):
+            raise ValueError(f"out_pattern must contain one %d field for the page number, got {pattern!r}") from None
+    return _render_pages(src, pattern, dpi, workers, pages_per_task)
+
+
+@instrumented(inputs="src", children=True, operation="pdf_to_png_parallel")
+def _render_pages(
+    src: str | Path,
+    pattern: str | None,
+    dpi: int,
+    workers: int | None,
+    pages_per_task: int | None,
+) -> Iterator[tuple[int, str | RawPage]]:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = workers or os.cpu_count() or 1
+    page_count = _page_count(src)
+    note(pages=page_count)
+    # Кусков больше, чем процессов: быстрые куски не ждут медленных, первые страницы приходят раньше.
+    pages_per_task = pages_per_task or max(1, math.ceil(page_count / (workers * 4)))
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            pool.submit(_render_chunk, str(src), first, min(first + pages_per_task - 1, page_count), dpi, pattern)
+            for first in range(1, page_count + 1, pages_per_task)
+        ]
+        for future in as_completed(futures):
+            for page, result in future.result():
+                note(output_bytes=os.path.getsize(result) if pattern else len(result.rgb))
+                yield page, result
+    finally:
+        # with ProcessPoolExecutor() дождался бы всех кусков, даже если результат больше не нужен.
+        pool.shutdown(cancel_futures=True)
+
+
+# --- Пул долгоживущих интерпретаторов ---
+# Ghostscript допускает один интерпретатор на процесс, поэтому пул — это процессы.
+
+_gs = None          # интерпретатор рабочего процесса; None — создаётся перед заданием
+_gs_init_args: list[str] = []
+_gs_jobs = 0
+_health_barrier = None  # общий для процессов пула, см. GhostscriptPool.health_check
+
+
+def _ps_string(value: str | Path) -> str:
+    """Строка Python → литерал строки PostScript: (...) с экранированием \\ ( )."""
+    text = str(value).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({text})"
+
+
+def _gs_start() -> None:
+    global _gs
+    _gs = require("ghostscript").Ghostscript(*_gs_init_args)
+
+
+def _gs_stop() -> None:
+    """
+    Закрыть интерпретатор процесса. cleanup() вызывает exit() и освобождает
+    экземпляр библиотеки: без этого второй экземпляр в том же процессе не создать.
+    """
+    global _gs
+    try:
+        require("ghostscript").cleanup()
+    finally:
+        _gs = None
+
+
+def _gs_worker_init(init_args: list[str], barrier) -> None:
+    global _gs_init_args, _health_barrier
+    _gs_init_args = init_args
+    _health_barrier = barrier
+    _gs_start()
+
+
+def _gs_run(code: str) -> tuple[int, int]:
+    """Выполнить задание в интерпретаторе процесса. Возвращает (pid, номер задания)."""
+    global _gs_jobs
+    if _gs is None:
+        _gs_start()
+    try:
+        _gs.run_string(code.encode())
+    except require("ghostscript").GhostscriptError:
+        # После ошибки состояние интерпретатора не гарантировано: закрываем его,
+        # новый создаётся перед следующим заданием этого процесса.
+        _gs_stop()
+        raise
+    _gs_jobs += 1
+    return os.getpid(), _gs_jobs
+
+
+def _gs_probe(timeout: float) -> int:
+    """Проверка для health_check. Барьер не даёт одному процессу взять две проверки."""
+    pid, _ = _gs_run("1 1 add pop")
+    _health_barrier.wait(timeout)
+    return pid
+
+
+def _pdfwrite_job(src: str | Path, dst: str | Path, settings: str | None = None) -> str:
+    code = f"(pdfwrite) selectdevice << /OutputFile {_ps_string(dst)} >> setpagedevice "
+    if settings:
+        code += f".distillersettings /{settings.lstrip('/')} get setdistillerparams "
+    code += "<< /CompatibilityLevel 1.4 >> setdistillerparams "
+    # nullpage закрывает pdfwrite — только в этот момент PDF дописывается на диск.
+    return code + f"{_ps_string(src)} run (nullpage) selectdevice"
+
+
+def _png_job(src: str | Path, out_pattern: str | Path, dpi: int) -> str:
+    return (
+        f"(png16m) selectdevice << /OutputFile {_ps_string(out_pattern)} "
+        f"/HWResolution [{dpi} {dpi}] >> setpagedevice "
+        f"{_ps_string(src)} run (nullpage) selectdevice"
+    )
+
+
+def _finish(measurement: Measurement, future) -> None:
+    if future.cancelled():
+        from concurrent.futures import CancelledError
+
+        measurement.finish(CancelledError())
+    else:
+        measurement.finish(future.exception())
+
+
+class GhostscriptPool:
+    """
+    Процессы с долгоживущими интерпретаторами: задание — строка PostScript для
+    run_string, устройство и выходной файл задаются selectdevice / setpagedevice.
+    После max_jobs заданий процесс перезапускается (max_tasks_per_child, Python 3.11+).
+    С -dSAFER доступны только каталоги из allowed_dirs.
+    """
+
+    def __init__(self, allowed_dirs: list[str | Path], workers: int = 4, max_jobs: int = 500) -> None:
+        init_args = ["gspool", *GS_BASE_ARGS, "-sDEVICE=nullpage"]
+        for d in allowed_dirs:
+            d = os.path.join(os.path.abspath(d), "")
+            init_args += [f"--permit-file-read={d}", f"--permit-file-write={d}"]
+        self._init_args = init_args
+        self._workers = workers
+        self._max_jobs = max_jobs
+        self.restarts = 0
+        self._pool = self._start()
+
+    def _start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # max_tasks_per_child требует spawn; барьер должен быть из того же контекста.
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=context,
+            initializer=_gs_worker_init,
+            initargs=(self._init_args, context.Barrier(self._workers)),
+            max_tasks_per_child=self._max_jobs,
+        )
+
+    def __enter__(self) -> "GhostscriptPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def _submit(self, operation: str, code: str, src: str | Path, dst: str | Path):
+        # Задание выполняется в процессе пула: измеряем время от отправки до результата.
+        measurement = Measurement(f"GhostscriptPool.{operation}", src, dst, thread_cpu=False).start()
+        future = self._pool.submit(_gs_run, code)
+        future.add_done_callback(lambda f: _finish(measurement, f))
+        return future
+
+    def submit_ps2pdf(self, src: str | Path, dst: str | Path):
+        return self._submit("ps2pdf", _pdfwrite_job(os.path.abspath(src), os.path.abspath(dst)), src, dst)
+
+    def submit_optimize(self, src: str | Path, dst: str | Path, settings: str = "/ebook"):
+        code = _pdfwrite_job(os.path.abspath(src), os.path.abspath(dst), settings)
+        return self._submit("optimize", code, src, dst)
+
+    def submit_png(self, src: str | Path, out_pattern: str | Path = "page-%03d.png", dpi: int = 300):
+        code = _png_job(os.path.abspath(src), os.path.abspath(out_pattern), dpi)
+        return self._submit("png", code, src, out_pattern)
+
+    def health_check(self, timeout: float = 10.0) -> bool:
+        """
+        Проверить КАЖДЫЙ процесс пула: workers пустых заданий, каждое после
+        своего run_string ждёт на барьере остальные, поэтому все они попадают
+        в разные процессы. Если хоть одна проверка не прошла за timeout (процесс
+        умер, завис или интерпретатор сломан), пул перезапускается.
+        Возвращает True, если пул был здоров. Проверка занимает все процессы:
+        вызывайте её между пачками заданий.
+        """
+        from concurrent.futures import wait
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            futures = [self._pool.submit(_gs_probe, timeout) for _ in range(self._workers)]
+        except BrokenProcessPool:
+            healthy = False
+        else:
+            done, not_done = wait(futures, timeout=timeout * 2)
+            healthy = not not_done and all(future.exception() is None for future in done)
+        if not healthy:
+            self.restart()
+        return healthy
+
+    def restart(self) -> None:
+        """Остановить все процессы пула (и зависшие тоже) и запустить новые."""
+        old = self._pool
+        # Зависший процесс сам не завершится: shutdown его не прерывает, поэтому
+        # процессы берём из приватного _processes и останавливаем явно.
+        processes = list((old._processes or {}).values())
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        self._pool = self._start()
+        self.restarts += 1
@@ -0,0 +1,447 @@
+"""
+Измерения для каждой функции пакета: время, CPU, память, байты, страницы.
+
+Публичные функции пакета обёрнуты в @instrumented. Каждый вызов — событие (dict):
+
+    operation       имя функции: "compress_pdf", "run_qpdf", "PdfPipeline.save"
+    status          "ok" или "error"; error — имя исключения
+    wall_s          время по часам
+    cpu_s           CPU этого потока: pikepdf и Ghostscript работают внутри процесса
+    child_cpu_s     user + sys дочерних процессов (CLI qpdf, пулы процессов)
+    child_peak_rss  пик RSS дочернего процесса, байты; на Linux не меньше RSS
+                    нашего процесса в момент запуска — так его считает ядро
+    peak_rss        пик RSS этого процесса, байты — максимум за всю жизнь
+                    процесса к концу операции, а не только за операцию
+    input_bytes, output_bytes, pages
+    parent          операция, внутри которой выполнялась эта (compress_pdf → run_qpdf)
+
+Неизвестное значение — None: например, число страниц, если для него пришлось бы
+ещё раз открывать файл, или CPU для корутин (поток делят все задачи цикла).
+
+Событие попадает в гистограмму времени своей операции (stats(), histogram(),
+prometheus_text()) и во все хуки — функции, добавленные через add_hook().
+Готовые хуки: JsonLinesHook (строка JSON на событие) и PrometheusFileHook
+(файл в текстовом формате Prometheus, например для textfile collector
+node_exporter).
+
+Модуль импортируется вместе с любым подмодулем пакета, поэтому сам импортирует
+только дешёвое; json и resource — при первом использовании.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from _thread import allocate_lock
+from bisect import bisect_left
+from contextvars import ContextVar
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Callable
+
+# Границы корзин гистограммы времени, секунды.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+CO_GENERATOR = 0x20
+CO_COROUTINE = 0x80
+
+_current: ContextVar[dict | None] = ContextVar("pdftools_metrics_event", default=None)
+_hooks: list[Callable[[dict], None]] = []
+_lock = allocate_lock()
+
+
+# --- Гистограммы и сводка по операциям ---
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как histogram в Prometheus."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина — +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """[(верхняя граница, число значений ≤ границы), ...], последняя граница — inf."""
+        result, total = [], 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля линейной интерполяцией внутри корзины (как histogram_quantile)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            lower, seen = bound, seen + count
+        return self.buckets[-1]  # значение в корзине +Inf: известно только, что оно больше
+
+
+class OperationStats:
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.errors = 0
+        self.totals = {"cpu_s": 0.0, "child_cpu_s": 0.0, "input_bytes": 0, "output_bytes": 0, "pages": 0}
+
+    def add(self, event: dict) -> None:
+        self.latency.observe(event["wall_s"])
+        self.errors += event["status"] != "ok"
+        for field in self.totals:
+            if event.get(field) is not None:
+                self.totals[field] += event[field]
+
+
+_operations: dict[str, OperationStats] = {}
+
+
+def _record(event: dict) -> None:
+    with _lock:
+        stats_ = _operations.get(event["operation"])
+        if stats_ is None:
+            stats_ = _operations[event["operation"]] = OperationStats()
+        stats_.add(event)
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception as e:  # сбой хука не должен ломать обработку PDF
+            import warnings
+
+            warnings.warn(f"pdftools metrics hook {hook!r} failed: {e!r}", RuntimeWarning, stacklevel=2)
+
+
+def histogram(operation: str) -> Histogram | None:
+    stats_ = _operations.get(operation)
+    return None if stats_ is None else stats_.latency
+
+
+def stats(operation: str | None = None) -> dict:
+    """Сводка {операция: {count, errors, mean_s, p50_s, p90_s, p99_s, ...}} или одной операции."""
+    with _lock:
+        summary = {
+            name: {
+                "count": s.latency.count,
+                "errors": s.errors,
+                "mean_s": s.latency.sum / s.latency.count,
+                "p50_s": s.latency.quantile(0.5),
+                "p90_s": s.latency.quantile(0.9),
+                "p99_s": s.latency.quantile(0.99),
+                **s.totals,
+            }
+            for name, s in _operations.items()
+            if operation is None or name == operation
+        }
+    return summary if operation is None else summary.get(operation, {})
+
+
+def reset() -> None:
+    with _lock:
+        _operations.clear()
+
+
+def prometheus_text() -> str:
+    """Все метрики в текстовом формате Prometheus."""
+    lines = [
+        "# HELP pdftools_operation_duration_seconds Wall time of pdftools operations.",
+        "# TYPE pdftools_operation_duration_seconds histogram",
+    ]
+    counters = {
+        "errors": ("pdftools_operation_errors_total", "Failed pdftools operations."),
+        "cpu_s": ("pdftools_operation_cpu_seconds_total", "CPU time of the calling thread."),
+        "child_cpu_s": ("pdftools_operation_child_cpu_seconds_total", "CPU time of child processes."),
+        "input_bytes": ("pdftools_operation_input_bytes_total", "Bytes read by pdftools operations."),
+        "output_bytes": ("pdftools_operation_output_bytes_total", "Bytes written by pdftools operations."),
+        "pages": ("pdftools_operation_pages_total", "Pages processed by pdftools operations."),
+    }
+    with _lock:
+        items = sorted(_operations.items())
+        for name, s in items:
+            for bound, count in s.latency.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'pdftools_operation_duration_seconds_bucket{{operation="{name}",le="{le}"}} {count}')
+            lines.append(f'pdftools_operation_duration_seconds_sum{{operation="{name}"}} {s.latency.sum!r}')
+            lines.append(f'pdftools_operation_duration_seconds_count{{operation="{name}"}} {s.latency.count}')
+        for field, (metric, help_text) in counters.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for name, s in items:
+                value = s.errors if field == "errors" else s.totals[field]
+                lines.append(f'{metric}{{operation="{name}"}} {value!r}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str | Path) -> None:
+    """Атомарно записать prometheus_text() в файл: читатель не увидит половину файла."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+# --- Хуки ---
+
+def add_hook(hook: Callable[[dict], None]) -> None:
+    """hook(event) вызывается после каждой операции в потоке, где она завершилась."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[dict], None]) -> None:
+    _hooks.remove(hook)
+
+
+class JsonLinesHook:
+    """Каждое событие — строка JSON в файле (дописывается, файл открыт всё время)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = allocate_lock()
+
+    def __call__(self, event: dict) -> None:
+        import json
+
+        line = json.dumps({"time": time.time(), **event}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PrometheusFileHook:
+    """Переписывает файл с метриками не чаще раза в min_interval секунд и при выходе."""
+
+    def __init__(self, path: str | Path, min_interval: float = 10.0) -> None:
+        import atexit
+
+        self.path = path
+        self.min_interval = min_interval
+        self._written = 0.0
+        atexit.register(self.flush)
+
+    def __call__(self, event: dict) -> None:
+        if time.monotonic() - self._written >= self.min_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._written = time.monotonic()
+        write_prometheus(self.path)
+
+
+# --- Измерение ---
+
+_resource = None
+
+
+def _rusage(who: str):
+    """getrusage или None, если модуля resource нет (Windows)."""
+    global _resource
+    if _resource is None:
+        try:
+            import resource
+        except ImportError:
+            _resource = False
+        else:
+            _resource = resource
+    if not _resource:
+        return None
+    return _resource.getrusage(getattr(_resource, who))
+
+
+def _maxrss_bytes(usage) -> int:
+    # ru_maxrss: на Linux — килобайты, на macOS — байты.
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def record_child(usage) -> None:
+    """Учесть дочерний процесс (rusage из os.wait4) в текущей операции."""
+    event = _current.get()
+    if event is None:
+        return
+    event["child_cpu_s"] = (event["child_cpu_s"] or 0.0) + usage.ru_utime + usage.ru_stime
+    event["child_peak_rss"] = max(event["child_peak_rss"] or 0, _maxrss_bytes(usage))
+
+
+def note(**fields) -> None:
+    """Дополнить текущее событие тем, что известно только внутри функции (pages, output_bytes)."""
+    event = _current.get()
+    if event is not None:
+        for name, value in fields.items():
+            event[name] = value if event.get(name) is None else event[name] + value
+
+
+def size_of(value) -> int | None:
+    """Размер входа или выхода: путь, список путей, {путь: ...}, шаблон page-%03d.png или bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value)
+    if isinstance(value, (list, tuple)):
+        sizes = [size_of(v) for v in value]
+        return None if None in sizes else sum(sizes)
+    if isinstance(value, (str, os.PathLike)):
+        path = os.fspath(value)
+        if "%" in path:
+            import glob
+            import re
+
+            return sum(os.path.getsize(p) for p in glob.glob(re.sub(r"%0?\d*d", "*", path)))
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+    return None  # поток, генератор — не трогаем
+
+
+class Measurement:
+    """Одно измерение. with — для обычного кода; start()/finish() — когда конец в другом месте."""
+
+    def __init__(self, operation: str, inputs=None, output=None, children: bool = False, thread_cpu: bool = True) -> None:
+        self.output = output
+        self.children = children
+        self.thread_cpu = thread_cpu
+        self.event = {
+            "operation": operation, "status": "ok", "error": None, "wall_s": 0.0,
+            "cpu_s": None, "child_cpu_s": None, "child_peak_rss": None, "peak_rss": None,
+            "input_bytes": size_of(inputs), "output_bytes": None, "pages": None, "parent": None,
+        }
+        self._token = None
+
+    def start(self) -> "Measurement":
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        # Пулы процессов: их рабочие процессы завершаются внутри операции и попадают в RUSAGE_CHILDREN.
+        self._children = _rusage("RUSAGE_CHILDREN") if self.children else None
+        return self
+
+    def finish(self, error: BaseException | None = None) -> dict:
+        event = self.event
+        event["wall_s"] = time.perf_counter() - self._wall
+        if self.thread_cpu:
+            event["cpu_s"] = time.thread_time() - self._cpu
+        if self._children is not None:
+            after = _rusage("RUSAGE_CHILDREN")
+            event["child_cpu_s"] = (event["child_cpu_s"] or 0.0) + (
+                after.ru_utime + after.ru_stime - self._children.ru_utime - self._children.ru_stime
+            )
+        usage = _rusage("RUSAGE_SELF")
+        if usage is not None:
+            event["peak_rss"] = _maxrss_bytes(usage)
+        if error is not None:
+            event["status"], event["error"] = "error", type(error).__name__
+        elif event["output_bytes"] is None and self.output is not None:
+            event["output_bytes"] = size_of(self.output)
+        _record(event)
+        return event
+
+    def __enter__(self) -> dict:
+        parent = _current.get()
+        if parent is not None:
+            self.event["parent"] = parent["operation"]
+        self._parent = parent
+        self._token = _current.set(self.event)
+        self.start()
+        return self.event
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        event = self.finish(exc)
+        parent = self._parent
+        if parent is not None and event["child_cpu_s"] is not None:
+            parent["child_cpu_s"] = (parent["child_cpu_s"] or 0.0) + event["child_cpu_s"]
+            parent["child_peak_rss"] = max(parent["child_peak_rss"] or 0, event["child_peak_rss"] or 0)
+
+
+def measure(operation: str, inputs=None, output=None, children: bool = False) -> Measurement:
+    """with measure("my_step", inputs=src, output=dst) as event: ... — для своего кода."""
+    return Measurement(operation, inputs, output, children)
+
+
+def _bind(func, args: tuple, kwargs: dict) -> dict:
+    """Аргументы вызова по именам — без inspect.signature (inspect импортируется десятки мс)."""
+    code = func.__code__
+    positional = code.co_varnames[:code.co_argcount]
+    bound = dict(zip(positional, args))
+    bound.update(kwargs)
+    defaults = func.__defaults__ or ()
+    for name, value in zip(positional[len(positional) - len(defaults):], defaults):
+        bound.setdefault(name, value)
+    return bound
+
+
+def instrumented(
+    inputs: str | None = None,
+    output: str | None = None,
+    children: bool = False,
+    operation: str | None = None,
+):
+    """
+    Декоратор: каждый вызов функции — событие. inputs и output — имена аргументов
+    с путями (или списками путей), по которым считаются input_bytes и output_bytes.
+    children=True — функция работает через пул процессов (CPU берётся из RUSAGE_CHILDREN).
+    operation — имя операции в событиях, по умолчанию __qualname__ функции.
+    """
+    def decorate(func):
+        name = operation or func.__qualname__
+        flags = func.__code__.co_flags
+
+        def arguments(args, kwargs):
+            if inputs is None and output is None:
+                return None, None
+            bound = _bind(func, args, kwargs)
+            return bound.get(inputs), bound.get(output)
+
+        if flags & CO_COROUTINE:
+            async def wrapper(*args, **kwargs):
+                src, dst = arguments(args, kwargs)
+                with Measurement(name, src, dst, children, thread_cpu=False):
+                    return await func(*args, **kwargs)
+        elif flags & CO_GENERATOR:
+            # Генератор измеряется от первого next() до исчерпания, включая паузы потребителя.
+            # Текущей операцией он становится только на время своих шагов: операции,
+            # которые потребитель вызывает между yield, — не его дочерние.
+            def wrapper(*args, **kwargs):
+                src, dst = arguments(args, kwargs)
+                measurement = Measurement(name, src, dst, children, thread_cpu=False).start()
+                inner = func(*args, **kwargs)
+                try:
+                    while True:
+                        token = _current.set(measurement.event)
+                        try:
+                            item = next(inner)
+                        except StopIteration:
+                            break
+                        finally:
+                            _current.reset(token)
+                        yield item
+                except GeneratorExit:  # потребитель остановился раньше — это не ошибка
+                    inner.close()
+                    measurement.finish()
+                    raise
+                except BaseException as e:
+                    inner.close()
+                    measurement.finish(e)
+                    raise
+                measurement.finish()
+        else:
+            def wrapper(*args, **kwargs):
+                src, dst = arguments(args, kwargs)
+                with Measurement(name, src, dst, children):
+                    return func(*args, **kwargs)
+
+        wrapper.__name__, wrapper.__qualname__ = func.__name__, func.__qualname__
+        wrapper.__doc__, wrapper.__module__ = func.__doc__, func.__module__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    return decorate
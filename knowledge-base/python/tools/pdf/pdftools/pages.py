@@ -0,0 +1,353 @@
+"""Операции со страницами через pikepdf: склейка, нарезка, поворот, шифрование."""
+
+from __future__ import annotations
+
+import io
+import itertools
+import os
+
+from ._backends import require
+from .metrics import instrumented, note
+
+# Модуль загружается при первом обращении к любой его функции, поэтому здесь
+# импортируется только то, что дёшево. pathlib, typing, tempfile стоят десятки
+# миллисекунд: они нужны либо только для аннотаций, либо внутри функций.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO, Iterable
+
+
+@instrumented(inputs="src", output="dst")
+def copy_pdf(src: str | Path, dst: str | Path) -> None:
+    """Открыть и пересохранить — нормализует структуру файла."""
+    pikepdf = require("pikepdf")
+    with pikepdf.Pdf.open(src) as pdf:
+        note(pages=len(pdf.pages))
+        pdf.save(dst)
+
+
+@instrumented(inputs="sources", output="dst")
+def merge_pdfs(sources: Iterable[str | Path], dst: str | Path) -> None:
+    pikepdf = require("pikepdf")
+    result = pikepdf.Pdf.new()
+    opened = [pikepdf.Pdf.open(src) for src in sources]
+    try:
+        for pdf in opened:
+            result.pages.extend(pdf.pages)
+        note(pages=len(result.pages))
+        # Источники закрываем только после save: pikepdf дочитывает из них потоки.
+        result.save(dst)
+    finally:
+        for pdf in opened:
+            pdf.close()
+
+
+@instrumented(inputs="src")
+def split_pdf(src: str | Path, dst_first: str | Path, dst_rest: str | Path) -> None:
+    """Первая страница — в dst_first, остальные — в dst_rest."""
+    split_by_specs(src, {str(dst_first): "1", str(dst_rest): "2-z"})
+
+
+@instrumented(inputs="src", output="dst")
+def rotate_all(src: str | Path, dst: str | Path, angle: int = 180) -> None:
+    pikepdf = require("pikepdf")
+    with pikepdf.Pdf.open(src) as pdf:
+        note(pages=len(pdf.pages))
+        for page in pdf.pages:
+            page.rotate(angle, relative=True)
+        pdf.save(dst)
+
+
+@instrumented(inputs="src", output="dst")
+def reorder_pages(src: str | Path, dst: str | Path, order: list[int]) -> None:
+    """order — новый порядок индексов страниц (с нуля), например [2, 0, 1]."""
+    with PdfPipeline.open(src) as pipeline:
+        pipeline.reorder(order).save(dst)
+
+
+@instrumented(inputs="src", output="dst")
+def encrypt_pdf(src: str | Path, dst: str | Path, password: str, R: int = 4) -> None:
+    """R — ревизия шифрования, как в qpdf.py: 4 — AES-128, 6 — AES-256 (нужен PDF 2.0-ридер)."""
+    with PdfPipeline.open(src) as pipeline:
+        pipeline.encrypt(password, R=R).save(dst)
+
+
+@instrumented(inputs="src", output="dst")
+def remove_password(src: str | Path, dst: str | Path, password: str) -> None:
+    with PdfPipeline.open(src, password=password) as pipeline:
+        pipeline.save(dst)
+
+
+# --- Диапазоны страниц ---
+
+def parse_page_spec(spec: str, page_count: int) -> list[int]:
+    """
+    Диапазон страниц в синтаксисе qpdf → индексы страниц (с нуля).
+    Поддерживается: "1-5", "1,3,7", "z" (последняя), "r1" (первая с конца),
+    "5-1" (в обратном порядке).
+    """
+    def page_number(token: str) -> int:
+        if token == "z":
+            return page_count
+        if token.startswith("r"):
+            return page_count - int(token[1:]) + 1
+        return int(token)
+
+    indices = []
+    for part in spec.replace(" ", "").split(","):
+        first, _, last = part.partition("-")
+        start = page_number(first)
+        end = page_number(last) if last else start
+        step = 1 if end >= start else -1
+        for number in range(start, end + step, step):
+            if not 1 <= number <= page_count:
+                raise ValueError(f"page {number} out of range 1-{page_count} in {spec!r}")
+            indices.append(number - 1)
+    return indices
+
+
+def page_chunks(page_count: int, chunk_size: int, pattern: str = "part-{:04d}.pdf") -> dict[str, str]:
+    """Нарезать документ на куски по chunk_size страниц: {"part-0001.pdf": "1-50", ...}"""
+    return {
+        pattern.format(n): f"{first}-{min(first + chunk_size - 1, page_count)}"
+        for n, first in enumerate(range(1, page_count + 1, chunk_size), start=1)
+    }
+
+
+@instrumented(inputs="src", output="jobs")
+def split_by_specs(src: str | Path, jobs: dict[str, str]) -> None:
+    """
+    jobs — {выходной файл: диапазон страниц}, например
+    {"part1.pdf": "1-100", "part2.pdf": "101-200", "last.pdf": "z"}.
+    Исходный файл открывается один раз на все выходные файлы.
+    """
+    pikepdf = require("pikepdf")
+    with pikepdf.Pdf.open(src) as pdf:
+        page_count = len(pdf.pages)
+        note(pages=page_count)
+        for dst, spec in jobs.items():
+            out = pikepdf.Pdf.new()
+            out.pages.extend(pdf.pages[i] for i in parse_page_spec(spec, page_count))
+            # Сохранять нужно, пока исходный pdf открыт: страницы копируются при save.
+            out.save(dst)
+
+
+def _split_worker(src: str, jobs: list[tuple[str, str]]) -> int:
+    split_by_specs(src, dict(jobs))
+    return len(jobs)
+
+
+@instrumented(inputs="src", output="jobs", children=True)
+def split_by_specs_parallel(src: str | Path, jobs: dict[str, str], workers: int | None = None) -> None:
+    """
+    То же, что split_by_specs, но выходные файлы раскладываются по процессам.
+    Каждый процесс открывает исходный файл ОДИН раз и пишет свою долю файлов.
+    Выигрыш есть, когда выходных файлов много: сборка и запись PDF упираются
+    в одно ядро, а разбор исходника повторяется всего workers раз.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    items = list(jobs.items())
+    # Раскладываем по кругу, чтобы соседние (похожие по размеру) куски попали в разные процессы.
+    chunks = [items[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_split_worker, str(src), chunk) for chunk in chunks if chunk]
+        for future in futures:
+            future.result()  # пробрасывает исключение из процесса
+
+
+# --- Склейка тысяч файлов пачками ---
+
+def _merge_batch(parts: list[str], dst: str, backend: str) -> None:
+    if backend == "qpdf":
+        from .qpdf_cli import merge_with_qpdf
+
+        merge_with_qpdf(parts, dst)
+    else:
+        merge_pdfs(parts, dst)
+
+
+def _merged_page_count(dst: str | Path, backend: str) -> int:
+    if backend == "qpdf":
+        from .qpdf_cli import page_count
+
+        return page_count(dst)
+    pikepdf = require("pikepdf")
+    with pikepdf.Pdf.open(dst) as pdf:
+        return len(pdf.pages)
+
+
+@instrumented(inputs="sources", output="dst")
+def merge_tree(
+    sources: Iterable[str | Path],
+    dst: str | Path,
+    batch_size: int = 64,
+    backend: str = "pikepdf",
+    workdir: str | Path | None = None,
+) -> int:
+    """
+    Склеить любое количество PDF, не открывая больше batch_size файлов сразу.
+    backend — "pikepdf" или "qpdf" (CLI). Возвращает число страниц результата
+    и печатает пропускную способность в страницах в секунду.
+
+    Каждые batch_size файлов склеиваются в промежуточный файл уровня 1, каждые
+    batch_size файлов уровня 1 — в файл уровня 2 и т.д. В памяти — одна пачка,
+    а источники можно отдавать генератором: список целиком не нужен.
+    """
+    if batch_size < 2:
+        raise ValueError("batch_size must be at least 2")
+    if backend not in ("pikepdf", "qpdf"):
+        raise ValueError(f"unknown backend {backend!r}, expected 'pikepdf' or 'qpdf'")
+    import tempfile
+    import time
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        counter = itertools.count()
+        # levels[k] — файлы уровня k по порядку; уровень 0 — исходные файлы.
+        levels: list[list[str]] = [[]]
+
+        def merge_level(k: int) -> None:
+            merged = os.path.join(tmp, f"level{k + 1}-{next(counter):06d}.pdf")
+            _merge_batch(levels[k], merged, backend)
+            if k > 0:  # исходные файлы не трогаем, промежуточные — удаляем сразу
+                for part in levels[k]:
+                    os.remove(part)
+            levels[k] = []
+            if len(levels) == k + 1:
+                levels.append([])
+            levels[k + 1].append(merged)
+            if len(levels[k + 1]) == batch_size:
+                merge_level(k + 1)
+
+        source_count = 0
+        for src in sources:
+            levels[0].append(str(src))
+            source_count += 1
+            if len(levels[0]) == batch_size:
+                merge_level(0)
+        if not source_count:
+            raise ValueError("no sources")
+
+        # Остатки: более высокие уровни содержат более ранние страницы.
+        remaining = [part for level in reversed(levels) for part in level]
+        while len(remaining) > batch_size:
+            grouped = []
+            for i in range(0, len(remaining), batch_size):
+                merged = os.path.join(tmp, f"tail-{next(counter):06d}.pdf")
+                _merge_batch(remaining[i:i + batch_size], merged, backend)
+                grouped.append(merged)
+            remaining = grouped
+        _merge_batch(remaining, str(dst), backend)
+
+    pages = _merged_page_count(dst, backend)
+    note(pages=pages)
+    elapsed = time.perf_counter() - start
+    print(f"[merge_tree] {source_count} файлов, {pages} стр. за {elapsed:.1f} с "
+          f"({pages / elapsed:.0f} стр/с, batch_size={batch_size}, {backend})")
+    return pages
+
+
+# --- Цепочка операций в памяти ---
+
+class PdfPipeline:
+    """
+    Один открытый Pdf и цепочка шагов над ним. Каждый шаг возвращает self,
+    запись — один раз в конце:
+
+        PdfPipeline.open(data, password="old").select("2-z").rotate(90).compress().to_bytes()
+
+    Пароль снимается уже при открытии: без encrypt() результат сохраняется
+    незашифрованным.
+    """
+
+    def __init__(self, pdf) -> None:
+        self.pdf = pdf
+        self._save_options: dict = {}
+
+    @classmethod
+    @instrumented(inputs="source")
+    def open(cls, source: str | Path | bytes | BinaryIO, password: str = "") -> "PdfPipeline":
+        pikepdf = require("pikepdf")
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        return cls(pikepdf.Pdf.open(source, password=password))
+
+    def __enter__(self) -> "PdfPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.pdf.close()
+
+    def select(self, spec: str) -> "PdfPipeline":
+        """Оставить страницы по диапазону qpdf ("1-5", "z-1", "1,3,3") — и выбор, и перестановка."""
+        self._set_pages(parse_page_spec(spec, len(self.pdf.pages)))
+        return self
+
+    def reorder(self, order: list[int]) -> "PdfPipeline":
+        """order — индексы страниц с нуля, как в reorder_pages."""
+        self._set_pages(order)
+        return self
+
+    def _set_pages(self, indices: list[int]) -> None:
+        pages = [self.pdf.pages[i] for i in indices]
+        # Страницы убираются из дерева страниц, но остаются объектами этого же Pdf,
+        # поэтому обратно они добавляются без копирования содержимого.
+        # Повтор страницы ("1,1") qpdf сам превращает в поверхностную копию.
+        del self.pdf.pages[:]
+        self.pdf.pages.extend(pages)
+
+    def rotate(self, angle: int, spec: str | None = None) -> "PdfPipeline":
+        """Повернуть все страницы или только страницы из spec."""
+        indices = parse_page_spec(spec, len(self.pdf.pages)) if spec else range(len(self.pdf.pages))
+        for i in indices:
+            self.pdf.pages[i].rotate(angle, relative=True)
+        return self
+
+    def encrypt(self, user: str, owner: str | None = None, R: int = 4) -> "PdfPipeline":
+        """R — ревизия шифрования: 4 — AES-128 (по умолчанию, как encrypt_pdf в qpdf.py), 6 — AES-256."""
+        pikepdf = require("pikepdf")
+        self._save_options["encryption"] = pikepdf.Encryption(user=user, owner=owner or user, R=R)
+        return self
+
+    def compress(self) -> "PdfPipeline":
+        """То же, что compress_pdf: сжать потоки и упаковать объекты в object streams."""
+        pikepdf = require("pikepdf")
+        self._save_options.update(compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        return self
+
+    @instrumented(output="dst")
+    def save(self, dst: str | Path | BinaryIO) -> None:
+        """Единственная запись документа за всю цепочку."""
+        note(pages=len(self.pdf.pages))
+        self.pdf.save(dst, **self._save_options)
+
+    @instrumented()
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.save(buffer)
+        note(output_bytes=buffer.tell())
+        return buffer.getvalue()
+
+    @instrumented()
+    def split(self, jobs: dict[str, str]) -> dict[str, bytes]:
+        """
+        Как split_by_specs, но в память: {имя: диапазон} → {имя: байты PDF}.
+        Применяется к текущему состоянию цепочки, с её настройками сохранения.
+        """
+        pikepdf = require("pikepdf")
+        page_count = len(self.pdf.pages)
+        parts = {}
+        for name, spec in jobs.items():
+            with pikepdf.Pdf.new() as out:
+                out.pages.extend(self.pdf.pages[i] for i in parse_page_spec(spec, page_count))
+                buffer = io.BytesIO()
+                out.save(buffer, **self._save_options)
+                parts[name] = buffer.getvalue()
+        note(output_bytes=sum(map(len, parts.values())))
+        return parts
@@ -0,0 +1,109 @@
+# =============================================================================
+# Тема: Пакет pdftools: ленивая загрузка движков
+# Раздел: python/tools/pdf
+# Документация: pdftools.md
+# =============================================================================
+
+# Этот файл — примеры использования пакета, он лежит рядом с его модулями.
+# Чтобы `import pdftools` работал, в sys.path должен быть каталог python/tools/pdf.
+
+import subprocess
+import sys
+
+
+# --- Пример 1: Ленивый модуль через __getattr__ (PEP 562) ---
+# Так устроен __init__.py пакета. Внутри модуля:
+#
+#     import importlib
+#
+#     _MODULE_OF = {"merge_pdfs": "pages", "compress_pdf": "qpdf_cli"}
+#
+#     def __getattr__(name):
+#         module = _MODULE_OF.get(name)
+#         if module is None:
+#             raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+#         value = getattr(importlib.import_module(f".{module}", __name__), name)
+#         globals()[name] = value   # второй раз __getattr__ не понадобится
+#         return value
+#
+# __getattr__ вызывается, только если обычный поиск имени в модуле не удался.
+
+
+# --- Пример 2: Движок импортируется при первом вызове ---
+
+def merge(sources: list[str], dst: str) -> None:
+    import pdftools
+
+    pdftools.merge_pdfs(sources, dst)   # pikepdf загружается здесь, а не при import
+
+
+def check_backends() -> None:
+    import pdftools
+
+    for backend, ok in pdftools.available_backends().items():
+        print(f"{backend:<12} {'есть' if ok else 'нет'}")
+
+# Пример вызова:
+# check_backends()
+# try:
+#     merge(["a.pdf", "b.pdf"], "ab.pdf")
+# except pdftools.BackendUnavailable as e:
+#     print(e)            # pikepdf is not installed: pip install pikepdf
+
+
+# --- Пример 3: Сколько стоит импорт ---
+# Мерить нужно в новом процессе: в текущем модуль уже лежит в sys.modules.
+
+def import_cost_ms(statement: str = "import pdftools", runs: int = 10) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print((time.perf_counter() - start) * 1e3)"
+    )
+    times = sorted(
+        float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    )
+    return times[len(times) // 2]
+
+# Пример вызова:
+# print(import_cost_ms())                                   # ~3 мс
+# print(import_cost_ms("from pdftools import merge_pdfs"))  # ~10 мс, без pikepdf
+#
+# Подробно по модулям:
+#   python -X importtime -c "import pdftools" 2> importtime.txt
+# Бюджет для CI:
+#   python scripts/bench_import.py
+
+
+# --- Пример 4: Метрики операций ---
+# Каждая функция пакета пишет событие; хуки решают, куда его отправить.
+
+def enable_metrics(events_path: str = "pdf_events.jsonl", prom_path: str = "pdftools.prom") -> None:
+    import pdftools
+
+    pdftools.add_hook(pdftools.JsonLinesHook(events_path))               # строка JSON на вызов
+    pdftools.add_hook(pdftools.PrometheusFileHook(prom_path, min_interval=15))
+
+
+def slowest_operations(limit: int = 5) -> list[tuple[str, float]]:
+    """Операции с самым большим p99 за время жизни процесса."""
+    from pdftools import metrics
+
+    summary = metrics.stats()
+    return sorted(((op, s["p99_s"]) for op, s in summary.items()), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def timed_step(src: str, dst: str) -> None:
+    """Свой шаг обработки в тех же метриках: measure() — контекстный менеджер."""
+    import shutil
+
+    from pdftools import metrics
+
+    with metrics.measure("archive_copy", inputs=src, output=dst):
+        shutil.copyfile(src, dst)   # время, CPU и размеры файлов попадут в событие
+
+# Пример вызова:
+# enable_metrics()
+# pdftools.compress_pdf("big.pdf", "small.pdf")
+# print(slowest_operations())        # [('compress_pdf', 0.42), ('run_qpdf', 0.41), ...]
+# print(pdftools.metrics.histogram("run_qpdf").cumulative())
@@ -0,0 +1,73 @@
+"""qpdf из asyncio: процесс не занимает поток, Semaphore ограничивает число процессов."""
+
+import asyncio
+import contextlib
+import sys
+
+from ._backends import require
+from .metrics import instrumented
+from .qpdf_cli import QPDF_OK_CODES, QpdfError
+
+
+async def _pump_lines(stream: asyncio.StreamReader, on_line) -> list[str]:
+    """Читать поток построчно по мере поступления, а не целиком в конце."""
+    lines = []
+    while line := await stream.readline():
+        text = line.decode(errors="replace").rstrip("\n")
+        lines.append(text)
+        on_line(text)
+    return lines
+
+
+@instrumented()
+async def run_qpdf_async(
+    args: list[str],
+    *,
+    semaphore: asyncio.Semaphore | None = None,
+    timeout: float | None = None,
+    on_stderr=lambda line: print(f"qpdf: {line}", file=sys.stderr),
+) -> str:
+    """
+    Запустить qpdf, не блокируя цикл событий. Возвращает stdout.
+    stderr передаётся в on_stderr построчно, пока qpdf работает.
+    При таймауте или отмене задачи процесс qpdf убивается. CPU и память qpdf
+    в событии метрик не учитываются: процесс дожидается цикл событий, а не мы.
+    """
+    qpdf = require("qpdf")
+    async with semaphore or contextlib.nullcontext():
+        proc = await asyncio.create_subprocess_exec(
+            qpdf, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr_lines, _ = await asyncio.wait_for(
+                asyncio.gather(proc.stdout.read(), _pump_lines(proc.stderr, on_stderr), proc.wait()),
+                timeout,
+            )
+        except BaseException:  # TimeoutError, CancelledError, KeyboardInterrupt
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()  # не оставляем зомби-процесс
+            raise
+
+    if proc.returncode not in QPDF_OK_CODES:
+        raise QpdfError(args, proc.returncode, "\n".join(stderr_lines))
+    return stdout.decode(errors="replace")
+
+
+@instrumented()
+async def run_qpdf_many(
+    arg_lists: list[list[str]],
+    limit: int = 32,
+    timeout: float | None = None,
+) -> list[str | BaseException]:
+    """
+    Запустить много операций qpdf, не больше limit процессов одновременно.
+    Результат по порядку: stdout или исключение (ошибка одной операции не отменяет остальные).
+    """
+    semaphore = asyncio.Semaphore(limit)
+    return await asyncio.gather(
+        *(run_qpdf_async(args, semaphore=semaphore, timeout=timeout) for args in arg_lists),
+        return_exceptions=True,
+    )
@@ -0,0 +1,93 @@
+"""Вызовы утилиты qpdf через subprocess."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+from ._backends import require
+from .metrics import instrumented, note, record_child
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# qpdf завершается с кодом 3, если файл обработан, но были предупреждения.
+QPDF_OK_CODES = (0, 3)
+
+
+class QpdfError(RuntimeError):
+    def __init__(self, args: list[str], returncode: int, stderr: str) -> None:
+        super().__init__(f"qpdf {' '.join(args)} exited with {returncode}: {stderr.strip()}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+def _run_with_rusage(cmd: list[str]) -> tuple[int, str, str]:
+    """subprocess.run, но процесс дожидается os.wait4 — он отдаёт CPU и пик RSS процесса.
+
+    Вывод пишется во временные файлы, а не в каналы: пока мы ждём в wait4,
+    никто не читает каналы, и qpdf с большим выводом заблокировался бы.
+    """
+    import tempfile
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=out, stderr=err)
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        record_child(usage)
+        out.seek(0)
+        err.seek(0)
+        return proc.returncode, out.read().decode(errors="replace"), err.read().decode(errors="replace")
+
+
+@instrumented()
+def run_qpdf(args: list[str]) -> str:
+    """Запустить qpdf. Возвращает stdout; при ошибке — QpdfError с текстом stderr."""
+    qpdf = require("qpdf")
+    if hasattr(os, "wait4"):
+        returncode, stdout, stderr = _run_with_rusage([qpdf, *args])
+    else:  # Windows: без CPU и памяти дочернего процесса
+        completed = subprocess.run([qpdf, *args], text=True, capture_output=True)
+        returncode, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+    if returncode not in QPDF_OK_CODES:
+        raise QpdfError(args, returncode, stderr)
+    return stdout
+
+
+@instrumented(inputs="src")
+def page_count(src: str | Path) -> int:
+    count = int(run_qpdf(["--show-npages", str(src)]))
+    note(pages=count)
+    return count
+
+
+@instrumented(inputs="src", output="dst")
+def extract_pages(src: str | Path, dst: str | Path, page_spec: str) -> None:
+    """page_spec в синтаксисе qpdf: "1-5", "1,3,7", "1-3,7-9"."""
+    run_qpdf([str(src), "--pages", ".", page_spec, "--", str(dst)])
+
+
+@instrumented(inputs="parts", output="dst")
+def merge_with_qpdf(parts: list[str | Path], dst: str | Path) -> None:
+    run_qpdf(["--empty", "--pages", *map(str, parts), "--", str(dst)])
+
+
+@instrumented(inputs="src", output="dst")
+def encrypt_with_qpdf(src: str | Path, dst: str | Path, password: str) -> None:
+    run_qpdf(["--encrypt", password, password, "--modify=none", "256", "--", str(src), str(dst)])
+
+
+@instrumented(inputs="src", output="dst")
+def decrypt_with_qpdf(src: str | Path, dst: str | Path, password: str = "") -> None:
+    run_qpdf([f"--password={password}", "--decrypt", str(src), str(dst)])
+
+
+@instrumented(inputs="src", output="dst")
+def compress_pdf(src: str | Path, dst: str | Path) -> None:
+    run_qpdf(["--compress-streams=y", "--object-streams=generate", str(src), str(dst)])
@@ -10,17 +10,26 @@ from pikepdf import Pdf, Encryption
 from pathlib import Path
 import subprocess
 
+# Вызовы примеров закомментированы: импорт этого файла не должен читать
+# и писать PDF (см. тему pdftools).
+
 # --- Пример 1: Копирование PDF «как есть» ---
 # Открывает PDF и сохраняет его копию. Полезно для нормализации структуры файла.
-with Pdf.open("input.pdf") as pdf:
-    pdf.save("output_copy.pdf")
+def copy_pdf(src: str, dst: str) -> None:
+    with Pdf.open(src) as pdf:
+        pdf.save(dst)
+
+# copy_pdf("input.pdf", "output_copy.pdf")
 
 
 # --- Пример 2: Создание пустого PDF файла ---
 # Создает новый PDF-документ с одной пустой страницей.
-pdf = Pdf.new()
-pdf.add_blank_page()
-pdf.save("blank_page.pdf")
+def create_blank_pdf(dst: str) -> None:
+    pdf = Pdf.new()
+    pdf.add_blank_page()
+    pdf.save(dst)
+
+# create_blank_pdf("blank_page.pdf")
 
 
 # --- Пример 3: Разделение PDF на несколько файлов ---
@@ -48,15 +57,15 @@ def split_pdf(src: str, dst_first: str, dst_rest: str) -> None:
 # Демонстрирует, как можно вызывать утилиту qpdf напрямую из Python.
 # Требуется, чтобы qpdf был установлен в системе и доступен в PATH.
 # Команда для расшифровки файла:
-try:
-    subprocess.run(
-        ["qpdf", "--decrypt", "encrypted_input.pdf", "decrypted_output.pdf"],
-        check=True
-    )
-except FileNotFoundError:
-    print("Ошибка: утилита qpdf не найдена. Убедитесь, что она установлена и доступна в PATH.")
-except subprocess.CalledProcessError as e:
-    print(f"Ошибка при выполнении qpdf: {e}")
+def decrypt_with_qpdf(src: str, dst: str) -> None:
+    try:
+        subprocess.run(["qpdf", "--decrypt", src, dst], check=True)
+    except FileNotFoundError:
+        print("Ошибка: утилита qpdf не найдена. Убедитесь, что она установлена и доступна в PATH.")
+    except subprocess.CalledProcessError as e:
+        print(f"Ошибка при выполнении qpdf: {e}")
+
+# decrypt_with_qpdf("encrypted_input.pdf", "decrypted_output.pdf")
 
 # Пример 5
 def merge_pdfs(sources: list[str | Path], dst: str | Path) -> None:
@@ -75,23 +84,20 @@ def merge_pdfs(sources: list[str | Path], dst: str | Path) -> None:
     result.save(dst)
 
 
-merge_pdfs(
-    ["title.pdf", "chapter1.pdf", "chapter2.pdf"],
-    "book.pdf",
-)
+# merge_pdfs(
+#     ["title.pdf", "chapter1.pdf", "chapter2.pdf"],
+#     "book.pdf",
+# )
 
 # Пример 6
 def rotate_all(src: str, dst: str, angle: int = 180) -> None:
     """ Поворот и перестановка страниц. """
-    with pikepdf.Pdf.open(src) as pdf:
+    with Pdf.open(src) as pdf:
         for page in pdf.pages:
             page.rotate(angle, relative=True)
         pdf.save(dst)
 
-
-
-rotate_all("scan.pdf", "scan_rotated.pdf", angle=90)
-
+# rotate_all("scan.pdf", "scan_rotated.pdf", angle=90)
 
 
 # Пример 7
@@ -122,17 +128,18 @@ def encrypt_pdf(src: str, dst: str, password: str) -> None:
         pdf.save(dst, encryption=enc)
 
 
-encrypt_pdf("confidential.pdf", "confidential_encrypted.pdf", "s3cr3t")
+# encrypt_pdf("confidential.pdf", "confidential_encrypted.pdf", "s3cr3t")
 
 # Пример 9
 def remove_password(src: str, dst: str, password: str) -> None:
     """ Убрать пароль. """
-    pdf = pikepdf.open(src, password=password)[web:16]
-    pdf.save(dst)
+    with Pdf.open(src, password=password) as pdf:
+        pdf.save(dst)
 
 # Часть 2. Взаимодейсвтие через субпроцессы
 
 import subprocess
+import sys
 from pathlib import Path
 
 
@@ -154,7 +161,7 @@ def extract_pages(src: str, dst: str, page_spec: str) -> None:
     """
     run_qpdf([src, "--pages", ".", page_spec, "--", dst])
 
-extract_pages("multipage.pdf", "first_five.pdf", "1-5")
+# extract_pages("multipage.pdf", "first_five.pdf", "1-5")
 
 
 # Склеить несколько PDF в один
@@ -163,7 +170,7 @@ def merge_with_qpdf(parts: list[str], dst: str) -> None:
     run_qpdf(["--empty", "--pages", *parts, "--", dst])
 
 
-merge_with_qpdf(["a.pdf", "b.pdf", "c.pdf"], "merged.pdf")
+# merge_with_qpdf(["a.pdf", "b.pdf", "c.pdf"], "merged.pdf")
 
 # Шифрование PDF через qpdf
 def encrypt_with_qpdf(src: str, dst: str, password: str) -> None:
@@ -187,3 +194,131 @@ def compress_pdf(src: str, dst: str) -> None:
         src,
         dst,
     ])
+
+
+# Часть 3. Большие документы: много диапазонов, много файлов, сервисы
+#
+# Функции этой части живут в пакете pdftools (каталог ../pdftools) — одна
+# реализация на всю базу, её же используют pdf_batch и scripts/bench_pdf.py.
+# Здесь — зачем они нужны, как устроены и как их вызывать; код — в модулях
+# pdftools/pages.py, pdftools/qpdf_cli.py и pdftools/qpdf_async.py.
+# Пакет импортируется, когда python/tools/pdf есть в PYTHONPATH:
+#     PYTHONPATH=python/tools/pdf python python/tools/pdf/qpdf/qpdf.py
+
+import tempfile
+import time
+
+
+# --- Пример 10: Разбиение на много диапазонов за одно открытие файла ---
+# extract_pages запускает отдельный процесс qpdf на каждый диапазон, и каждый
+# процесс заново открывает и разбирает исходный PDF. Если диапазонов сотни,
+# выгоднее открыть файл один раз и собрать из него все выходные документы:
+#
+#     with Pdf.open(src) as pdf:
+#         for dst, spec in jobs.items():
+#             out = Pdf.new()
+#             out.pages.extend(pdf.pages[i] for i in parse_page_spec(spec, len(pdf.pages)))
+#             out.save(dst)   # пока pdf открыт: страницы копируются при save
+#
+# split_by_specs_parallel раскладывает выходные файлы по процессам: каждый
+# открывает исходник один раз и пишет свою долю.
+
+from pdftools.pages import page_chunks, parse_page_spec, split_by_specs, split_by_specs_parallel
+
+
+def bench_split(src: str | Path, chunk_size: int = 50, workers: int | None = None) -> None:
+    """
+    Сравнить три способа нарезать src на куски по chunk_size страниц:
+    процесс qpdf на каждый диапазон, одно открытие файла и пул процессов.
+    """
+    with Pdf.open(src) as pdf:
+        jobs = page_chunks(len(pdf.pages), chunk_size)
+
+    variants = {
+        "extract_pages (qpdf на диапазон)": lambda out: [
+            extract_pages(str(src), str(out / dst), spec) for dst, spec in jobs.items()
+        ],
+        "split_by_specs (одно открытие)": lambda out: split_by_specs(
+            src, {str(out / dst): spec for dst, spec in jobs.items()}
+        ),
+        "split_by_specs_parallel": lambda out: split_by_specs_parallel(
+            src, {str(out / dst): spec for dst, spec in jobs.items()}, workers
+        ),
+    }
+    print(f"{len(jobs)} файлов по {chunk_size} страниц")
+    for name, run in variants.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            run(Path(tmp))
+            print(f"{name:<36} {time.perf_counter() - start:8.2f} с")
+
+# Пример вызова:
+# parse_page_spec("1-3,z", 10)      # [0, 1, 2, 9]
+# split_by_specs("scan.pdf", {"cover.pdf": "1", "body.pdf": "2-r2", "back.pdf": "z"})
+# split_by_specs_parallel("scan.pdf", page_chunks(3000, 20), workers=8)
+# bench_split("scan.pdf", chunk_size=20)
+
+
+# --- Пример 11: Склейка тысяч файлов пачками (древовидное слияние) ---
+# merge_pdfs держит все страницы в одном Pdf.new(), а merge_with_qpdf кладёт все
+# файлы в одну командную строку. На тысячах файлов первое упирается в память,
+# второе — в лимит длины командной строки (ARG_MAX).
+#
+# Древовидное слияние: каждые batch_size файлов склеиваются в промежуточный файл
+# уровня 1, каждые batch_size файлов уровня 1 — в файл уровня 2 и т.д.
+# Одновременно открыто не больше batch_size файлов, в памяти — одна пачка,
+# а источники можно отдавать генератором: список целиком не нужен.
+# merge_tree возвращает число страниц результата и печатает скорость в стр/с.
+
+from pdftools.pages import merge_tree
+
+# Пример вызова:
+# merge_tree(sorted(Path("scans").glob("*.pdf")), "all_scans.pdf", batch_size=100)
+# Источники можно читать генератором — список путей в памяти не нужен:
+# merge_tree((line.strip() for line in open("files.txt")), "book.pdf", backend="qpdf")
+
+
+# --- Пример 12: Асинхронный run_qpdf для сервиса на asyncio ---
+# run_qpdf блокирует поток на subprocess.run и копит весь вывод в памяти.
+# В асинхронном сервисе это значит «один поток на одну операцию qpdf».
+# asyncio.create_subprocess_exec не занимает поток на время работы qpdf:
+# сотни операций ждут в одном цикле событий, а Semaphore ограничивает,
+# сколько процессов qpdf реально запущено одновременно.
+#
+# qpdf завершается с кодом 3, если файл обработан, но были предупреждения:
+# QPDF_OK_CODES = (0, 3), остальное — QpdfError с текстом stderr. При таймауте
+# или отмене задачи процесс qpdf убивается, чтобы не остался зомби.
+
+from pdftools.qpdf_async import run_qpdf_async, run_qpdf_many
+from pdftools.qpdf_cli import QPDF_OK_CODES, QpdfError
+
+# Пример вызова:
+# results = asyncio.run(run_qpdf_many(
+#     [["--compress-streams=y", f"in/{i}.pdf", f"out/{i}.pdf"] for i in range(500)],
+#     limit=16,
+#     timeout=60,
+# ))
+# failed = [r for r in results if isinstance(r, BaseException)]
+
+
+# --- Пример 13: Цепочка операций в памяти без промежуточных файлов ---
+# remove_password → reorder_pages → rotate_all → compress_pdf — это четыре
+# открытия, четыре разбора и четыре полные записи PDF на диск. Все эти шаги
+# меняют только объекты документа, поэтому их можно применить к одному
+# открытому Pdf и сохранить результат один раз.
+# Вход и выход могут быть байтами: HTTP-сервису не нужна файловая система.
+#
+# Шаги PdfPipeline (select, reorder, rotate) меняют дерево страниц того же Pdf,
+# encrypt и compress только запоминают параметры save; документ пишется один
+# раз — в save, to_bytes или split.
+
+from pdftools.pages import PdfPipeline
+
+# Пример вызова:
+# with PdfPipeline.open("scan.pdf", password="old") as p:
+#     p.select("z-1").rotate(90, "1-3").compress().encrypt("new").save("scan_fixed.pdf")
+#
+# В обработчике HTTP-запроса — ни одного файла на диске:
+# def handle(body: bytes) -> bytes:
+#     with PdfPipeline.open(body) as p:
+#         return p.select("1-10").compress().to_bytes()
@@ -0,0 +1,85 @@
+"""
+Бенчмарк каталога тем: линейный перебор списка против TopicCatalog.query.
+
+Индекс генерируется синтетически (теги, сложность и типы заданий выбираются
+случайно с фиксированным seed), реальный _meta не трогается.
+
+Использование:
+    python scripts/bench_catalog.py
+    python scripts/bench_catalog.py --sizes 10000 100000 --queries 2000
+"""
+
+import argparse
+import random
+import time
+
+from catalog import TopicCatalog
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+QUIZ_TYPES = ["theory", "code_writing", "find_the_bug", "fill_the_gap"]
+TAGS = [f"tag{i}" for i in range(500)]
+
+
+def make_entries(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "slug": f"topic_{i}",
+            "path": f"python/bench/topic_{i}",
+            "title": f"Topic {i}",
+            "difficulty": rng.choice(DIFFICULTIES),
+            "tags": rng.sample(TAGS, 3),
+            "quiz_types": rng.sample(QUIZ_TYPES, 2),
+        }
+        for i in range(n)
+    ]
+
+
+def linear_query(entries: list[dict], tag: str, difficulty: str, quiz_type: str) -> list[dict]:
+    return [
+        e for e in entries
+        if tag in e["tags"] and e["difficulty"] == difficulty and quiz_type in e["quiz_types"]
+    ]
+
+
+def bench(n: int, queries: int, rng: random.Random) -> None:
+    entries = make_entries(n, rng)
+    params = [
+        (rng.choice(TAGS), rng.choice(DIFFICULTIES), rng.choice(QUIZ_TYPES))
+        for _ in range(queries)
+    ]
+
+    start = time.perf_counter()
+    catalog = TopicCatalog(entries)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for tag, difficulty, quiz_type in params:
+        catalog.query([tag], difficulty, quiz_type)
+    indexed = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for tag, difficulty, quiz_type in params:
+        linear_query(entries, tag, difficulty, quiz_type)
+    linear = (time.perf_counter() - start) / queries
+
+    print(
+        f"{n:>8} тем | построение {build * 1e3:8.1f} мс"
+        f" | запрос: каталог {indexed * 1e6:8.1f} мкс"
+        f", перебор {linear * 1e6:9.1f} мкс"
+        f" (x{linear / indexed:.0f})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк TopicCatalog")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for n in args.sizes:
+        bench(n, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Бюджет времени импорта пакета pdftools (python/tools/pdf/pdftools).
+
+CLI-утилиты импортируют pdftools ради одной функции. Импорт не должен тянуть
+pikepdf, Ghostscript, asyncio и т.п., пока функция не вызвана. Скрипт проверяет
+это в новых процессах Python — так, как импорт происходит на самом деле:
+
+    время     медиана по --runs запускам (замер внутри процесса, без старта
+              интерпретатора) должна укладываться в бюджет сценария
+    модули    после импорта в sys.modules не должно быть запрещённых модулей
+
+Нарушение бюджета или запрещённый модуль — код выхода 1, поэтому скрипт можно
+запускать в CI. На медленной машине бюджеты умножаются на --scale.
+
+Использование:
+    python scripts/bench_import.py
+    python scripts/bench_import.py --runs 20 --scale 2
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from index_store import ROOT
+
+PACKAGE_PARENT = ROOT / "python" / "tools" / "pdf"
+
+BACKENDS = ("pikepdf", "ghostscript")
+
+# Сценарий → (бюджет в мс, модули, которых не должно быть после импорта).
+SCENARIOS = {
+    "import pdftools": (10, (*BACKENDS, "asyncio", "subprocess", "concurrent.futures", "tempfile")),
+    "from pdftools import merge_pdfs": (20, (*BACKENDS, "asyncio", "tempfile")),
+    "from pdftools import PdfPipeline": (20, (*BACKENDS, "asyncio")),
+    "from pdftools import compress_pdf": (30, (*BACKENDS, "asyncio")),
+    "from pdftools import optimize_pdf": (20, (*BACKENDS, "asyncio", "subprocess")),
+    "from pdftools import GhostscriptPool": (20, (*BACKENDS, "concurrent.futures")),
+    # asyncio сам по себе стоит десятки миллисекунд — бюджет отдельный.
+    "from pdftools import run_qpdf_async": (150, BACKENDS),
+}
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {parent!r})
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1e3, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def probe(statement: str, forbidden: tuple[str, ...]) -> dict:
+    code = PROBE.format(parent=str(PACKAGE_PARENT), statement=statement, forbidden=list(forbidden))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бюджет времени импорта pdftools")
+    parser.add_argument("--runs", type=int, default=10, help="Запусков на сценарий")
+    parser.add_argument("--scale", type=float, default=1.0, help="Множитель бюджетов")
+    args = parser.parse_args()
+
+    failed = 0
+    for statement, (budget_ms, forbidden) in SCENARIOS.items():
+        budget = budget_ms * args.scale
+        # Первый запуск не считаем: он может компилировать .pyc.
+        probe(statement, forbidden)
+        runs = [probe(statement, forbidden) for _ in range(args.runs)]
+        median = statistics.median(r["ms"] for r in runs)
+        loaded = sorted({m for r in runs for m in r["loaded"]})
+
+        problems = []
+        if median > budget:
+            problems.append(f"дольше бюджета {budget:.0f} мс")
+        if loaded:
+            problems.append(f"загружены: {', '.join(loaded)}")
+        mark = "[!]" if problems else "[OK]"
+        print(f"{mark:<4} {statement:<40} {median:7.2f} мс / {budget:5.0f} мс  {'; '.join(problems)}")
+        failed += bool(problems)
+
+    if failed:
+        print(f"[!] Нарушений: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Бенчмарк PDF-движков из тем python/tools/pdf: pikepdf, CLI qpdf и Ghostscript.
+
+Одна и та же операция выполняется каждым движком, который умеет её делать.
+Замеряются функции пакета pdftools — те же, что вызывают скрипты и темы:
+
+    merge      склейка файлов         pikepdf (merge_pdfs), qpdf (merge_with_qpdf),
+                                      gs (merge_pdfs_with_gs)
+    compress   сжатие                 qpdf (compress_pdf), pikepdf (PdfPipeline.compress),
+                                      gs-ebook и gs-printer (optimize_pdf)
+    split      нарезка по 10 страниц  pikepdf (split_by_specs), qpdf (run_qpdf --split-pages)
+    rotate     поворот всех страниц   pikepdf (rotate_all), qpdf (run_qpdf --rotate)
+    raster     страницы в PNG         gs (pdf_to_png)
+
+Входные PDF синтетические: скрипт пишет их сам, без зависимостей. Число страниц
+и содержимое задаются параметрами: text — страницы текста, image — страницы
+со сжатой картинкой (как у сканов), mixed — через одну.
+
+Каждый запуск выполняется в отдельном процессе, чтобы пиковая память (RSS)
+одной операции не смешивалась с другими. Пик берётся из os.wait4 и включает
+процессы qpdf / gs, запущенные операцией. В отчёт (JSON) попадают медиана и
+минимум времени, пиковая память и размер результата. С --compare отчёт
+сравнивается с прошлым, и при замедлении больше порога скрипт завершается
+с кодом 1 — так его можно запускать в CI.
+
+Движок, которого нет в системе (не установлен pikepdf, нет qpdf в PATH),
+пропускается. Но с --compare операция, измеренная в прошлом отчёте и не
+измеренная сейчас (движка нет или запуск упал), тоже даёт код 1: иначе CI
+без движков всегда проходил бы проверку.
+
+Использование:
+    python scripts/bench_pdf.py
+    python scripts/bench_pdf.py --pages 500 --content image --repeat 5
+    python scripts/bench_pdf.py --ops merge,compress --report new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from index_store import ROOT
+
+sys.path.append(str(ROOT / "python" / "tools" / "pdf"))  # каталог пакета pdftools
+
+# Импорт pdftools ленивый: pikepdf и Ghostscript загружаются при первом вызове.
+from pdftools import (
+    PdfPipeline,
+    available_backends,
+    compress_pdf,
+    merge_pdfs,
+    merge_pdfs_with_gs,
+    merge_with_qpdf,
+    optimize_pdf,
+    page_chunks,
+    pdf_to_png,
+    rotate_all,
+    run_qpdf,
+    split_by_specs,
+)
+
+CONTENT_KINDS = ("text", "image", "mixed")
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua qpdf pikepdf ghostscript").split()
+IMAGE_SIZE = (400, 300)
+SPLIT_SIZE = 10
+
+
+# --- Синтетические PDF ---
+
+def _page_text(rng: random.Random, lines: int = 45) -> bytes:
+    ops = [b"BT /F1 10 Tf 50 800 Td 14 TL"]
+    for _ in range(lines):
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12)))
+        ops.append(f"({line}) '".encode("ascii"))
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def _gradient(width: int, height: int) -> bytes:
+    row = bytes((x * 255 // width) for x in range(width) for _ in range(3))
+    return b"".join(row[y % len(row):] + row[:y % len(row)] for y in range(height))
+
+
+def make_pdf(path: Path, pages: int, content: str = "text", seed: int = 0) -> None:
+    """Записать PDF из pages страниц. Потоки текста не сжаты — compress есть что сжимать."""
+    if content not in CONTENT_KINDS:
+        raise ValueError(f"unknown content {content!r}, expected one of {CONTENT_KINDS}")
+    rng = random.Random(seed)
+    width, height = IMAGE_SIZE
+    image = _gradient(width, height)
+
+    # Объекты 1 — каталог, 2 — дерево страниц, 3 — шрифт; дальше по 2–3 объекта на страницу.
+    objects: list[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for n in range(pages):
+        with_image = content == "image" or (content == "mixed" and n % 2)
+        resources = "/Font << /F1 3 0 R >>"
+        stream = _page_text(rng, 45 if not with_image else 5)
+        if with_image:
+            shift = n * 3 % len(image)
+            data = zlib.compress(image[shift:] + image[:shift], 6)
+            objects.append(
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceRGB "
+                f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode("ascii")
+                + data + b"\nendstream"
+            )
+            resources += f" /XObject << /Im1 {len(objects)} 0 R >>"
+            stream += b"\nq 500 0 0 375 50 100 cm /Im1 Do Q"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("ascii") + stream + b"\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << {resources} >> "
+            f"/Contents {len(objects)} 0 R >>".encode("ascii")
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += b"".join(f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    path.write_bytes(out)
+
+
+# --- Операции: функции pdftools. Движки импортируются в рабочем процессе ---
+
+# Замеряются те же функции, что вызывают скрипты и темы, — регрессия в pdftools
+# видна в отчёте. Адаптер лишь приводит вызов к виду (inputs, out, pages).
+
+def split_pikepdf(inputs: list[str], out: str, pages: int) -> None:
+    os.makedirs(out)
+    split_by_specs(inputs[0], page_chunks(pages, SPLIT_SIZE, os.path.join(out, "part-{:04d}.pdf")))
+
+
+def split_qpdf(inputs: list[str], out: str, pages: int) -> None:
+    os.makedirs(out)
+    run_qpdf([f"--split-pages={SPLIT_SIZE}", inputs[0], os.path.join(out, "part-%d.pdf")])
+
+
+def compress_pikepdf(inputs: list[str], out: str, pages: int) -> None:
+    with PdfPipeline.open(inputs[0]) as pipeline:
+        pipeline.compress().save(out)
+
+
+def raster_gs(inputs: list[str], out: str, pages: int) -> None:
+    os.makedirs(out)
+    pdf_to_png(inputs[0], os.path.join(out, "page-%04d.png"), dpi=72)
+
+
+OPERATIONS = {
+    "merge": {
+        "pikepdf": lambda inputs, out, pages: merge_pdfs(inputs, out),
+        "qpdf": lambda inputs, out, pages: merge_with_qpdf(inputs, out),
+        "gs": lambda inputs, out, pages: merge_pdfs_with_gs(inputs, out),
+    },
+    "compress": {
+        "qpdf": lambda inputs, out, pages: compress_pdf(inputs[0], out),
+        "pikepdf": compress_pikepdf,
+        "gs-ebook": lambda inputs, out, pages: optimize_pdf(inputs[0], out, settings="/ebook"),
+        "gs-printer": lambda inputs, out, pages: optimize_pdf(inputs[0], out, settings="/printer"),
+    },
+    "split": {"pikepdf": split_pikepdf, "qpdf": split_qpdf},
+    "rotate": {
+        "pikepdf": lambda inputs, out, pages: rotate_all(inputs[0], out, 90),
+        "qpdf": lambda inputs, out, pages: run_qpdf(["--rotate=+90", inputs[0], out]),
+    },
+    "raster": {"gs": raster_gs},
+}
+
+
+def backend_available(backend: str) -> bool:
+    # Ничего не импортирует; каталог темы ghostscript/ не принимается за модуль.
+    return available_backends()["ghostscript" if backend.startswith("gs") else backend]
+
+
+def tool_versions() -> dict[str, str | None]:
+    versions: dict[str, str | None] = {"python": platform.python_version()}
+    try:
+        versions["qpdf"] = subprocess.run(["qpdf", "--version"], capture_output=True, text=True).stdout.split("\n")[0]
+    except FileNotFoundError:
+        versions["qpdf"] = None
+    try:
+        from importlib.metadata import version
+        versions["pikepdf"] = version("pikepdf")
+    except Exception:
+        versions["pikepdf"] = None
+    return versions
+
+
+def output_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+# --- Замер: один запуск — один процесс ---
+
+def worker(payload: str) -> None:
+    """Выполняется в дочернем процессе: только операция, без старта интерпретатора."""
+    task = json.loads(payload)
+    func = OPERATIONS[task["op"]][task["backend"]]
+    if task["backend"].startswith("gs"):
+        import pdftools.gs
+
+        # Ghostscript работает в этом процессе и пишет баннер и «Page N» в его stdout.
+        pdftools.gs.GS_BASE_ARGS = (*pdftools.gs.GS_BASE_ARGS, "-q")
+    start = time.perf_counter()
+    func(task["inputs"], task["out"], task["pages"])
+    # Результат — в отдельный файл: stdout принадлежит движкам, а не бенчмарку.
+    Path(task["result"]).write_text(json.dumps({"seconds": time.perf_counter() - start}), encoding="utf-8")
+
+
+def measure(op: str, backend: str, inputs: list[str], out: Path, pages: int) -> dict:
+    """Запустить операцию в новом процессе. Время — изнутри процесса, память — из wait4."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = Path(tmp) / "result.json"
+        payload = json.dumps({"op": op, "backend": backend, "inputs": inputs, "out": str(out), "pages": pages,
+                              "result": str(result)})
+        # stderr — во временный файл, а не в pipe: процесс не зависнет на заполненном pipe,
+        # пока мы ждём его в wait4.
+        with open(Path(tmp) / "stderr.txt", "w+", encoding="utf-8", errors="replace") as stderr_file:
+            proc = subprocess.Popen([sys.executable, __file__, "--worker", payload],
+                                    stdout=subprocess.DEVNULL, stderr=stderr_file)
+            # wait4 вместо proc.wait(): вместе с кодом выхода он отдаёт ресурсы процесса.
+            # ru_maxrss включает дождавшихся потомков (qpdf, gs) — в КиБ на Linux, в байтах на macOS.
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+        if proc.returncode != 0:
+            raise RuntimeError(stderr.strip().splitlines()[-1] if stderr.strip() else f"exit code {proc.returncode}")
+        seconds = json.loads(result.read_text(encoding="utf-8"))["seconds"]
+    peak_kib = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {"seconds": seconds, "peak_rss_kib": peak_kib, "output_bytes": output_size(out)}
+
+
+def run_suite(ops: list[str], pages: int, content: str, merge_files: int, repeat: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        document = work / "document.pdf"
+        make_pdf(document, pages, content)
+        parts = []
+        for i in range(merge_files):
+            part = work / f"part-{i:03d}.pdf"
+            make_pdf(part, max(1, pages // merge_files), content, seed=i + 1)
+            parts.append(str(part))
+
+        for op in ops:
+            inputs = parts if op == "merge" else [str(document)]
+            input_bytes = sum(os.path.getsize(p) for p in inputs)
+            for backend in OPERATIONS[op]:
+                row = {"op": op, "backend": backend, "pages": pages, "content": content, "input_bytes": input_bytes}
+                if not backend_available(backend):
+                    print(f"[~] {op:<9} {backend:<11} нет в системе — пропущено")
+                    results.append({**row, "status": "unavailable"})
+                    continue
+                runs = []
+                try:
+                    for n in range(repeat):
+                        out = work / f"out-{op}-{backend}-{n}"
+                        runs.append(measure(op, backend, inputs, out, pages))
+                        if out.is_dir():
+                            shutil.rmtree(out)
+                        else:
+                            out.unlink(missing_ok=True)
+                except Exception as e:
+                    print(f"[!] {op:<9} {backend:<11} {type(e).__name__}: {e}")
+                    results.append({**row, "status": "failed", "error": str(e)})
+                    continue
+                seconds = [r["seconds"] for r in runs]
+                row.update(
+                    status="ok",
+                    median_seconds=statistics.median(seconds),
+                    min_seconds=min(seconds),
+                    peak_rss_kib=max(r["peak_rss_kib"] for r in runs),
+                    output_bytes=runs[-1]["output_bytes"],
+                )
+                results.append(row)
+                print(f"{op:<9} {backend:<11} {row['median_seconds'] * 1e3:10.1f} мс "
+                      f"{row['peak_rss_kib'] / 1024:8.1f} МиБ {row['output_bytes'] / 2**20:8.2f} МиБ")
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """Операции, которые стали медленнее baseline больше чем на threshold (0.2 = 20 %)."""
+    old = {(r["op"], r["backend"]): r for r in baseline if r.get("status") == "ok"}
+    regressions = []
+    for row in results:
+        before = old.get((row["op"], row["backend"]))
+        if row.get("status") != "ok" or before is None:
+            continue
+        ratio = row["median_seconds"] / before["median_seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{row['op']} {row['backend']}: {before['median_seconds'] * 1e3:.1f} мс → "
+                               f"{row['median_seconds'] * 1e3:.1f} мс (x{ratio:.2f})")
+    return regressions
+
+
+def unmeasured(results: list[dict], baseline: list[dict]) -> list[str]:
+    """Операции, измеренные в baseline, но не измеренные сейчас (движка нет или запуск упал)."""
+    now = {(r["op"], r["backend"]): r for r in results}
+    ops = {r["op"] for r in results}
+    missing = []
+    for before in baseline:
+        key = (before["op"], before["backend"])
+        if before.get("status") != "ok" or before["op"] not in ops:
+            continue
+        status = now[key]["status"] if key in now else "absent"
+        if status != "ok":
+            missing.append(f"{key[0]} {key[1]}: {status}")
+    return missing
+
+
+def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        worker(sys.argv[2])
+        return
+
+    parser = argparse.ArgumentParser(description="Бенчмарк PDF-движков")
+    parser.add_argument("--ops", default=",".join(OPERATIONS), help=f"Через запятую из: {', '.join(OPERATIONS)}")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--content", choices=CONTENT_KINDS, default="mixed")
+    parser.add_argument("--merge-files", type=int, default=20, help="Сколько файлов склеивать в merge")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--report", default="bench_pdf.json", help="Куда записать отчёт (JSON)")
+    parser.add_argument("--compare", metavar="OLD_REPORT", help="Сравнить с прошлым отчётом")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимое замедление (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    ops = args.ops.split(",")
+    unknown = sorted(set(ops) - set(OPERATIONS))
+    if unknown:
+        parser.error(f"неизвестные операции: {', '.join(unknown)}")
+
+    results = run_suite(ops, args.pages, args.content, args.merge_files, args.repeat)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "versions": tool_versions(),
+        "params": {"pages": args.pages, "content": args.content, "merge_files": args.merge_files,
+                   "repeat": args.repeat},
+        "results": results,
+    }
+    Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Отчёт: {args.report}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        missing = unmeasured(results, baseline)
+        for line in regressions:
+            print(f"[!] Замедление: {line}")
+        for line in missing:
+            print(f"[!] Не измерено: {line}")
+        measured = any(r["status"] == "ok" for r in results)
+        if not measured:
+            print("[!] Ни одна операция не измерена — сравнивать нечего")
+        if regressions or missing or not measured:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Бенчмарк полнотекстового поиска на синтетическом корпусе.
+
+Во временном каталоге создаются N тем (.md + .py со случайным русским
+и английским текстом), по ним строится SearchIndex, затем измеряются:
+построение, сохранение, загрузка, время запроса и инкрементальное
+обновление после правки нескольких тем.
+
+Использование:
+    python scripts/bench_search.py
+    python scripts/bench_search.py --topics 50000 --queries 500
+"""
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from search import SearchIndex
+
+RU_SYLLABLES = ["ка", "ре", "ми", "то", "на", "ло", "се", "ви", "дру", "ст", "пол", "ни"]
+EN_SYLLABLES = ["de", "fun", "ra", "lis", "to", "com", "pre", "hen", "sion", "var", "get", "set"]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = set()
+    while len(words) < size:
+        syllables = RU_SYLLABLES if rng.random() < 0.6 else EN_SYLLABLES
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_corpus(root: Path, topics: int, rng: random.Random) -> list[str]:
+    vocabulary = make_vocabulary(rng, 20_000)
+    # Zipf-подобное распределение: частые слова встречаются часто.
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    for i in range(topics):
+        topic_dir = root / "python" / f"section{i % 100}" / f"topic_{i}"
+        topic_dir.mkdir(parents=True)
+        md_words = rng.choices(vocabulary, cum_weights=cum_weights, k=200)
+        py_words = rng.choices(vocabulary, cum_weights=cum_weights, k=80)
+        (topic_dir / "meta.json").write_text("{}", encoding="utf-8")
+        (topic_dir / f"topic_{i}.md").write_text(
+            "## Что это такое\n\n" + " ".join(md_words) + "\n", encoding="utf-8",
+        )
+        (topic_dir / f"topic_{i}.py").write_text(
+            "# --- Пример 1: ---\n" + "\n".join(f"{w} = 1  # {w}" for w in py_words), encoding="utf-8",
+        )
+    return vocabulary
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1e3:10.1f} мс")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк SearchIndex")
+    parser.add_argument("--topics", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        vocabulary = timed(f"Генерация корпуса ({args.topics} тем)", lambda: make_corpus(root, args.topics, rng))
+        index_path = root / "_meta" / "search_index.json"
+
+        index = SearchIndex(root, index_path)
+        timed("Построение индекса", index.update)
+        timed("Сохранение индекса", index.save)
+        index = timed("Загрузка индекса", lambda: SearchIndex(root, index_path))
+        timed("update() без изменений", index.update)
+
+        queries = [" ".join(rng.sample(vocabulary[:5000], 2)) for _ in range(args.queries)]
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        per_query = (time.perf_counter() - start) / len(queries)
+        print(f"{'Запрос из 2 слов (среднее)':<36} {per_query * 1e3:10.2f} мс")
+
+        for i in rng.sample(range(args.topics), 10):
+            md = root / "python" / f"section{i % 100}" / f"topic_{i}" / f"topic_{i}.md"
+            md.write_text(md.read_text(encoding="utf-8") + " новоеслово\n", encoding="utf-8")
+        timed("update() после правки 10 тем", index.update)
+
+
+if __name__ == "__main__":
+    main()
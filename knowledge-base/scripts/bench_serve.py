@@ -0,0 +1,228 @@
+"""
+Нагрузочный тест сервера запросов (scripts/serve.py).
+
+Скрипт запускает локальный сервер на свободном порту (или подключается
+к уже запущенному через --url / --unix), открывает --connections соединений
+keep-alive и в течение --duration секунд шлёт смесь запросов, как бот:
+
+    40%  GET /topics/<путь>
+    30%  GET /topics/<путь>/sections/<раздел>
+    20%  GET /quiz?quiz_type=..&difficulty=..
+    10%  GET /topics?difficulty=..
+
+Доля --revalidate повторных запросов отправляется с If-None-Match
+(ETag из прошлого ответа) и должна получать 304.
+
+Печатает запросов в секунду, задержки (p50, p90, p99), распределение статусов
+и долю попаданий в кэш сервера (по /stats). Клиенты работают в --processes
+процессах на той же машине и делят с сервером процессор, так что это нижняя
+оценка пропускной способности. С --min-rps код выхода 1, если сервер
+не дотянул до порога, — для CI.
+
+Использование:
+    python scripts/bench_serve.py
+    python scripts/bench_serve.py --connections 100 --duration 20 --min-rps 2000
+    python scripts/bench_serve.py --url 127.0.0.1:8765
+    python scripts/bench_serve.py --unix /tmp/kb.sock
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from sections import COMMON_MISTAKES, KEY_CONCEPTS, SELF_CHECK, WHAT_IS_IT
+
+SERVER = Path(__file__).with_name("serve.py")
+
+SECTIONS = (WHAT_IS_IT, KEY_CONCEPTS, COMMON_MISTAKES, SELF_CHECK)
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Вид запроса → доля в смеси.
+MIX = {"topic": 0.4, "section": 0.3, "quiz": 0.2, "list": 0.1}
+
+
+async def connect(address: tuple[str, int] | str):
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def request(reader, writer, target: str, etag: str | None = None) -> tuple[int, dict, bytes]:
+    """Один запрос по открытому соединению. Возвращает (статус, заголовки, тело)."""
+    extra = f"If-None-Match: {etag}\r\n" if etag else ""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: kb\r\n{extra}\r\n".encode("latin-1"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return int(status_line.split(" ")[1]), headers, body
+
+
+async def fetch_json(address, target: str) -> dict:
+    reader, writer = await connect(address)
+    try:
+        status, _, body = await request(reader, writer, target)
+    finally:
+        writer.close()
+    if status != 200:
+        raise RuntimeError(f"GET {target}: HTTP {status}")
+    return json.loads(body)
+
+
+def make_targets(topics: list[dict], count: int, rng: random.Random) -> list[str]:
+    """Смесь запросов по MIX на темы, которые знает сервер."""
+    targets = []
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=count)
+    for kind in kinds:
+        topic = rng.choice(topics)
+        path = quote(topic["path"])
+        if kind == "topic":
+            targets.append(f"/topics/{path}")
+        elif kind == "section":
+            targets.append(f"/topics/{path}/sections/{quote(rng.choice(SECTIONS))}")
+        elif kind == "quiz":
+            quiz_type = rng.choice(topic.get("quiz_types") or ["theory"])
+            targets.append(f"/quiz?quiz_type={quiz_type}&difficulty={topic.get('difficulty', 'medium')}")
+        else:
+            targets.append(f"/topics?difficulty={rng.choice(DIFFICULTIES)}")
+    return targets
+
+
+async def client(address, targets: list[str], deadline: float, revalidate: float, rng: random.Random,
+                 latencies: list[float], statuses: Counter) -> None:
+    reader, writer = await connect(address)
+    etags: dict[str, str] = {}
+    try:
+        while time.perf_counter() < deadline:
+            target = rng.choice(targets)
+            etag = etags.get(target) if rng.random() < revalidate else None
+            start = time.perf_counter()
+            status, headers, _ = await request(reader, writer, target, etag)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if "etag" in headers:
+                etags[target] = headers["etag"]
+    finally:
+        writer.close()
+
+
+def run_clients(address, targets: list[str], connections: int, duration: float, revalidate: float,
+                seed: int) -> tuple[list[float], Counter]:
+    """Процесс-клиент: connections соединений в одном цикле событий."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def run() -> None:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            client(address, targets, deadline, revalidate, random.Random(seed * 1000 + i), latencies, statuses)
+            for i in range(connections)
+        ))
+
+    asyncio.run(run())
+    return latencies, statuses
+
+
+def start_server() -> tuple[subprocess.Popen, tuple[str, int]]:
+    proc = subprocess.Popen([sys.executable, str(SERVER), "--port", "0"], stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    match = re.search(r"http://([\d.]+):(\d+)", line)
+    if not match:
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line.strip()!r}")
+    print(line.strip())
+    return proc, (match.group(1), int(match.group(2)))
+
+
+def parse_url(url: str) -> tuple[str, int]:
+    host, _, port = url.removeprefix("http://").rstrip("/").rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест scripts/serve.py")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Уже запущенный сервер: host:port")
+    target.add_argument("--unix", metavar="PATH", help="Уже запущенный сервер на Unix-сокете")
+    parser.add_argument("--connections", type=int, default=64, help="Соединений всего")
+    parser.add_argument("--processes", type=int, default=2, help="Процессов-клиентов")
+    parser.add_argument("--duration", type=float, default=10.0, help="Секунд нагрузки")
+    parser.add_argument("--revalidate", type=float, default=0.3, help="Доля запросов с If-None-Match")
+    parser.add_argument("--min-rps", type=float, help="Порог запросов в секунду (код выхода 1)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    proc = None
+    if args.unix:
+        address = args.unix
+    elif args.url:
+        address = parse_url(args.url)
+    else:
+        proc, address = start_server()
+
+    try:
+        topics = asyncio.run(fetch_json(address, "/topics"))["topics"]
+        if not topics:
+            print("[!] В базе нет тем")
+            sys.exit(1)
+        targets = make_targets(topics, 1000, random.Random(args.seed))
+        before = asyncio.run(fetch_json(address, "/stats"))
+
+        processes = max(1, min(args.processes, args.connections))
+        per_process = [args.connections // processes + (i < args.connections % processes) for i in range(processes)]
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(run_clients, address, targets, n, args.duration, args.revalidate, args.seed + i)
+                for i, n in enumerate(per_process)
+            ]
+            for future in futures:
+                part_latencies, part_statuses = future.result()
+                latencies += part_latencies
+                statuses += part_statuses
+
+        after = asyncio.run(fetch_json(address, "/stats"))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    total = len(latencies)
+    rps = total / args.duration
+    p = statistics.quantiles(latencies, n=100) if total > 1 else [latencies[0] if latencies else 0.0] * 99
+    hits = after["cache"]["hits"] - before["cache"]["hits"]
+    misses = after["cache"]["misses"] - before["cache"]["misses"]
+
+    print(f"Соединений: {args.connections} в {processes} процессах, {args.duration:g} с")
+    print(f"  запросов:        {total} ({rps:,.0f} в секунду)")
+    print(f"  задержка p50:    {p[49] * 1e3:.2f} мс")
+    print(f"  задержка p90:    {p[89] * 1e3:.2f} мс")
+    print(f"  задержка p99:    {p[98] * 1e3:.2f} мс")
+    print(f"  статусы:         {', '.join(f'{s}: {n}' for s, n in sorted(statuses.items()))}")
+    if hits + misses:
+        print(f"  кэш сервера:     {hits / (hits + misses):.1%} попаданий")
+
+    if args.min_rps is not None:
+        if rps < args.min_rps:
+            print(f"[!] {rps:,.0f} запросов в секунду — меньше порога {args.min_rps:,.0f}")
+            sys.exit(1)
+        print(f"[OK] Не меньше {args.min_rps:,.0f} запросов в секунду")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк старта бота: обход дерева тем против бинарного снимка.
+
+На синтетическом корпусе (см. bench_search.make_corpus) сравнивается одна
+и та же работа двумя способами:
+
+    всё содержимое   обход: topics_index.json, затем meta.json, <slug>.md
+                     и <slug>.py каждой темы (как бот делает сейчас);
+                     снимок: открыть kb.snapshot и скопировать те же файлы
+                     всех тем в bytes
+    одна тема        <slug>.md случайной темы: с диска против среза снимка
+
+Отдельной строкой — открытие снимка без чтения содержимого. Это не та же
+работа, что обход: так стартует бот, который читает темы по запросу,
+и обход с таким стартом сравнивать нельзя.
+
+Использование:
+    python scripts/bench_snapshot.py
+    python scripts/bench_snapshot.py --topics 50000
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from bench_search import make_corpus
+from snapshot import KnowledgeSnapshot, build_snapshot, topic_files
+
+
+def walk_startup(root: Path, index_path: Path) -> dict[str, list[bytes]]:
+    entries = json.loads(index_path.read_text(encoding="utf-8"))
+    return {
+        entry["path"]: [f.read_bytes() for f in topic_files(root, entry["path"]) if f.exists()]
+        for entry in entries
+    }
+
+
+def snapshot_startup(snapshot_path: Path) -> dict[str, list[bytes]]:
+    with KnowledgeSnapshot(snapshot_path) as snapshot:
+        contents = {}
+        for entry in snapshot.entries:
+            path = entry["path"]
+            blobs = [snapshot.meta_blob(path), snapshot.document(path), snapshot.example(path)]
+            contents[path] = [bytes(blob) for blob in blobs if blob is not None]
+            for blob in blobs:
+                if blob is not None:
+                    blob.release()
+        return contents
+
+
+def report(label: str, seconds: float, unit: str = "мс") -> None:
+    scale = 1e3 if unit == "мс" else 1e6
+    print(f"{label:<40} {seconds * scale:10.2f} {unit}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк kb.snapshot")
+    parser.add_argument("--topics", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_corpus(root, args.topics, rng)
+        entries = [
+            {"slug": f"topic_{i}", "path": f"python/section{i % 100}/topic_{i}", "title": f"Topic {i}",
+             "difficulty": "medium", "tags": [], "quiz_types": ["theory"]}
+            for i in range(args.topics)
+        ]
+        index_path = root / "_meta" / "topics_index.json"
+        index_path.parent.mkdir()
+        index_path.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        snapshot_path = root / "_meta" / "kb.snapshot"
+        start = time.perf_counter()
+        size = build_snapshot(entries, root, snapshot_path)
+        report("Сборка снимка", time.perf_counter() - start)
+        print(f"  размер снимка: {size / 2**20:.1f} МиБ")
+
+        print("Всё содержимое всех тем:")
+        start = time.perf_counter()
+        walked = walk_startup(root, index_path)
+        report("  обход дерева", time.perf_counter() - start)
+        start = time.perf_counter()
+        loaded = snapshot_startup(snapshot_path)
+        report("  снимок", time.perf_counter() - start)
+        if loaded != walked:
+            raise RuntimeError("snapshot content differs from the topic files")
+
+        print("Ленивый старт (содержимое не читается, сравнивать с обходом нельзя):")
+        start = time.perf_counter()
+        snapshot = KnowledgeSnapshot(snapshot_path)
+        report("  открыть снимок", time.perf_counter() - start)
+
+        print("Документ одной темы:")
+        paths = [rng.choice(entries)["path"] for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for path in paths:
+            topic_files(root, path)[1].read_bytes()
+        report("  с диска", (time.perf_counter() - start) / len(paths), "мкс")
+        start = time.perf_counter()
+        for path in paths:
+            document = snapshot.document(path)
+            bytes(document)
+            document.release()
+        report("  из снимка (копия в bytes)", (time.perf_counter() - start) / len(paths), "мкс")
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
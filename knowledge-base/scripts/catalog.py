@@ -0,0 +1,106 @@
+"""
+Каталог тем в памяти с инвертированными индексами.
+
+Строится один раз из индекса тем (снимок + журнал, см. scripts/index_store.py)
+и отвечает на комбинированные запросы без перебора всего списка:
+
+    catalog = TopicCatalog.load()
+    catalog.get("functions")
+    catalog.query(tags=["closures"], difficulty="medium", quiz_type="find_the_bug")
+
+Каждое значение поля (тег, сложность, тип задания) указывает на множество
+номеров тем. Запрос пересекает множества, начиная с самого маленького, поэтому
+его стоимость определяется самым редким условием, а не числом тем в базе.
+
+Использование:
+    python scripts/catalog.py --tag closures --difficulty medium --quiz-type find_the_bug
+"""
+
+import argparse
+from collections import defaultdict
+from collections.abc import Iterable
+
+from index_store import IndexStore
+
+
+class TopicCatalog:
+    def __init__(self, entries: Iterable[dict]) -> None:
+        self.entries: list[dict] = list(entries)
+        self.by_slug: dict[str, list[int]] = defaultdict(list)
+        self.by_path: dict[str, int] = {}
+        self.by_tag: dict[str, set[int]] = defaultdict(set)
+        self.by_difficulty: dict[str, set[int]] = defaultdict(set)
+        self.by_quiz_type: dict[str, set[int]] = defaultdict(set)
+
+        for i, entry in enumerate(self.entries):
+            self.by_slug[entry["slug"]].append(i)
+            self.by_path[entry["path"]] = i
+            for tag in entry.get("tags", []):
+                self.by_tag[tag].add(i)
+            self.by_difficulty[entry.get("difficulty", "medium")].add(i)
+            for quiz_type in entry.get("quiz_types", []):
+                self.by_quiz_type[quiz_type].add(i)
+
+    @classmethod
+    def load(cls, store: IndexStore | None = None) -> "TopicCatalog":
+        return cls((store or IndexStore()).load())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, slug: str) -> dict | None:
+        """Тема по slug. Если slug встречается в нескольких языках — первая."""
+        positions = self.by_slug.get(slug)
+        return self.entries[positions[0]] if positions else None
+
+    def get_by_path(self, path: str) -> dict | None:
+        i = self.by_path.get(path)
+        return None if i is None else self.entries[i]
+
+    def query(
+        self,
+        tags: Iterable[str] = (),
+        difficulty: str | None = None,
+        quiz_type: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Темы, удовлетворяющие всем условиям сразу (логическое И).
+
+        Без условий возвращает все темы. Порядок — порядок тем в индексе.
+        """
+        candidates = [self.by_tag.get(tag, set()) for tag in tags]
+        if difficulty is not None:
+            candidates.append(self.by_difficulty.get(difficulty, set()))
+        if quiz_type is not None:
+            candidates.append(self.by_quiz_type.get(quiz_type, set()))
+
+        if not candidates:
+            found = range(len(self.entries))
+        else:
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for other in candidates[1:]:
+                if not result:
+                    break
+                result &= other
+            found = sorted(result)
+
+        if limit is not None:
+            found = found[:limit]
+        return [self.entries[i] for i in found]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Поиск тем в каталоге Knowledge Base")
+    parser.add_argument("--tag", action="append", default=[], help="Тег (можно несколько раз)")
+    parser.add_argument("--difficulty", help="easy, medium, hard")
+    parser.add_argument("--quiz-type", help="theory, code_writing, find_the_bug, fill_the_gap")
+    args = parser.parse_args()
+
+    catalog = TopicCatalog.load()
+    for entry in catalog.query(args.tag, args.difficulty, args.quiz_type):
+        print(f"{entry['path']:<40} {entry.get('difficulty', ''):<8} {entry.get('title', '')}")
+
+
+if __name__ == "__main__":
+    main()
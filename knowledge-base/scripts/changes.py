@@ -0,0 +1,128 @@
+"""
+Лента изменений базы знаний для долгоживущих процессов (бот, scripts/serve.py).
+
+    _meta/changes.jsonl
+
+scripts/watch.py дописывает в неё строку после каждой применённой пачки правок:
+
+    {"time": ..., "changed": ["python/basics/functions"], "removed": []}
+    {"time": ..., "reset": true}     — перечитать всё: watch.py только что
+                                        запущен или лента начата заново
+
+Индекс и кэши в _meta к этому моменту уже обновлены — читателю остаётся
+перечитать нужные темы. ChangeFeed.poll() стоит один stat(), пока лента
+не изменилась, поэтому его можно вызывать хоть каждую секунду.
+
+Лента ограничена по размеру: при переполнении она заменяется новым файлом,
+который начинается с записи reset. Читатель замечает новый inode и читает
+новый файл с начала.
+
+Использование:
+    python scripts/changes.py            # печатать изменения по мере появления
+    python scripts/changes.py --all      # с начала ленты
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from index_store import META_DIR, atomic_write_text, file_size
+
+FEED_PATH = META_DIR / "changes.jsonl"
+MAX_FEED_BYTES = 1024 * 1024
+
+
+def publish(record: dict, path: Path = FEED_PATH) -> None:
+    """Дописать запись в ленту (одним write в режиме append)."""
+    line = json.dumps({"time": time.time(), **record}, ensure_ascii=False) + "\n"
+    if file_size(path) + len(line) > MAX_FEED_BYTES:
+        reset = json.dumps({"time": time.time(), "reset": True}) + "\n"
+        atomic_write_text(path, reset + line)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line)
+
+
+class ChangeFeed:
+    """Читатель ленты: помнит inode и смещение, poll() отдаёт новые записи."""
+
+    def __init__(self, path: Path = FEED_PATH, from_start: bool = False) -> None:
+        self.path = path
+        self._inode: int | None = None
+        self._offset = 0
+        if not from_start:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return
+            self._inode, self._offset = st.st_ino, st.st_size
+
+    def poll(self) -> list[dict]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # Новый файл: лента создана или начата заново.
+            self._inode, self._offset = st.st_ino, 0
+        if st.st_size == self._offset:
+            return []
+
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Недописанную последнюю строку оставляем на следующий poll().
+        complete, newline, _ = data.rpartition(b"\n")
+        self._offset += len(complete) + len(newline)
+        records = []
+        for line in complete.splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+
+def merge(records: list[dict]) -> tuple[set[str], set[str], bool]:
+    """Свести записи к (изменённые темы, удалённые темы, нужно ли перечитать всё)."""
+    changed: set[str] = set()
+    removed: set[str] = set()
+    for record in records:
+        if record.get("reset"):
+            return set(), set(), True
+        for topic in record.get("changed", []):
+            changed.add(topic)
+            removed.discard(topic)
+        for topic in record.get("removed", []):
+            removed.add(topic)
+            changed.discard(topic)
+    return changed, removed, False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Следить за лентой изменений Knowledge Base")
+    parser.add_argument("--all", action="store_true", help="Начать с начала ленты")
+    parser.add_argument("--interval", type=float, default=1.0, help="Период опроса, с")
+    args = parser.parse_args()
+
+    feed = ChangeFeed(from_start=args.all)
+    try:
+        while True:
+            for record in feed.poll():
+                stamp = time.strftime("%H:%M:%S", time.localtime(record.get("time", 0)))
+                if record.get("reset"):
+                    print(f"{stamp} [~] перечитать всё")
+                for topic in record.get("changed", []):
+                    print(f"{stamp} [OK] {topic}")
+                for topic in record.get("removed", []):
+                    print(f"{stamp} [-] {topic}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
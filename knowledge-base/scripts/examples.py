@@ -0,0 +1,63 @@
+"""
+Разбор файлов примеров <slug>.py на блоки «Пример N».
+
+Блок начинается с заголовка-комментария и длится до следующего заголовка:
+
+    # --- Пример 6: find_the_bug - Неправильное расположение if-else ---
+    # --- Пример 1: Копирование PDF «как есть» ---
+    # Пример 5
+    # Пример 1. PS → PDF (классический ps2pdf)
+
+Если после номера идёт тип задания для бота (find_the_bug, fill_the_gap,
+code_writing, theory), он выделяется в поле quiz_type.
+"""
+
+import re
+from dataclasses import dataclass
+
+QUIZ_TYPES = ("theory", "code_writing", "find_the_bug", "fill_the_gap")
+
+HEADER_RE = re.compile(r"^#\s*(?:-{3}\s*)?Пример\s+(\d+)\s*[:.]?\s*(.*?)\s*(?:-{3})?\s*$")
+QUIZ_TITLE_RE = re.compile(r"^(" + "|".join(QUIZ_TYPES) + r")\b\s*[-—:]?\s*(.*)$")
+
+
+@dataclass
+class ExampleBlock:
+    number: int
+    title: str
+    quiz_type: str | None
+    first_line: int       # номер строки заголовка, с 1
+    lines: list[str]      # строки блока без заголовка
+
+    @property
+    def source(self) -> str:
+        return "\n".join(self.lines).strip("\n") + "\n"
+
+    @property
+    def has_code(self) -> bool:
+        return any(line.strip() and not line.lstrip().startswith("#") for line in self.lines)
+
+
+def split_examples(text: str) -> list[ExampleBlock]:
+    """Блоки примеров по порядку. Текст до первого заголовка не входит ни в один блок.
+
+    Пустой заголовок, за которым сразу идёт другой заголовок (как «# --- Пример 1: ---»
+    перед «# Пример 1. PS → PDF»), отдельным блоком не считается.
+    """
+    blocks: list[ExampleBlock] = []
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        match = HEADER_RE.match(line.strip())
+        if match is None:
+            if blocks:
+                blocks[-1].lines.append(line)
+            continue
+        if blocks and not any(l.strip() for l in blocks[-1].lines):
+            blocks.pop()
+
+        title = match.group(2)
+        quiz_type = None
+        quiz_match = QUIZ_TITLE_RE.match(title)
+        if quiz_match:
+            quiz_type, title = quiz_match.group(1), quiz_match.group(2)
+        blocks.append(ExampleBlock(int(match.group(1)), title, quiz_type, lineno, []))
+    return blocks
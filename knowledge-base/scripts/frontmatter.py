@@ -0,0 +1,63 @@
+"""
+Разбор frontmatter в начале <slug>.md.
+
+Формат — упрощённый YAML, ровно такой, какой пишет new_topic.py:
+
+    ---
+    title: "Функции"
+    difficulty: easy
+    tags: [functions, args, kwargs]
+    added: "2026-02-18"
+    last_reviewed: null
+    ---
+
+Поддерживаются строки (в кавычках и без), списки в квадратных скобках,
+null/true/false и целые числа. Вложенные структуры не поддерживаются.
+"""
+
+FENCE = "---"
+
+
+def split_frontmatter(text: str) -> tuple[dict, int]:
+    """Frontmatter и позиция (в символах), с которой начинается тело документа.
+
+    Если frontmatter нет — пустой словарь и 0.
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines or lines[0].strip() != FENCE:
+        return {}, 0
+
+    offset = len(lines[0])
+    fields: dict = {}
+    for line in lines[1:]:
+        offset += len(line)
+        if line.strip() == FENCE:
+            return fields, offset
+        key, sep, value = line.partition(":")
+        if sep and key.strip():
+            fields[key.strip()] = parse_value(value.strip())
+    # Нет закрывающей черты — считаем, что frontmatter нет.
+    return {}, 0
+
+
+def parse_frontmatter(text: str) -> dict:
+    return split_frontmatter(text)[0]
+
+
+def parse_value(raw: str):
+    if raw.startswith("[") and raw.endswith("]"):
+        inner = raw[1:-1].strip()
+        return [_unquote(item.strip()) for item in inner.split(",") if item.strip()] if inner else []
+    if raw in ("null", "~", ""):
+        return None
+    if raw in ("true", "false"):
+        return raw == "true"
+    if raw.lstrip("-").isdigit():
+        return int(raw)
+    return _unquote(raw)
+
+
+def _unquote(raw: str) -> str:
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        return raw[1:-1]
+    return raw
@@ -0,0 +1,238 @@
+"""
+Хранилище индекса тем: снимок + журнал изменений.
+
+    _meta/topics_index.json    — снимок: список тем (формат не изменился)
+    _meta/topics_index.jsonl   — журнал: одна JSON-запись на строку
+
+Добавление темы дописывает одну строку в конец журнала — стоимость не зависит
+от размера индекса. Снимок перезаписывается только при сжатии (compact), когда
+журнал по размеру догоняет снимок: так N добавлений стоят O(N) суммарно,
+а не O(N²), как при полной перезаписи файла на каждую тему.
+
+Снимок всегда пишется атомарно: во временный файл рядом, fsync, os.replace.
+Читатели никогда не видят наполовину записанный topics_index.json.
+
+По той же схеме (JournaledJson) хранятся словари, которые scripts/watch.py
+обновляет по одной теме: parse_cache.json, search_index.json, quiz_items.json
+и rebuild_state.json — у каждого рядом свой журнал .jsonl.
+
+Использование:
+    python scripts/index_store.py            # показать состояние индекса
+    python scripts/index_store.py --compact  # слить журнал в снимок
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+META_DIR = ROOT / "_meta"
+
+# Журнал меньше этого размера не сжимается, даже если снимок ещё меньше.
+COMPACT_MIN_BYTES = 64 * 1024
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Записать файл целиком или не записать вовсе."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+class IndexStore:
+    """Индекс тем: снимок topics_index.json плюс журнал topics_index.jsonl.
+
+    Записи идентифицируются полем ``path`` (slug может повторяться в разных
+    языках). Запись журнала ``{"op": "put", "entry": {...}}`` добавляет или
+    заменяет тему с тем же path, ``{"op": "delete", "path": ...}`` удаляет
+    её — поэтому повторное применение журнала к снимку безопасно.
+    """
+
+    def __init__(self, meta_dir: Path = META_DIR) -> None:
+        self.snapshot_path = meta_dir / "topics_index.json"
+        self.journal_path = meta_dir / "topics_index.jsonl"
+
+    def load(self) -> list[dict]:
+        """Снимок с применённым журналом, в порядке добавления тем."""
+        entries: dict[str, dict] = {}
+        if self.snapshot_path.exists():
+            for entry in json.loads(self.snapshot_path.read_text(encoding="utf-8")):
+                entries[entry["path"]] = entry
+        for record in read_jsonl(self.journal_path):
+            if record.get("op") == "put":
+                entry = record["entry"]
+                entries[entry["path"]] = entry
+            elif record.get("op") == "delete":
+                entries.pop(record["path"], None)
+        return list(entries.values())
+
+    def append(self, entry: dict) -> None:
+        """Добавить (или заменить) тему одной строкой в журнале."""
+        self.append_many([entry])
+
+    def append_many(self, entries: list[dict]) -> None:
+        """Добавить несколько тем одной операцией записи."""
+        self._write_journal([{"op": "put", "entry": e} for e in entries])
+
+    def remove_many(self, paths: list[str]) -> None:
+        """Удалить темы по path — тоже строками в журнале."""
+        self._write_journal([{"op": "delete", "path": p} for p in paths])
+
+    def _write_journal(self, records: list[dict]) -> None:
+        if not records:
+            return
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(lines)
+        if self.needs_compaction():
+            self.compact()
+
+    def needs_compaction(self) -> bool:
+        """Журнал догнал снимок по размеру — пора сливать (проверка за O(1))."""
+        journal = file_size(self.journal_path)
+        return journal >= COMPACT_MIN_BYTES and journal >= file_size(self.snapshot_path)
+
+    def compact(self) -> int:
+        """Слить журнал в снимок. Возвращает число тем в индексе."""
+        entries = self.load()
+        self.write_snapshot(entries)
+        return len(entries)
+
+    def write_snapshot(self, entries: list[dict]) -> None:
+        """Атомарно заменить снимок и очистить журнал."""
+        atomic_write_text(
+            self.snapshot_path,
+            json.dumps(entries, ensure_ascii=False, indent=2),
+        )
+        # Если процесс упадёт до этой строки, журнал применится повторно —
+        # записи put идемпотентны, индекс не испортится.
+        self.journal_path.unlink(missing_ok=True)
+
+
+class JournaledJson:
+    """Словарь «ключ → запись» на диске по той же схеме, что IndexStore.
+
+        <name>.json    снимок {"version": ..., field: {ключ: запись}}
+        <name>.jsonl   журнал {"op": "put", "key": ..., "value": ...} / {"op": "delete", "key": ...}
+
+    Сам словарь держит владелец (ParseCache, SearchIndex, ...), а сюда сообщает
+    об изменениях через put() и delete(). save() дописывает их в журнал — запись
+    стоит O(изменений), а не O(размера словаря). Снимок переписывается, когда
+    журнал догонит его по размеру или снимок другой версии.
+    """
+
+    def __init__(self, path: Path, version: int, field: str) -> None:
+        self.path = path
+        self.journal_path = path.with_suffix(".jsonl")
+        self.version = version
+        self.field = field
+        self._pending: list[dict] = []
+        self._rewrite = False
+
+    def load(self) -> dict:
+        """Снимок с применённым журналом. Нет снимка или другая версия — пустой словарь."""
+        data = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            # Журнал без своего снимка не применяется; первый save() запишет снимок.
+            self._rewrite = True
+            return {}
+        entries = data[self.field]
+        for record in read_jsonl(self.journal_path):
+            if record.get("op") == "put":
+                entries[record["key"]] = record["value"]
+            elif record.get("op") == "delete":
+                entries.pop(record["key"], None)
+        return entries
+
+    def put(self, key: str, value) -> None:
+        self._pending.append({"op": "put", "key": key, "value": value})
+
+    def delete(self, key: str) -> None:
+        self._pending.append({"op": "delete", "key": key})
+
+    @property
+    def dirty(self) -> bool:
+        return self._rewrite or bool(self._pending)
+
+    def save(self, entries: dict) -> None:
+        """Дописать изменения в журнал; entries нужен, только если пора переписать снимок."""
+        if not self.dirty:
+            return
+        if not self._rewrite:
+            lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self._pending)
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write(lines)
+            self._pending.clear()
+            journal = file_size(self.journal_path)
+            if journal < COMPACT_MIN_BYTES or journal < file_size(self.path):
+                return
+        self.write(entries)
+
+    def write(self, entries: dict) -> None:
+        """Атомарно заменить снимок и очистить журнал."""
+        atomic_write_text(
+            self.path,
+            json.dumps({"version": self.version, self.field: entries}, ensure_ascii=False, separators=(",", ":")),
+        )
+        # Упадём до unlink — журнал применится к новому снимку ещё раз: put и delete идемпотентны.
+        self.journal_path.unlink(missing_ok=True)
+        self._pending.clear()
+        self._rewrite = False
+
+
+def read_jsonl(path: Path) -> list[dict]:
+    """Записи журнала. Оборванная строка (после аварийного завершения) пропускается."""
+    if not path.exists():
+        return []
+    records = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Индекс тем Knowledge Base")
+    parser.add_argument("--compact", action="store_true", help="Слить журнал в topics_index.json")
+    args = parser.parse_args()
+
+    store = IndexStore()
+    if args.compact:
+        count = store.compact()
+        print(f"[OK] Журнал слит в снимок ({count} тем)")
+        return
+
+    print(f"Тем в индексе:   {len(store.load())}")
+    print(f"Снимок:          {file_size(store.snapshot_path)} байт")
+    print(f"Журнал:          {file_size(store.journal_path)} байт")
+
+
+if __name__ == "__main__":
+    main()
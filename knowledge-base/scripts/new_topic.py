@@ -4,6 +4,7 @@
 Использование:
     python scripts/new_topic.py --lang python --section basics --topic closures
     python scripts/new_topic.py --lang python --section tools/pdf --topic qpdf
+    python scripts/new_topic.py --manifest curriculum.csv --workers 8
 
 Создаёт:
     python/basics/closures/
@@ -16,16 +17,21 @@
         qpdf.py
         meta.json
 
-И обновляет:
-    _meta/topics_index.json
+И дописывает тему в индекс (см. scripts/index_store.py):
+    _meta/topics_index.jsonl
 """
 
 import argparse
+import csv
+import io
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
+from index_store import IndexStore
+
 ROOT = Path(__file__).parent.parent
 
 MD_TEMPLATE = """---
@@ -63,27 +69,11 @@ PY_TEMPLATE = """# =============================================================
 """
 
 
-def create_topic(lang: str, section: str, slug: str) -> None:
+def render_topic(lang: str, section: str, slug: str, today: str) -> tuple[Path, dict[str, str], dict]:
+    """Содержимое файлов темы и её запись в индексе — без обращения к диску."""
     title = slug.replace("_", " ").title()
-    today = date.today().isoformat()
     topic_path = ROOT / lang / section / slug
 
-    if topic_path.exists():
-        print(f"[!] Тема уже существует: {topic_path}")
-        sys.exit(1)
-
-    topic_path.mkdir(parents=True)
-
-    (topic_path / f"{slug}.md").write_text(
-        MD_TEMPLATE.format(title=title, slug=slug, today=today),
-        encoding="utf-8",
-    )
-
-    (topic_path / f"{slug}.py").write_text(
-        PY_TEMPLATE.format(title=title, lang=lang, section=section),
-        encoding="utf-8",
-    )
-
     meta = {
         "title": title,
         "slug": slug,
@@ -94,37 +84,85 @@ def create_topic(lang: str, section: str, slug: str) -> None:
         "last_reviewed": None,
         "quiz_types": ["theory", "code_writing"],
     }
-    (topic_path / "meta.json").write_text(
-        json.dumps(meta, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    files = {
+        f"{slug}.md": MD_TEMPLATE.format(title=title, slug=slug, today=today),
+        f"{slug}.py": PY_TEMPLATE.format(title=title, lang=lang, section=section),
+        "meta.json": json.dumps(meta, ensure_ascii=False, indent=2),
+    }
+    entry = {
+        "slug": slug,
+        "path": f"{lang}/{section}/{slug}",
+        "title": title,
+        "difficulty": "medium",
+        "tags": [slug],
+        "quiz_types": ["theory", "code_writing"],
+    }
+    return topic_path, files, entry
 
-    index_path = ROOT / "_meta" / "topics_index.json"
-    index: list = (
-        json.loads(index_path.read_text(encoding="utf-8"))
-        if index_path.exists()
-        else []
-    )
 
-    index.append(
-        {
-            "slug": slug,
-            "path": f"{lang}/{section}/{slug}",
-            "title": title,
-            "difficulty": "medium",
-            "tags": [slug],
-            "quiz_types": ["theory", "code_writing"],
-        }
-    )
+def write_topic(topic_path: Path, files: dict[str, str]) -> None:
+    topic_path.mkdir(parents=True)
+    for name, text in files.items():
+        (topic_path / name).write_text(text, encoding="utf-8")
 
-    index_path.parent.mkdir(exist_ok=True)
-    index_path.write_text(
-        json.dumps(index, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+
+def create_topic(lang: str, section: str, slug: str) -> None:
+    topic_path, files, entry = render_topic(lang, section, slug, date.today().isoformat())
+
+    if topic_path.exists():
+        print(f"[!] Тема уже существует: {topic_path}")
+        sys.exit(1)
+
+    write_topic(topic_path, files)
+    IndexStore().append(entry)
 
     print(f"[OK] Тема создана:           {topic_path}")
-    print(f"[OK] topics_index.json обновлён  ({len(index)} тем)")
+    print("[OK] Тема добавлена в индекс (журнал topics_index.jsonl)")
+
+
+def read_manifest(path: Path) -> list[tuple[str, str, str]]:
+    """Манифест: CSV с колонками lang,section,topic или JSON-список объектов."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        rows = json.loads(text)
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    return [(r["lang"].strip(), r["section"].strip().strip("/"), r["topic"].strip()) for r in rows]
+
+
+def create_topics(rows: list[tuple[str, str, str]], workers: int = 1) -> None:
+    """Создать много тем: индекс читается один раз и дописывается один раз.
+
+    Уже существующие темы (на диске или в индексе) и повторы в манифесте
+    пропускаются с предупреждением, а не прерывают весь импорт.
+    """
+    today = date.today().isoformat()
+    store = IndexStore()
+    known = {entry["path"] for entry in store.load()}
+
+    planned: list[tuple[Path, dict[str, str]]] = []
+    entries: list[dict] = []
+    for lang, section, slug in rows:
+        topic_path, files, entry = render_topic(lang, section, slug, today)
+        if entry["path"] in known or topic_path.exists():
+            print(f"[!] Тема уже существует, пропуск: {entry['path']}")
+            continue
+        known.add(entry["path"])
+        planned.append((topic_path, files))
+        entries.append(entry)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() — чтобы исключения из потоков не потерялись.
+            list(pool.map(lambda job: write_topic(*job), planned))
+    else:
+        for topic_path, files in planned:
+            write_topic(topic_path, files)
+
+    store.append_many(entries)
+
+    print(f"[OK] Создано тем:            {len(entries)} из {len(rows)}")
+    print("[OK] Темы добавлены в индекс (журнал topics_index.jsonl)")
 
 
 def main() -> None:
@@ -138,13 +176,24 @@ def main() -> None:
   python scripts/new_topic.py --lang python --section tools/pdf --topic qpdf
   python scripts/new_topic.py --lang python --section tools/pdf --topic ghostscript
   python scripts/new_topic.py --lang javascript --section basics --topic variables
+
+Пакетный режим (CSV с колонками lang,section,topic или JSON-список):
+  python scripts/new_topic.py --manifest curriculum.csv --workers 8
         """,
     )
-    parser.add_argument("--lang",    required=True, help="Язык: python, javascript, sql")
-    parser.add_argument("--section", required=True, help="Раздел: basics, oop, tools/pdf ...")
-    parser.add_argument("--topic",   required=True, help="Slug темы: closures, qpdf ...")
+    parser.add_argument("--lang",     help="Язык: python, javascript, sql")
+    parser.add_argument("--section",  help="Раздел: basics, oop, tools/pdf ...")
+    parser.add_argument("--topic",    help="Slug темы: closures, qpdf ...")
+    parser.add_argument("--manifest", type=Path, help="CSV/JSON-манифест для пакетного создания тем")
+    parser.add_argument("--workers",  type=int, default=1, help="Потоков для записи файлов (пакетный режим)")
     args = parser.parse_args()
-    create_topic(args.lang, args.section, args.topic)
+
+    if args.manifest:
+        create_topics(read_manifest(args.manifest), workers=args.workers)
+    elif args.lang and args.section and args.topic:
+        create_topic(args.lang, args.section, args.topic)
+    else:
+        parser.error("нужны --lang, --section и --topic либо --manifest")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Кэш разобранных Markdown-документов тем: frontmatter и смещения заголовков.
+
+    _meta/parse_cache.json    (+ журнал parse_cache.jsonl, см. JournaledJson в index_store.py)
+
+Ключ — относительный путь к .md, проверка свежести — mtime_ns и размер файла.
+При тёплом кэше загрузка всей базы сводится к одному чтению parse_cache.json
+и stat() по каждому документу; сами .md не читаются.
+
+Для каждого документа хранится:
+    frontmatter — поля frontmatter (см. scripts/frontmatter.py)
+    sections    — [уровень, заголовок, начало, конец] в БАЙТАХ от начала файла;
+                  начало указывает на строку заголовка, конец — на следующий
+                  заголовок того же или более высокого уровня (или конец файла).
+
+Заголовки внутри блоков кода ``` не учитываются: там `# комментарий` — это код.
+
+Число записей ограничено; при переполнении вытесняются давно не
+использованные (LRU), так что записи удалённых и переименованных файлов
+со временем уходят сами.
+
+Использование:
+    python scripts/parse_cache.py   # прогреть кэш по всем темам и показать статистику
+"""
+
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from frontmatter import parse_frontmatter
+from index_store import META_DIR, ROOT, JournaledJson
+
+CACHE_PATH = META_DIR / "parse_cache.json"
+CACHE_VERSION = 1
+
+
+def parse_document(data: bytes) -> dict:
+    """Frontmatter и таблица заголовков документа."""
+    lines = data.splitlines(keepends=True)
+    offset = 0
+    i = 0
+
+    frontmatter: dict = {}
+    if lines and lines[0].strip() == b"---":
+        for j in range(1, len(lines)):
+            if lines[j].strip() == b"---":
+                frontmatter = parse_frontmatter(b"".join(lines[: j + 1]).decode("utf-8"))
+                offset = sum(len(line) for line in lines[: j + 1])
+                i = j + 1
+                break
+
+    headings: list[list] = []
+    in_fence = False
+    for line in lines[i:]:
+        if line.lstrip().startswith((b"```", b"~~~")):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith(b"#"):
+            level = len(line) - len(line.lstrip(b"#"))
+            title = line[level:].strip()
+            if level <= 6 and line[level:level + 1] in (b" ", b"\t"):
+                headings.append([level, title.decode("utf-8"), offset])
+        offset += len(line)
+
+    sections = []
+    for k, (level, title, start) in enumerate(headings):
+        end = next((h[2] for h in headings[k + 1:] if h[0] <= level), len(data))
+        sections.append([level, title, start, end])
+    return {"frontmatter": frontmatter, "sections": sections}
+
+
+class ParseCache:
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = 50_000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._store = JournaledJson(path, CACHE_VERSION, "entries")
+        self.entries: OrderedDict[str, dict] = OrderedDict(self._store.load())
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, md_path: Path) -> dict:
+        """Разобранный документ: {"frontmatter": ..., "sections": ...}.
+
+        Бросает FileNotFoundError, если файла нет (запись о нём удаляется).
+        """
+        key = _key(md_path)
+        try:
+            st = md_path.stat()
+        except FileNotFoundError:
+            if self.entries.pop(key, None) is not None:
+                self._store.delete(key)
+            raise
+
+        stamp = [st.st_mtime_ns, st.st_size]
+        cached = self.entries.get(key)
+        if cached is not None and cached["stamp"] == stamp:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached["doc"]
+
+        self.misses += 1
+        doc = parse_document(md_path.read_bytes())
+        self.entries[key] = {"stamp": stamp, "doc": doc}
+        self.entries.move_to_end(key)
+        self._store.put(key, self.entries[key])
+        return doc
+
+    def frontmatter(self, md_path: Path) -> dict:
+        return self.get(md_path)["frontmatter"]
+
+    def sections(self, md_path: Path) -> list[list]:
+        return self.get(md_path)["sections"]
+
+    def save(self) -> None:
+        """Записать изменения на диск (строками журнала), вытеснив лишние записи."""
+        while len(self.entries) > self.max_entries:
+            key, _ = self.entries.popitem(last=False)
+            self._store.delete(key)
+        self._store.save(self.entries)
+
+
+def _key(md_path: Path) -> str:
+    # absolute(), а не resolve(): никаких лишних системных вызовов на горячем пути.
+    path = md_path.absolute()
+    try:
+        return path.relative_to(ROOT.absolute()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def main() -> None:
+    from rebuild_index import find_topics
+
+    start = time.perf_counter()
+    cache = ParseCache()
+    for topic_dir in find_topics():
+        try:
+            cache.get(topic_dir / f"{topic_dir.name}.md")
+        except FileNotFoundError:
+            print(f"[!] Нет документа: {topic_dir / f'{topic_dir.name}.md'}")
+    cache.save()
+    elapsed = time.perf_counter() - start
+    print(f"[OK] Документов: {cache.hits + cache.misses}, из кэша: {cache.hits}, "
+          f"разобрано: {cache.misses}, {elapsed * 1e3:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Хранилище заданий для бота, извлечённых из файлов примеров.
+
+Задания find_the_bug и fill_the_gap лежат в <slug>.py как блоки
+«# --- Пример N: <тип> - <название> ---» (см. scripts/examples.py).
+Скрипт разбирает их один раз и складывает в
+
+    _meta/quiz_items.json   (+ журнал quiz_items.jsonl, см. JournaledJson в index_store.py)
+
+Во время запроса бот ничего не читает и не разбирает: QuizStore загружает
+файл, группирует задания по теме и типу, а sample() — это random.choice
+по готовому списку.
+
+Поля задания берутся из комментариев блока:
+
+    # Цель: / # Задание:                        → prompt
+    # Ошибка:                                   → explanation
+    # Ожидаемая ошибка: / # Ожидаемый результат: → expected
+    # Правильно: / # Пропущенное слово:         → answer
+
+Остальные строки блока — код задания. Закомментированная строка с пропуском
+«___» тоже считается кодом: это строка, которую нужно дополнить.
+
+Повторный запуск перечитывает только изменившиеся .py (по mtime и размеру).
+
+Использование:
+    python scripts/quiz_store.py                       # пересобрать хранилище
+    python scripts/quiz_store.py --sample find_the_bug # показать случайное задание
+"""
+
+import argparse
+import random
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from examples import ExampleBlock, split_examples
+from index_store import META_DIR, ROOT, JournaledJson
+from rebuild_index import find_topics
+
+STORE_PATH = META_DIR / "quiz_items.json"
+STORE_VERSION = 1
+
+# Какие типы заданий извлекаются: theory и code_writing бот строит из .md.
+EXTRACTED_TYPES = ("find_the_bug", "fill_the_gap")
+
+FIELD_NAMES = {
+    "цель": "prompt",
+    "задание": "prompt",
+    "ошибка": "explanation",
+    "ожидаемая ошибка": "expected",
+    "ожидаемый результат": "expected",
+    "правильно": "answer",
+    "пропущенное слово": "answer",
+}
+
+GAP = "___"
+
+
+@dataclass
+class QuizItem:
+    topic: str
+    quiz_type: str
+    number: int
+    title: str
+    code: str
+    prompt: str = ""
+    answer: str = ""
+    expected: str = ""
+    explanation: str = ""
+
+
+def extract_items(topic: str, text: str) -> list[QuizItem]:
+    return [
+        block_to_item(topic, block)
+        for block in split_examples(text)
+        if block.quiz_type in EXTRACTED_TYPES
+    ]
+
+
+def block_to_item(topic: str, block: ExampleBlock) -> QuizItem:
+    fields: dict[str, str] = {}
+    code: list[str] = []
+    for line in block.lines:
+        stripped = line.strip()
+        if not stripped.startswith("#"):
+            code.append(line)
+            continue
+        comment = stripped.lstrip("#").strip()
+        if GAP in comment:
+            code.append(comment)
+            continue
+        key, sep, value = comment.partition(":")
+        name = FIELD_NAMES.get(key.strip().lower())
+        if sep and name and name not in fields:
+            fields[name] = value.strip()
+
+    return QuizItem(
+        topic=topic,
+        quiz_type=block.quiz_type,
+        number=block.number,
+        title=block.title,
+        code="\n".join(code).strip("\n"),
+        **fields,
+    )
+
+
+class QuizFiles:
+    """Задания по файлам: {путь .py: {"stamp": ..., "items": [...]}}, на диске — снимок и журнал.
+
+    scripts/watch.py держит один QuizFiles всё время работы: обновление темы
+    разбирает только её .py и дописывает одну строку в журнал.
+    """
+
+    def __init__(self, root: Path = ROOT, path: Path = STORE_PATH) -> None:
+        self.root = root
+        self._store = JournaledJson(path, STORE_VERSION, "files")
+        self.files: dict[str, dict] = self._store.load()
+
+    def update(self, topic_dirs: list[Path] | None = None) -> int:
+        """Перечитать изменившиеся .py. Возвращает число разобранных файлов.
+
+        Без аргументов обходит всё дерево и удаляет файлы пропавших тем;
+        со списком topic_dirs проверяет только эти темы.
+        """
+        full_scan = topic_dirs is None
+        if full_scan:
+            topic_dirs = find_topics(self.root)
+        seen = set()
+        parsed = 0
+        for topic_dir in topic_dirs:
+            py_path = topic_dir / f"{topic_dir.name}.py"
+            rel = py_path.relative_to(self.root).as_posix()
+            try:
+                st = py_path.stat()
+            except FileNotFoundError:
+                self._drop(rel)
+                continue
+            if not (topic_dir / "meta.json").exists():  # тема удалена, остался только .py
+                self._drop(rel)
+                continue
+            seen.add(rel)
+            stamp = [st.st_mtime_ns, st.st_size]
+            cached = self.files.get(rel)
+            if cached is not None and cached["stamp"] == stamp:
+                continue
+            topic = topic_dir.relative_to(self.root).as_posix()
+            items = extract_items(topic, py_path.read_text(encoding="utf-8"))
+            self.files[rel] = {"stamp": stamp, "items": [asdict(item) for item in items]}
+            self._store.put(rel, self.files[rel])
+            parsed += 1
+
+        if full_scan:
+            for rel in [r for r in self.files if r not in seen]:
+                self._drop(rel)
+        return parsed
+
+    def _drop(self, rel: str) -> None:
+        if self.files.pop(rel, None) is not None:
+            self._store.delete(rel)
+
+    def total(self) -> int:
+        return sum(len(f["items"]) for f in self.files.values())
+
+    def save(self) -> None:
+        self._store.save(self.files)
+
+
+def build(root: Path = ROOT, path: Path = STORE_PATH, topic_dirs: list[Path] | None = None) -> tuple[int, int]:
+    """Пересобрать хранилище. Возвращает (разобрано файлов, всего заданий).
+
+    Со списком topic_dirs проверяются только эти темы, остальные берутся
+    из хранилища как есть.
+    """
+    files = QuizFiles(root, path)
+    parsed = files.update(topic_dirs)
+    files.save()
+    return parsed, files.total()
+
+
+class QuizStore:
+    def __init__(self, path: Path = STORE_PATH) -> None:
+        self.by_key: dict[tuple[str, str], list[QuizItem]] = defaultdict(list)
+        self.by_type: dict[str, list[QuizItem]] = defaultdict(list)
+        for entry in JournaledJson(path, STORE_VERSION, "files").load().values():
+            for raw in entry["items"]:
+                item = QuizItem(**raw)
+                self.by_key[item.topic, item.quiz_type].append(item)
+                self.by_type[item.quiz_type].append(item)
+
+    def items(self, topic: str, quiz_type: str) -> list[QuizItem]:
+        return self.by_key.get((topic, quiz_type), [])
+
+    def sample(
+        self,
+        quiz_type: str,
+        topic: str | None = None,
+        rng: random.Random | None = None,
+    ) -> QuizItem | None:
+        """Случайное задание типа quiz_type (по всей базе или из одной темы)."""
+        pool = self.items(topic, quiz_type) if topic else self.by_type.get(quiz_type, [])
+        if not pool:
+            return None
+        return (rng or random).choice(pool)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задания для бота из файлов примеров")
+    parser.add_argument("--sample", metavar="QUIZ_TYPE", help="Показать случайное задание этого типа")
+    parser.add_argument("--topic", help="Путь темы: python/basics/list_comprehension")
+    args = parser.parse_args()
+
+    parsed, total = build()
+    print(f"[OK] Разобрано файлов: {parsed}, заданий в хранилище: {total}")
+
+    if args.sample:
+        item = QuizStore().sample(args.sample, args.topic)
+        if item is None:
+            print(f"[!] Нет заданий типа {args.sample}")
+            return
+        print(f"\n{item.topic} — Пример {item.number}: {item.title}\n")
+        print(item.code)
+        if item.prompt:
+            print(f"\nЗадание: {item.prompt}")
+        if item.answer:
+            print(f"Ответ:   {item.answer}")
+
+
+if __name__ == "__main__":
+    main()
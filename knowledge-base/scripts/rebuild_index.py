@@ -0,0 +1,165 @@
+"""
+Пересборка индекса тем из meta.json и frontmatter в <slug>.md.
+
+meta.json, frontmatter и запись в topics_index.json дублируют одни и те же поля
+и со временем расходятся. Скрипт обходит дерево, читает все meta.json и
+frontmatter параллельно и собирает индекс заново за один проход:
+
+    title, difficulty, quiz_types  — из meta.json
+    tags                           — meta.json + недостающие теги из frontmatter
+
+Расхождения между meta.json и frontmatter печатаются как предупреждения.
+
+Чтобы повторный запуск на большом дереве был почти мгновенным, для каждой темы
+в _meta/rebuild_state.json хранятся mtime, размер и sha1 исходных файлов
+(scripts/watch.py дописывает правки в журнал rebuild_state.jsonl).
+Если mtime и размер не изменились, файлы не читаются вовсе; если изменились,
+но sha1 совпал — тема тоже не разбирается заново.
+
+Использование:
+    python scripts/rebuild_index.py
+    python scripts/rebuild_index.py --full --workers 16
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from frontmatter import parse_frontmatter
+from index_store import META_DIR, ROOT, IndexStore, JournaledJson
+
+STATE_PATH = META_DIR / "rebuild_state.json"
+STATE_VERSION = 1
+
+# Каталоги верхнего уровня, в которых тем не бывает.
+SKIP_DIRS = {"_meta", "scripts"}
+
+
+def find_topics(root: Path = ROOT) -> list[Path]:
+    """Каталоги тем — те, в которых лежит meta.json."""
+    topics = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not d.startswith((".", "_")) and not (dirpath == str(root) and d in SKIP_DIRS)
+        )
+        if "meta.json" in filenames:
+            topics.append(Path(dirpath))
+    return topics
+
+
+def source_files(topic_dir: Path) -> list[Path]:
+    return [topic_dir / "meta.json", topic_dir / f"{topic_dir.name}.md"]
+
+
+def _stat(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def build_entry(rel_path: str, meta: dict, front: dict) -> tuple[dict, list[str]]:
+    """Запись индекса и список расхождений meta.json ↔ frontmatter."""
+    tags = list(meta.get("tags") or [])
+    tags += [t for t in front.get("tags") or [] if t not in tags]
+
+    entry = {
+        "slug": meta.get("slug") or Path(rel_path).name,
+        "path": rel_path,
+        "title": meta.get("title") or front.get("title") or Path(rel_path).name,
+        "difficulty": meta.get("difficulty") or front.get("difficulty") or "medium",
+        "tags": tags,
+        "quiz_types": list(meta.get("quiz_types") or []),
+    }
+
+    drift = []
+    for field in ("title", "difficulty"):
+        if front.get(field) is not None and meta.get(field) != front[field]:
+            drift.append(f"{field}: meta.json={meta.get(field)!r}, frontmatter={front[field]!r}")
+    missing = [t for t in front.get("tags") or [] if t not in (meta.get("tags") or [])]
+    if missing:
+        drift.append(f"tags только во frontmatter: {missing}")
+    return entry, drift
+
+
+def sync_topic(
+    topic_dir: Path, cached: dict | None, full: bool, root: Path = ROOT
+) -> tuple[dict, list[str], bool]:
+    """Состояние темы для rebuild_state.json, расхождения и флаг «разобрана заново»."""
+    rel_path = topic_dir.relative_to(root).as_posix()
+    files = source_files(topic_dir)
+    stats = [_stat(f) for f in files]
+
+    if not full and cached and cached.get("stats") == stats:
+        return cached, [], False
+
+    blobs = [f.read_bytes() if st is not None else b"" for f, st in zip(files, stats)]
+    hashes = [hashlib.sha1(b).hexdigest() for b in blobs]
+
+    if not full and cached and cached.get("hashes") == hashes:
+        return {**cached, "stats": stats}, [], False
+
+    meta = json.loads(blobs[0].decode("utf-8"))
+    front = parse_frontmatter(blobs[1].decode("utf-8")) if blobs[1] else {}
+    entry, drift = build_entry(rel_path, meta, front)
+    return {"stats": stats, "hashes": hashes, "entry": entry}, drift, True
+
+
+def rebuild(workers: int = 8, full: bool = False) -> None:
+    state_store = JournaledJson(STATE_PATH, STATE_VERSION, "topics")
+    state = state_store.load() if not full else {}
+
+    topics = find_topics()
+    rel_paths = [t.relative_to(ROOT).as_posix() for t in topics]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda t, rel: sync_topic(t, state.get(rel), full),
+            topics,
+            rel_paths,
+        ))
+
+    new_state = {}
+    parsed = 0
+    for rel, (topic_state, drift, reparsed) in zip(rel_paths, results):
+        new_state[rel] = topic_state
+        parsed += reparsed
+        for line in drift:
+            print(f"[~] {rel}: {line}")
+
+    # Порядок тем сохраняется как в текущем индексе, новые — в конец.
+    store = IndexStore()
+    current = store.load()
+    order = [e["path"] for e in current if e["path"] in new_state]
+    seen = set(order)
+    order += [rel for rel in rel_paths if rel not in seen]
+    entries = [new_state[rel]["entry"] for rel in order]
+
+    removed = [e["path"] for e in current if e["path"] not in new_state]
+    for rel in removed:
+        print(f"[-] Тема удалена из индекса (нет meta.json): {rel}")
+
+    if entries != current or store.journal_path.exists():
+        store.write_snapshot(entries)
+        print(f"[OK] topics_index.json пересобран ({len(entries)} тем)")
+    else:
+        print(f"[OK] topics_index.json актуален ({len(entries)} тем)")
+
+    state_store.write(new_state)
+    print(f"[OK] Разобрано заново: {parsed}, из кэша: {len(topics) - parsed}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересобрать _meta/topics_index.json из meta.json и .md")
+    parser.add_argument("--workers", type=int, default=8, help="Потоков для чтения файлов")
+    parser.add_argument("--full", action="store_true", help="Игнорировать кэш и разобрать все темы")
+    args = parser.parse_args()
+    rebuild(workers=args.workers, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Планировщик интервального повторения тем (алгоритм SM-2).
+
+Состояние повторений хранится отдельно от meta.json — так же, как индекс тем
+(см. scripts/index_store.py):
+
+    _meta/review_state.json    — снимок: путь темы → состояние
+    _meta/review_state.jsonl   — журнал: одна строка на каждое повторение
+
+Отметка о повторении — это одна дописанная строка в журнале; meta.json тем
+не переписываются. Журнал сливается в снимок, когда догоняет его по размеру.
+
+В памяти темы лежат в куче по времени следующего повторения, поэтому
+«что повторить сейчас» — это взгляд на вершину кучи, а отметка о повторении —
+O(log n). Устаревшие элементы кучи не удаляются сразу, а пропускаются при
+извлечении (ленивое удаление).
+
+Новая тема, которую ещё ни разу не повторяли, считается готовой к повторению
+сразу; начальный коэффициент лёгкости зависит от difficulty.
+
+Использование:
+    python scripts/review.py                                          # что повторить сейчас
+    python scripts/review.py --done python/basics/functions --grade 4 # отметить повторение
+"""
+
+import argparse
+import heapq
+import json
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from index_store import (
+    COMPACT_MIN_BYTES,
+    META_DIR,
+    IndexStore,
+    atomic_write_text,
+    file_size,
+    read_jsonl,
+)
+
+SNAPSHOT_PATH = META_DIR / "review_state.json"
+JOURNAL_PATH = META_DIR / "review_state.jsonl"
+
+DAY = 24 * 60 * 60
+INITIAL_EASE = {"easy": 2.6, "medium": 2.5, "hard": 2.3}
+MIN_EASE = 1.3
+
+
+def next_state(state: dict, grade: int, now: float) -> dict:
+    """Новое состояние темы после повторения с оценкой grade (0–5) по SM-2."""
+    if not 0 <= grade <= 5:
+        raise ValueError("grade must be in 0..5")
+    ease = state["ease"]
+    if grade < 3:
+        # Провал: повторения с начала, E-Factor не меняется.
+        reps, interval = 0, 1
+    else:
+        reps = state["reps"] + 1
+        interval = {1: 1, 2: 6}.get(reps) or round(state["interval"] * ease)
+        ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return {
+        "reps": reps,
+        "interval": interval,
+        "ease": round(ease, 3),
+        "due": now + interval * DAY,
+        "last_reviewed": date.fromtimestamp(now).isoformat(),
+    }
+
+
+class ReviewScheduler:
+    def __init__(
+        self,
+        entries: list[dict],
+        snapshot_path: Path = SNAPSHOT_PATH,
+        journal_path: Path = JOURNAL_PATH,
+    ) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.order = {e["path"]: i for i, e in enumerate(entries)}
+
+        self.states: dict[str, dict] = {}
+        if snapshot_path.exists():
+            self.states = json.loads(snapshot_path.read_text(encoding="utf-8"))
+        for record in read_jsonl(journal_path):
+            self.states[record["path"]] = record["state"]
+
+        for entry in entries:
+            self.states.setdefault(entry["path"], {
+                "reps": 0,
+                "interval": 0,
+                "ease": INITIAL_EASE.get(entry.get("difficulty"), 2.5),
+                "due": 0.0,
+                "last_reviewed": None,
+            })
+
+        self.heap = [(self.states[p]["due"], i, p) for p, i in self.order.items()]
+        heapq.heapify(self.heap)
+
+    @classmethod
+    def load(cls, store: IndexStore | None = None) -> "ReviewScheduler":
+        return cls((store or IndexStore()).load())
+
+    def _clean_top(self) -> None:
+        # Ленивое удаление: пропускаем элементы, чей due уже устарел.
+        while self.heap:
+            due, _, path = self.heap[0]
+            if path in self.order and self.states[path]["due"] == due:
+                return
+            heapq.heappop(self.heap)
+
+    def peek(self) -> tuple[str, float] | None:
+        """Ближайшая к повторению тема и время повторения (unix time)."""
+        self._clean_top()
+        if not self.heap:
+            return None
+        due, _, path = self.heap[0]
+        return path, due
+
+    def due(self, now: float | None = None, limit: int = 10) -> list[str]:
+        """До limit тем, срок повторения которых уже наступил."""
+        now = time.time() if now is None else now
+        result = []
+        popped = []
+        while len(result) < limit:
+            self._clean_top()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            item = heapq.heappop(self.heap)
+            popped.append(item)
+            result.append(item[2])
+        for item in popped:
+            heapq.heappush(self.heap, item)
+        return result
+
+    def record(self, path: str, grade: int, now: float | None = None) -> dict:
+        """Отметить повторение темы: O(log n) в памяти и одна строка в журнале."""
+        if path not in self.order:
+            raise KeyError(path)
+        now = time.time() if now is None else now
+        state = next_state(self.states[path], grade, now)
+        self.states[path] = state
+        heapq.heappush(self.heap, (state["due"], self.order[path], path))
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"path": path, "grade": grade, "state": state}, ensure_ascii=False) + "\n")
+        if self.needs_compaction():
+            self.compact()
+        return state
+
+    def needs_compaction(self) -> bool:
+        journal = file_size(self.journal_path)
+        return journal >= COMPACT_MIN_BYTES and journal >= file_size(self.snapshot_path)
+
+    def compact(self) -> None:
+        """Записать все состояния в снимок и очистить журнал."""
+        reviewed = {p: s for p, s in self.states.items() if s["last_reviewed"] is not None}
+        atomic_write_text(self.snapshot_path, json.dumps(reviewed, ensure_ascii=False, indent=1))
+        self.journal_path.unlink(missing_ok=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Интервальное повторение тем")
+    parser.add_argument("--done", metavar="PATH", help="Путь темы, которую только что повторили")
+    parser.add_argument("--grade", type=int, default=4, help="Оценка 0–5 (по умолчанию 4)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    scheduler = ReviewScheduler.load()
+    if args.done:
+        state = scheduler.record(args.done, args.grade)
+        when = datetime.fromtimestamp(state["due"]).strftime("%Y-%m-%d")
+        print(f"[OK] {args.done}: следующее повторение {when} (через {state['interval']} дн.)")
+        return
+
+    topics = scheduler.due(limit=args.limit)
+    for path in topics:
+        last = scheduler.states[path]["last_reviewed"] or "никогда"
+        print(f"{path:<40} последнее повторение: {last}")
+    if not topics:
+        upcoming = scheduler.peek()
+        if upcoming:
+            when = datetime.fromtimestamp(upcoming[1]).strftime("%Y-%m-%d %H:%M")
+            print(f"[OK] Всё повторено. Следующая тема: {upcoming[0]} ({when})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Полнотекстовый поиск по документам (.md) и примерам (.py) всех тем.
+
+    _meta/search_index.json   (+ журнал search_index.jsonl, см. JournaledJson в index_store.py)
+
+Токенизация: слова из букв, цифр и «_» (русские и английские), в нижнем
+регистре, «ё» → «е». Идентификаторы вида list_comprehension индексируются
+целиком и по частям: list, comprehension. В .py индексируются и код,
+и комментарии. Морфологии нет — для словоформ используйте префикс:
+«функц*» найдёт «функция», «функции», «функцию».
+
+Ранжирование — BM25, очки файлов одной темы складываются.
+
+Индекс обновляется инкрементально: у каждого файла хранятся mtime, размер
+и частоты терминов, при update() заново читаются только изменившиеся файлы,
+а их старые вхождения удаляются из индекса по сохранённым терминам. На диске
+хранятся только файлы с частотами; обратный индекс (термин → файлы) строится
+при загрузке, поэтому сохранение изменившегося файла — одна строка журнала.
+
+Использование:
+    python scripts/search.py "замыкание nonlocal"
+    python scripts/search.py "функц*" --limit 5
+    python scripts/search.py --update        # только обновить индекс
+"""
+
+import argparse
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from index_store import META_DIR, ROOT, JournaledJson
+from rebuild_index import find_topics
+
+INDEX_PATH = META_DIR / "search_index.json"
+INDEX_VERSION = 2
+
+WORD_RE = re.compile(r"\w+")
+
+# Параметры BM25
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for word in WORD_RE.findall(text.lower().replace("ё", "е")):
+        if len(word) < 2:
+            continue
+        tokens.append(word)
+        if "_" in word:
+            tokens.extend(part for part in word.split("_") if len(part) >= 2)
+    return tokens
+
+
+def topic_files(topic_dir: Path) -> list[Path]:
+    return [topic_dir / f"{topic_dir.name}.md", topic_dir / f"{topic_dir.name}.py"]
+
+
+class SearchIndex:
+    def __init__(self, root: Path = ROOT, path: Path = INDEX_PATH) -> None:
+        self.root = root
+        self.path = path
+        self._store = JournaledJson(path, INDEX_VERSION, "docs")
+        # file (относительный путь) → {"topic", "stamp", "len", "tf": {term: частота}}
+        self.docs: dict[str, dict] = self._store.load()
+        # term → {file: частота термина в файле}
+        self.postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self.total_len = 0
+        for rel, doc in self.docs.items():
+            for term, tf in doc["tf"].items():
+                self.postings[term][rel] = tf
+            self.total_len += doc["len"]
+
+    def update(self, topic_dirs: list[Path] | None = None) -> tuple[int, int]:
+        """Переиндексировать изменившиеся файлы. Возвращает (обновлено, удалено).
+
+        Без аргументов обходит всё дерево и удаляет из индекса пропавшие
+        файлы; со списком каталогов — обновляет только эти темы.
+        """
+        full_scan = topic_dirs is None
+        if full_scan:
+            topic_dirs = find_topics(self.root)
+
+        seen = set()
+        updated = 0
+        for topic_dir in topic_dirs:
+            topic = topic_dir.relative_to(self.root).as_posix()
+            for path in topic_files(topic_dir):
+                rel = path.relative_to(self.root).as_posix()
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    if rel in self.docs:
+                        self._remove(rel)
+                    continue
+                seen.add(rel)
+                stamp = [st.st_mtime_ns, st.st_size]
+                doc = self.docs.get(rel)
+                if doc is not None and doc["stamp"] == stamp:
+                    continue
+                self._remove(rel)
+                self._add(rel, topic, stamp, path.read_text(encoding="utf-8", errors="replace"))
+                updated += 1
+
+        removed = 0
+        if full_scan:
+            for rel in [r for r in self.docs if r not in seen]:
+                self._remove(rel)
+                removed += 1
+        return updated, removed
+
+    def remove_topic(self, topic: str) -> None:
+        for rel in [r for r, d in self.docs.items() if d["topic"] == topic]:
+            self._remove(rel)
+
+    def _add(self, rel: str, topic: str, stamp: list[int], text: str) -> None:
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings[term][rel] = tf
+        length = sum(counts.values())
+        self.docs[rel] = {"topic": topic, "stamp": stamp, "len": length, "tf": dict(counts)}
+        self.total_len += length
+        self._store.put(rel, self.docs[rel])
+
+    def _remove(self, rel: str) -> None:
+        doc = self.docs.pop(rel, None)
+        if doc is None:
+            return
+        for term in doc["tf"]:
+            bucket = self.postings.get(term)
+            if bucket is not None:
+                bucket.pop(rel, None)
+                if not bucket:
+                    del self.postings[term]
+        self.total_len -= doc["len"]
+        self._store.delete(rel)
+
+    def _expand(self, term: str) -> list[str]:
+        if term.endswith("*"):
+            prefix = term[:-1]
+            return [t for t in self.postings if t.startswith(prefix)] if prefix else []
+        return [term] if term in self.postings else []
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, str]]:
+        """Темы по убыванию релевантности: [(очки, путь темы), ...]."""
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+        avg_len = self.total_len / n_docs
+
+        scores: dict[str, float] = defaultdict(float)
+        for raw in re.findall(r"[\w*]+", query.lower().replace("ё", "е")):
+            terms = [raw.rstrip("*") + "*"] if raw.endswith("*") else tokenize(raw)
+            for term in terms:
+                for word in self._expand(term):
+                    bucket = self.postings[word]
+                    idf = math.log(1 + (n_docs - len(bucket) + 0.5) / (len(bucket) + 0.5))
+                    for rel, tf in bucket.items():
+                        doc = self.docs[rel]
+                        norm = tf + K1 * (1 - B + B * doc["len"] / avg_len)
+                        scores[doc["topic"]] += idf * tf * (K1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(score, topic) for topic, score in ranked[:limit]]
+
+    def save(self) -> None:
+        self._store.save(self.docs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Поиск по Knowledge Base")
+    parser.add_argument("query", nargs="?", help="Запрос; «слово*» — поиск по префиксу")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--update", action="store_true", help="Только обновить индекс")
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    updated, removed = index.update()
+    index.save()
+    if updated or removed:
+        print(f"[OK] Индекс обновлён: файлов {updated}, удалено {removed}")
+    if args.update or not args.query:
+        return
+
+    start = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    elapsed = time.perf_counter() - start
+    for score, topic in results:
+        print(f"{score:7.2f}  {topic}")
+    print(f"[OK] Найдено: {len(results)}, {elapsed * 1e3:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
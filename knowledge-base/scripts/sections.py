@@ -0,0 +1,102 @@
+"""
+Чтение отдельных разделов документа темы без загрузки всего файла.
+
+Документы тем устроены одинаково (см. MD_TEMPLATE в new_topic.py):
+
+    ## Что это такое
+    ## Ключевые концепции
+    ## Частые ошибки
+    ## Вопросы для самопроверки
+
+Смещения заголовков в байтах берутся из ParseCache (scripts/parse_cache.py),
+раздел читается одним seek + read. При тёплом кэше вопросы для самопроверки
+достаются одним stat() и чтением только нужного куска файла.
+
+    loader = SectionLoader()
+    loader.read("python/basics/functions", SELF_CHECK)
+    loader.self_check_questions("python/basics/functions")
+
+Использование:
+    python scripts/sections.py python/basics/functions "Частые ошибки"
+    python scripts/sections.py python/basics/functions --list
+"""
+
+import argparse
+from pathlib import Path
+
+from index_store import ROOT
+from parse_cache import ParseCache
+
+WHAT_IS_IT = "Что это такое"
+KEY_CONCEPTS = "Ключевые концепции"
+COMMON_MISTAKES = "Частые ошибки"
+SELF_CHECK = "Вопросы для самопроверки"
+
+
+def document_path(topic_path: str) -> Path:
+    """python/basics/functions → <ROOT>/python/basics/functions/functions.md"""
+    path = ROOT / topic_path
+    return path / f"{path.name}.md"
+
+
+class SectionLoader:
+    def __init__(self, cache: ParseCache | None = None) -> None:
+        self.cache = cache if cache is not None else ParseCache()
+
+    def headings(self, topic_path: str) -> list[str]:
+        return [title for _, title, _, _ in self.cache.sections(document_path(topic_path))]
+
+    def read(self, topic_path: str, heading: str, include_heading: bool = False) -> str | None:
+        """Текст раздела (вместе с подразделами) или None, если раздела нет.
+
+        Заголовок сравнивается без учёта регистра; берётся первое совпадение.
+        """
+        md_path = document_path(topic_path)
+        wanted = heading.strip().casefold()
+        for _, title, start, end in self.cache.sections(md_path):
+            if title.casefold() == wanted:
+                with md_path.open("rb") as f:
+                    f.seek(start)
+                    chunk = f.read(end - start)
+                text = chunk.decode("utf-8")
+                if not include_heading:
+                    text = text.partition("\n")[2]
+                return text.strip()
+        return None
+
+    def self_check_questions(self, topic_path: str) -> list[str]:
+        """Пункты списка из раздела «Вопросы для самопроверки»."""
+        return list_items(self.read(topic_path, SELF_CHECK) or "")
+
+
+def list_items(text: str) -> list[str]:
+    """Пункты маркированного списка («- » или «* ») из текста раздела."""
+    return [
+        line.strip()[2:].strip()
+        for line in text.splitlines()
+        if line.strip().startswith(("- ", "* "))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Показать раздел документа темы")
+    parser.add_argument("topic", help="Путь темы, как в индексе: python/basics/functions")
+    parser.add_argument("heading", nargs="?", default=SELF_CHECK, help="Заголовок раздела")
+    parser.add_argument("--list", action="store_true", help="Показать заголовки документа")
+    args = parser.parse_args()
+
+    loader = SectionLoader()
+    if args.list:
+        for title in loader.headings(args.topic):
+            print(title)
+    else:
+        text = loader.read(args.topic, args.heading)
+        if text is None:
+            print(f"[!] Раздел не найден: {args.heading}")
+        else:
+            print(text)
+    loader.cache.save()
+
+
+if __name__ == "__main__":
+    main()
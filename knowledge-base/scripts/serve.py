@@ -0,0 +1,448 @@
+"""
+Локальный HTTP-сервер запросов к базе знаний для бота.
+
+Бот больше не читает topics_index.json и файлы тем на каждый запрос: сервер
+один раз при старте загружает индекс (TopicCatalog), задания (QuizStore)
+и документы тем и дальше отвечает из памяти.
+
+    GET /topics?tag=..&difficulty=..&quiz_type=..  список тем (фильтры — как в catalog.py)
+    GET /topics/<путь или slug>                    запись индекса, заголовки и текст документа
+    GET /topics/<путь>/sections/<заголовок>        один раздел документа
+    GET /quiz?quiz_type=..&difficulty=..&tag=..    случайное задание
+    GET /stats                                     счётчики запросов и кэша
+
+Задания find_the_bug и fill_the_gap берутся из QuizStore, для theory
+и code_writing сервер отдаёт случайный вопрос для самопроверки темы.
+
+Ответы — JSON. Детерминированные ответы кэшируются в LRU внутри процесса
+уже закодированными в байты и отдаются с ETag — хэшем тела. Запрос
+с совпадающим If-None-Match получает 304 без тела. /quiz и /stats
+не кэшируются (Cache-Control: no-store).
+
+Раз в --follow секунд сервер проверяет ленту изменений _meta/changes.jsonl,
+которую ведёт scripts/watch.py (один stat(), пока правок нет), перечитывает
+документы изменившихся тем и очищает кэш ответов. SIGHUP перечитывает всю
+базу. ETag зависит только от содержимого, поэтому у неизменившихся ответов
+он после перезагрузки прежний.
+
+HTTP/1.1 с keep-alive, только GET и HEAD, без TLS: сервер рассчитан
+на localhost или Unix-сокет рядом с ботом. Нагрузочный тест —
+scripts/bench_serve.py.
+
+Использование:
+    python scripts/serve.py                      # http://127.0.0.1:8765
+    python scripts/serve.py --port 0             # свободный порт, адрес печатается
+    python scripts/serve.py --unix /tmp/kb.sock
+    curl -s "localhost:8765/quiz?quiz_type=find_the_bug&difficulty=medium"
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import signal
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import quiz_store
+from catalog import TopicCatalog
+from changes import ChangeFeed, merge
+from index_store import ROOT, IndexStore
+from parse_cache import parse_document
+from sections import SELF_CHECK, list_items
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_HEAD_BYTES = 16 * 1024
+KEEPALIVE_TIMEOUT = 30.0
+
+# Маршруты, ответ которых меняется от запроса к запросу.
+UNCACHED_ROUTES = ("/quiz", "/stats")
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def encode(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """LRU: цель запроса (путь + query) → (ETag, тело ответа)."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, body: bytes) -> tuple[str, bytes]:
+        entry = self._entries[key] = (make_etag(body), body)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class KnowledgeService:
+    """База в памяти: каталог тем, задания и документы (байты + таблица заголовков)."""
+
+    def __init__(self, root: Path = ROOT, max_quiz_pools: int = 1024) -> None:
+        self.root = root
+        self.max_quiz_pools = max_quiz_pools
+        self.load()
+
+    def load(self, topics: set[str] | None = None) -> None:
+        """Перечитать базу. С topics документы перечитываются только для этих тем,
+        а quiz_items.json — как есть: его уже обновил scripts/watch.py."""
+        meta_dir = self.root / "_meta"
+        self.catalog = TopicCatalog(IndexStore(meta_dir).load())
+
+        quiz_path = meta_dir / quiz_store.STORE_PATH.name
+        if topics is None:
+            # build() инкрементален: перечитывает только изменившиеся .py.
+            quiz_store.build(self.root, quiz_path)
+            self.documents: dict[str, tuple[bytes, list[list]]] = {}
+        self.quiz_items = quiz_store.QuizStore(quiz_path)
+
+        for path in topics if topics is not None else [e["path"] for e in self.catalog.entries]:
+            topic_dir = self.root / path
+            try:
+                data = (topic_dir / f"{topic_dir.name}.md").read_bytes()
+            except FileNotFoundError:
+                self.documents.pop(path, None)
+                continue
+            self.documents[path] = (data, parse_document(data)["sections"])
+
+        # (quiz_type, difficulty, теги) → готовые тела ответов.
+        self.quiz_pools: OrderedDict[tuple, list[bytes]] = OrderedDict()
+        self.loaded_at = time.time()
+
+    def entry(self, key: str) -> dict:
+        """Тема по пути из индекса или по slug."""
+        entry = self.catalog.get_by_path(key.strip("/")) or self.catalog.get(key)
+        if entry is None:
+            raise HTTPError(404, f"unknown topic: {key}")
+        return entry
+
+    def topics(self, tags: list[str], difficulty: str | None, quiz_type: str | None) -> dict:
+        return {"topics": self.catalog.query(tags, difficulty, quiz_type)}
+
+    def topic(self, key: str) -> dict:
+        entry = self.entry(key)
+        data, sections = self.documents.get(entry["path"], (b"", []))
+        return {
+            "topic": entry,
+            "sections": [title for _, title, _, _ in sections],
+            "document": data.decode("utf-8"),
+        }
+
+    def section_text(self, topic_path: str, heading: str) -> tuple[str, str] | None:
+        """(заголовок как в документе, текст раздела без заголовка) или None."""
+        data, sections = self.documents.get(topic_path, (b"", []))
+        wanted = heading.strip().casefold()
+        for _, title, start, end in sections:
+            if title.casefold() == wanted:
+                return title, data[start:end].decode("utf-8").partition("\n")[2].strip()
+        return None
+
+    def section(self, key: str, heading: str) -> dict:
+        entry = self.entry(key)
+        found = self.section_text(entry["path"], heading)
+        if found is None:
+            raise HTTPError(404, f"no section {heading!r} in {entry['path']}")
+        title, text = found
+        return {"topic": entry["path"], "heading": title, "text": text}
+
+    def quiz(self, quiz_type: str, difficulty: str | None, tags: list[str], rng: random.Random) -> bytes:
+        key = (quiz_type, difficulty, tuple(sorted(tags)))
+        pool = self.quiz_pools.get(key)
+        if pool is None:
+            pool = self.quiz_pools[key] = self._build_quiz_pool(quiz_type, difficulty, tags)
+            if len(self.quiz_pools) > self.max_quiz_pools:
+                self.quiz_pools.popitem(last=False)
+        if not pool:
+            raise HTTPError(404, "no quiz items match the filters")
+        return rng.choice(pool)
+
+    def _build_quiz_pool(self, quiz_type: str, difficulty: str | None, tags: list[str]) -> list[bytes]:
+        pool = []
+        for entry in self.catalog.query(tags, difficulty, quiz_type):
+            about = {"topic_title": entry.get("title", ""), "difficulty": entry.get("difficulty", "medium")}
+            if quiz_type in quiz_store.EXTRACTED_TYPES:
+                pool += [encode({**asdict(item), **about}) for item in self.quiz_items.items(entry["path"], quiz_type)]
+                continue
+            _, text = self.section_text(entry["path"], SELF_CHECK) or ("", "")
+            pool += [
+                encode({"topic": entry["path"], "quiz_type": quiz_type, "question": question, **about})
+                for question in list_items(text)
+            ]
+        return pool
+
+
+def render(
+    status: int,
+    body: bytes,
+    etag: str | None = None,
+    keep_alive: bool = True,
+    head_only: bool = False,
+) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+    if status != 304:
+        lines += ["Content-Type: application/json; charset=utf-8", f"Content-Length: {len(body)}"]
+    if etag:
+        lines += [f"ETag: {etag}", "Cache-Control: no-cache"]
+    else:
+        lines.append("Cache-Control: no-store")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head if head_only or status == 304 else head + body
+
+
+def error_body(message: str) -> bytes:
+    return encode({"error": message})
+
+
+class QueryServer:
+    """HTTP поверх asyncio-потоков: разбор запроса, маршруты, кэш ответов."""
+
+    def __init__(self, service: KnowledgeService, cache_size: int = 10_000) -> None:
+        self.service = service
+        self.cache = ResponseCache(cache_size)
+        self.rng = random.Random()
+        self.requests = 0
+        self.not_modified = 0
+        self.started_at = time.time()
+
+    def reload(self, topics: set[str] | None = None) -> None:
+        start = time.perf_counter()
+        self.service.load(topics)
+        self.cache.clear()
+        what = "База" if topics is None else f"Тем: {len(topics)},"
+        print(f"[OK] {what} перечитано за {(time.perf_counter() - start) * 1e3:.0f} мс", flush=True)
+
+    async def follow(self, feed: ChangeFeed, interval: float) -> None:
+        """Следить за лентой изменений scripts/watch.py.
+
+        Ошибка перечитывания (тема дописывается, битый JSON) не останавливает
+        слежение: записи ленты уже прочитаны, поэтому следующая попытка
+        перечитывает всю базу.
+        """
+        retry = False
+        while True:
+            await asyncio.sleep(interval)
+            records = feed.poll()
+            if not records and not retry:
+                continue
+            changed, removed, reset = merge(records)
+            try:
+                self.reload(None if reset or retry else changed | removed)
+            except Exception as e:
+                print(f"[!] Перечитать не удалось: {type(e).__name__}: {e}", flush=True)
+                retry = True
+            else:
+                retry = False
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    writer.write(render(431, error_body("request head too large"), keep_alive=False))
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                response, keep_alive = self.respond(head)
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, head: bytes) -> tuple[bytes, bool]:
+        """Ответ на запрос с заголовками head. Возвращает (байты ответа, держать ли соединение)."""
+        self.requests += 1
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            return render(400, error_body("malformed request line"), keep_alive=False), False
+
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        # Тело запроса не поддерживается, поэтому после него соединение не переиспользуется.
+        if method not in ("GET", "HEAD") or headers.get("content-length", "0") != "0":
+            return render(405, error_body("only GET and HEAD are supported"), keep_alive=False), False
+
+        try:
+            status, etag, body = self.dispatch(target)
+        except HTTPError as e:
+            status, etag, body = e.status, None, error_body(str(e))
+        except Exception as e:
+            print(f"[!] {method} {target}: {type(e).__name__}: {e}", flush=True)
+            status, etag, body = 500, None, error_body("internal error")
+        if etag and etag_matches(headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            status = 304
+        return render(status, body, etag, keep_alive, head_only=method == "HEAD"), keep_alive
+
+    def dispatch(self, target: str) -> tuple[int, str | None, bytes]:
+        """(статус, ETag или None, тело) для цели запроса."""
+        if target.partition("?")[0] in UNCACHED_ROUTES:
+            url = urlsplit(target)
+            return 200, None, self.uncached(url.path, parse_qs(url.query))
+
+        cached = self.cache.get(target)
+        if cached is not None:
+            etag, body = cached
+            return 200, etag, body
+
+        url = urlsplit(target)
+        path, query = unquote(url.path), parse_qs(url.query)
+        if path == "/topics":
+            result = self.service.topics(query.get("tag", []), first(query, "difficulty"), first(query, "quiz_type"))
+        elif path.startswith("/topics/"):
+            key, sep, heading = path.removeprefix("/topics/").partition("/sections/")
+            result = self.service.section(key, heading) if sep else self.service.topic(key)
+        else:
+            raise HTTPError(404, f"no route for {url.path}")
+        etag, body = self.cache.put(target, encode(result))
+        return 200, etag, body
+
+    def uncached(self, path: str, query: dict[str, list[str]]) -> bytes:
+        if path == "/quiz":
+            quiz_type = first(query, "quiz_type")
+            if quiz_type is None:
+                raise HTTPError(400, "quiz_type is required")
+            return self.service.quiz(quiz_type, first(query, "difficulty"), query.get("tag", []), self.rng)
+        return encode(self.stats())
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "cache": {"entries": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+            "topics": len(self.service.catalog),
+            "quiz_items": sum(len(items) for items in self.service.quiz_items.by_type.values()),
+            "loaded_at": self.service.loaded_at,
+            "uptime": time.time() - self.started_at,
+        }
+
+
+def first(query: dict[str, list[str]], name: str) -> str | None:
+    values = query.get(name)
+    return values[0] if values else None
+
+
+async def serve(host: str, port: int, unix: str | None, cache_size: int, follow: float) -> None:
+    # Лента открывается до загрузки: правка во время загрузки будет применена ещё раз, но не потеряется.
+    feed = ChangeFeed()
+    start = time.perf_counter()
+    server = QueryServer(KnowledgeService(), cache_size)
+    loaded_ms = (time.perf_counter() - start) * 1e3
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, server.reload)
+    except (AttributeError, NotImplementedError):
+        pass  # Windows: SIGHUP нет, перезапускайте процесс
+
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix, limit=MAX_HEAD_BYTES)
+        address = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=MAX_HEAD_BYTES, backlog=1024)
+        bound_host, bound_port = listener.sockets[0].getsockname()[:2]
+        address = f"http://{bound_host}:{bound_port}"
+
+    stats = server.stats()
+    print(
+        f"[OK] Слушаю {address} (тем: {stats['topics']}, заданий: {stats['quiz_items']}, "
+        f"загрузка {loaded_ms:.0f} мс)",
+        flush=True,
+    )
+    # Ссылку на задачу нужно держать: цикл событий хранит задачи только по слабым ссылкам.
+    follower = asyncio.create_task(server.follow(feed, follow)) if follow > 0 else None
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if follower is not None:
+            follower.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await follower
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP-сервер запросов к Knowledge Base для бота")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 — свободный порт")
+    parser.add_argument("--unix", metavar="PATH", help="Слушать Unix-сокет вместо TCP")
+    parser.add_argument("--cache-size", type=int, default=10_000, help="Ответов в LRU-кэше")
+    parser.add_argument("--follow", type=float, default=1.0, metavar="SECONDS",
+                        help="Период проверки ленты изменений (0 — не следить)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.cache_size, args.follow))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
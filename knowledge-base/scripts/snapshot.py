@@ -0,0 +1,180 @@
+"""
+Бинарный снимок всей базы знаний в одном файле для быстрого старта бота.
+
+    _meta/kb.snapshot
+
+Вместо чтения topics_index.json и обхода дерева python/ бот открывает
+один файл через mmap и отдаёт содержимое любой темы срезом memoryview —
+без копирования и без чтения остальных тем.
+
+Формат (все числа little-endian):
+
+    заголовок   "<8sIIQQQ": магия b"DKSNAP\\0\\0", версия, число тем,
+                смещение таблицы, смещение каталога, длина каталога
+    данные      тела meta.json, <slug>.md, <slug>.py всех тем подряд
+    таблица     на каждую тему три записи "<QI" (смещение, длина):
+                meta.json, .md, .py — в порядке тем в каталоге
+    каталог     JSON: список записей индекса тем (как в topics_index.json)
+
+Файла темы нет — запись таблицы (0, 0). Данные начинаются сразу после
+заголовка, поэтому смещение 0 означает только «файла нет»: пустой файл —
+запись (смещение, 0), и для него отдаётся пустой срез, а не None.
+
+Использование:
+    python scripts/snapshot.py build
+    python scripts/snapshot.py show python/basics/functions
+"""
+
+import argparse
+import json
+import mmap
+import struct
+from pathlib import Path
+
+from index_store import META_DIR, ROOT, IndexStore, atomic_write_bytes
+
+SNAPSHOT_PATH = META_DIR / "kb.snapshot"
+
+MAGIC = b"DKSNAP\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+SLOT = struct.Struct("<QI")
+
+# Порядок файлов темы в таблице.
+META, DOCUMENT, EXAMPLE = range(3)
+FILES_PER_TOPIC = 3
+
+
+def topic_files(root: Path, topic_path: str) -> list[Path]:
+    topic_dir = root / topic_path
+    name = topic_dir.name
+    return [topic_dir / "meta.json", topic_dir / f"{name}.md", topic_dir / f"{name}.py"]
+
+
+def build_snapshot(entries: list[dict], root: Path = ROOT, path: Path = SNAPSHOT_PATH) -> int:
+    """Собрать снимок. Возвращает размер файла в байтах."""
+    data = bytearray(HEADER.size)
+    slots: list[tuple[int, int]] = []
+    for entry in entries:
+        for file in topic_files(root, entry["path"]):
+            try:
+                body = file.read_bytes()
+            except FileNotFoundError:
+                slots.append((0, 0))
+                continue
+            slots.append((len(data), len(body)))
+            data += body
+
+    table_offset = len(data)
+    for offset, length in slots:
+        data += SLOT.pack(offset, length)
+
+    directory = json.dumps(entries, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    directory_offset = len(data)
+    data += directory
+
+    HEADER.pack_into(data, 0, MAGIC, VERSION, len(entries), table_offset, directory_offset, len(directory))
+    atomic_write_bytes(path, bytes(data))
+    return len(data)
+
+
+class KnowledgeSnapshot:
+    """Снимок, открытый через mmap. Закрывать через close() или with.
+
+    document() и example() возвращают срезы mmap: перед close() их нужно
+    освободить (memoryview.release() или просто отпустить ссылки).
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH) -> None:
+        with path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            self._check(path)
+        except BaseException:
+            self.close()
+            raise
+
+    def _check(self, path: Path) -> None:
+        """Разобрать заголовок и оглавление; битый снимок — ValueError."""
+        magic, version, count, self._table_offset, dir_offset, dir_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a knowledge base snapshot: {path}")
+        if version != VERSION:
+            raise ValueError(f"unsupported snapshot version {version}, expected {VERSION}")
+
+        with self._view[dir_offset:dir_offset + dir_length] as directory:
+            self.entries: list[dict] = json.loads(bytes(directory))
+        self._positions = {entry["path"]: i for i, entry in enumerate(self.entries)}
+        if len(self.entries) != count:
+            raise ValueError("snapshot directory does not match its header")
+
+    def __enter__(self) -> "KnowledgeSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __contains__(self, topic_path: str) -> bool:
+        return topic_path in self._positions
+
+    def _blob(self, topic_path: str, kind: int) -> memoryview | None:
+        i = self._positions[topic_path]
+        offset, length = SLOT.unpack_from(self._mmap, self._table_offset + (i * FILES_PER_TOPIC + kind) * SLOT.size)
+        if not offset:
+            return None
+        return self._view[offset:offset + length]
+
+    def entry(self, topic_path: str) -> dict:
+        return self.entries[self._positions[topic_path]]
+
+    def document(self, topic_path: str) -> memoryview | None:
+        """<slug>.md как срез mmap (UTF-8); None — файла нет. Декодируйте, только если нужен str."""
+        return self._blob(topic_path, DOCUMENT)
+
+    def example(self, topic_path: str) -> memoryview | None:
+        """<slug>.py как срез mmap (UTF-8)."""
+        return self._blob(topic_path, EXAMPLE)
+
+    def meta_blob(self, topic_path: str) -> memoryview | None:
+        """meta.json как срез mmap, без разбора JSON."""
+        return self._blob(topic_path, META)
+
+    def meta(self, topic_path: str) -> dict | None:
+        blob = self._blob(topic_path, META)
+        return None if blob is None else json.loads(bytes(blob))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бинарный снимок Knowledge Base")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Собрать _meta/kb.snapshot из индекса и файлов тем")
+    show = sub.add_parser("show", help="Показать документ темы из снимка")
+    show.add_argument("topic", help="Путь темы: python/basics/functions")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        entries = IndexStore().load()
+        size = build_snapshot(entries)
+        print(f"[OK] Снимок собран: {SNAPSHOT_PATH} ({len(entries)} тем, {size} байт)")
+        return
+
+    with KnowledgeSnapshot() as snapshot:
+        if args.topic not in snapshot:
+            print(f"[!] Темы нет в снимке: {args.topic}")
+            return
+        document = snapshot.document(args.topic)
+        if document is None:
+            print("[!] Нет документа")
+            return
+        text = bytes(document).decode("utf-8")
+        document.release()
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Проверка, что блоки «Пример N» в файлах <slug>.py действительно выполняются.
+
+Каждый блок (см. scripts/examples.py) запускается в отдельном процессе Python:
+
+    - процесс запускается с -I (без PYTHONPATH и пользовательского site);
+    - текущий каталог, HOME и TMPDIR — новый временный каталог, который
+      удаляется после запуска: примеры, пишущие файлы, не мусорят в базе;
+    - на POSIX ограничены процессорное время и память (RLIMIT_CPU, RLIMIT_AS),
+      плюс общий таймаут по часам.
+  Это изоляция от случайностей, а не песочница для недоверенного кода.
+
+Блоки, как и читатель, опираются на код выше: перед блоком выполняются
+импорты, определения функций и классов и присваивания из начала файла
+и из предыдущих блоков (кроме find_the_bug). Ошибки в этом контексте
+пропускаются — предыдущие блоки проверяются сами по себе.
+
+Ожидаемый результат:
+
+    find_the_bug   блок должен упасть; если в блоке есть
+                   «# Ожидаемая ошибка: SyntaxError», — именно с этим исключением
+    остальные      блок должен выполниться без исключения
+
+Функции блока при проверке не вызываются, но глобальные имена в их телах
+проверяются после выполнения блока: имя, которого нет ни в модуле, ни во
+встроенных, — это NameError при первом вызове, и блок считается упавшим.
+
+Пакет pdftools блокам доступен, как читателю с python/tools/pdf в PYTHONPATH.
+Нет стороннего модуля (pikepdf, ghostscript) — блок пропускается, а не падает.
+NameError пропуском считается, только если имя должен был определить
+неудавшийся импорт (или код, упавший из-за него).
+
+Результаты кэшируются в _meta/validate_cache.json по хэшу кода блока, его
+контекста, ожидания и версии Python: повторный запуск выполняет только
+изменившиеся блоки. Кэшируются только успешные блоки: пропуск зависит от
+установленных модулей, которых нет в ключе, — после pip install pikepdf
+пропущенный блок должен проверяться заново.
+
+Использование:
+    python scripts/validate_examples.py
+    python scripts/validate_examples.py --topic python/basics/list_comprehension --no-cache
+    python scripts/validate_examples.py --workers 16 --timeout 30 --report validate.json
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from examples import ExampleBlock, split_examples
+from index_store import META_DIR, ROOT, atomic_write_text
+from quiz_store import block_to_item
+from rebuild_index import find_topics
+
+CACHE_PATH = META_DIR / "validate_cache.json"
+CACHE_VERSION = 2
+
+MEMORY_LIMIT = 1 << 30  # 1 ГиБ адресного пространства на блок
+
+# Что из предыдущего кода переносится в контекст блока: определения, а не вызовы.
+CONTEXT_NODES = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                 ast.Assign, ast.AnnAssign)
+
+# Пакеты базы: имя → каталог. Читатель добавляет python/tools/pdf в PYTHONPATH,
+# а блок запускается с -I, где PYTHONPATH не действует, — поэтому RUNNER находит
+# эти пакеты сам. Только их: весь каталог в sys.path сделал бы тему ghostscript/
+# пакетом-пространством имён, и import ghostscript «удавался» бы без модуля.
+PACKAGES = {"pdftools": ROOT / "python" / "tools" / "pdf" / "pdftools"}
+
+
+EXCEPTION_RE = re.compile(r"\b([A-Z]\w*(?:Error|Exception|Exit|Interrupt|Warning))\b")
+
+# Выполняется в дочернем процессе. Задание приходит в stdin, результат пишется
+# в файл: stdout и stderr принадлежат самому примеру.
+RUNNER = r"""
+import ast, builtins, dis, importlib.util, json, os, sys, types
+
+def bound_names(chunk):
+    # Имена, которые фрагмент определил бы, если бы выполнился.
+    names = set()
+    for node in ast.parse(chunk).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update(alias.asname or alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.update(n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name))
+    return names
+
+def unresolved_globals(code, ns):
+    # Глобальные имена из тел функций и методов блока, которых нет ни в модуле,
+    # ни во встроенных: такая функция упадёт с NameError при первом вызове.
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            for ins in dis.get_instructions(const):
+                if ins.opname == "LOAD_GLOBAL" and ins.argval not in ns and not hasattr(builtins, ins.argval):
+                    yield ins.argval, const.co_name
+            yield from unresolved_globals(const, ns)
+
+class PackageFinder:
+    @staticmethod
+    def find_spec(name, path=None, target=None):
+        where = task["packages"].get(name)
+        if where is not None:
+            return importlib.util.spec_from_file_location(
+                name, os.path.join(where, "__init__.py"), submodule_search_locations=[where])
+
+task = json.load(sys.stdin)
+sys.meta_path.append(PackageFinder)
+ns = {"__name__": "__example__", "__file__": task["filename"]}
+unavailable = {}  # имя → модуль, из-за отсутствия которого имя не определено
+for line, chunk in task["context"]:
+    try:
+        exec(compile("\n" * (line - 1) + chunk, task["filename"], "exec"), ns)
+    except ModuleNotFoundError as e:
+        unavailable.update(dict.fromkeys(bound_names(chunk), e.name))
+    except NameError as e:
+        if e.name in unavailable:  # pdf = Pdf.new() после неудачного from pikepdf import Pdf
+            unavailable.update(dict.fromkeys(bound_names(chunk), unavailable[e.name]))
+    except BaseException:
+        pass
+result = {"error": None, "message": "", "missing_module": None}
+try:
+    code = compile("\n" * task["first_line"] + task["code"], task["filename"], "exec")
+    exec(code, ns)
+    for name, where in unresolved_globals(code, ns):
+        raise NameError(f"name {name!r} is not defined (в {where})", name=name)
+except BaseException as e:
+    result["error"] = type(e).__name__
+    result["message"] = str(e)[:500]
+    if isinstance(e, ModuleNotFoundError):
+        result["missing_module"] = e.name
+    elif isinstance(e, NameError):
+        result["missing_module"] = unavailable.get(e.name)
+with open(task["result_path"], "w", encoding="utf-8") as f:
+    json.dump(result, f)
+"""
+
+
+@dataclass
+class BlockTask:
+    topic: str
+    number: int
+    title: str
+    quiz_type: str | None
+    filename: str
+    first_line: int
+    code: str
+    context: list[tuple[int, str]]
+    expected_error: str | None   # имя исключения или "*" — любое
+
+    def key(self) -> str:
+        payload = json.dumps(
+            [CACHE_VERSION, sys.version_info[:2], self.context, self.code, self.expected_error],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class BlockResult:
+    topic: str
+    number: int
+    title: str
+    status: str          # "ok", "failed", "skipped"
+    detail: str = ""
+    seconds: float = 0.0
+    cached: bool = False
+
+
+def context_chunks(lines: list[str], first_line: int) -> list[tuple[int, str]]:
+    """
+    Определения верхнего уровня из фрагмента файла: (номер первой строки, код).
+    lines — строки фрагмента, first_line — номер его первой строки в файле.
+    Фрагмент с синтаксической ошибкой ничего не даёт.
+    """
+    text = "\n".join(lines)
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return []
+    chunks = []
+    for node in tree.body:
+        if not isinstance(node, CONTEXT_NODES):
+            continue
+        start = min([node.lineno, *(d.lineno for d in getattr(node, "decorator_list", []))])
+        chunks.append((first_line + start - 1, "\n".join(lines[start - 1:node.end_lineno])))
+    return chunks
+
+
+def expected_error(block: ExampleBlock, topic: str) -> str | None:
+    if block.quiz_type != "find_the_bug":
+        return None
+    match = EXCEPTION_RE.search(block_to_item(topic, block).expected)
+    return match.group(1) if match else "*"
+
+
+def tasks_for_file(topic: str, py_path: Path) -> list[BlockTask]:
+    text = py_path.read_text(encoding="utf-8")
+    blocks = split_examples(text)
+    all_lines = text.splitlines()
+    # Начало файла до первого блока — общий контекст (обычно импорты).
+    preamble_end = blocks[0].first_line - 1 if blocks else len(all_lines)
+    context = context_chunks(all_lines[:preamble_end], 1)
+
+    tasks = []
+    for block in blocks:
+        if block.has_code:
+            tasks.append(BlockTask(
+                topic=topic,
+                number=block.number,
+                title=block.title,
+                quiz_type=block.quiz_type,
+                filename=str(py_path),
+                first_line=block.first_line,
+                code="\n".join(block.lines),
+                context=list(context),
+                expected_error=expected_error(block, topic),
+            ))
+        if block.quiz_type != "find_the_bug":
+            context += context_chunks(block.lines, block.first_line + 1)
+    return tasks
+
+
+def _limit_resources(cpu_seconds: int) -> None:
+    import resource
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+
+
+def run_task(task: BlockTask, timeout: float) -> BlockResult:
+    """Выполнить блок в новом процессе во временном каталоге и сравнить с ожиданием."""
+    start = time.perf_counter()
+    result = BlockResult(task.topic, task.number, task.title, "ok")
+    with tempfile.TemporaryDirectory(prefix="dotknow-example-") as tmp:
+        result_path = os.path.join(tmp, ".result.json")
+        payload = json.dumps({**asdict(task), "result_path": result_path,
+                              "packages": {name: str(d) for name, d in PACKAGES.items()}})
+        env = {"PATH": os.environ.get("PATH", ""), "HOME": tmp, "TMPDIR": tmp, "PYTHONIOENCODING": "utf-8"}
+        try:
+            subprocess.run(
+                [sys.executable, "-I", "-c", RUNNER],
+                input=payload, cwd=tmp, env=env, timeout=timeout,
+                capture_output=True, text=True,
+                preexec_fn=(lambda: _limit_resources(int(timeout) + 1)) if os.name == "posix" else None,
+            )
+            with open(result_path, encoding="utf-8") as f:
+                outcome = json.load(f)
+        except subprocess.TimeoutExpired:
+            outcome = {"error": "Timeout", "message": f"дольше {timeout:g} с", "missing_module": None}
+        except FileNotFoundError:
+            # Процесс умер, не записав результат: лимит памяти или процессорного времени.
+            outcome = {"error": "Crash", "message": "процесс завершился без результата", "missing_module": None}
+    result.seconds = time.perf_counter() - start
+
+    error = outcome["error"]
+    module = outcome["missing_module"]
+    if module and module.split(".")[0] not in sys.stdlib_module_names:
+        result.status, result.detail = "skipped", f"нет модуля {module}"
+    elif task.expected_error is None:
+        if error:
+            result.status, result.detail = "failed", f"{error}: {outcome['message']}"
+    elif error is None:
+        result.status, result.detail = "failed", "ожидалась ошибка, но блок выполнился"
+    elif task.expected_error not in ("*", error):
+        result.status, result.detail = "failed", f"ожидалась {task.expected_error}, получена {error}"
+    else:
+        result.detail = f"{error}, как и ожидалось"
+    return result
+
+
+def load_cache(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data["results"] if data.get("version") == CACHE_VERSION else {}
+
+
+def validate(
+    topics: list[Path],
+    root: Path = ROOT,
+    workers: int | None = None,
+    timeout: float = 20.0,
+    cache_path: Path | None = CACHE_PATH,
+) -> list[BlockResult]:
+    tasks = []
+    for topic_dir in topics:
+        py_path = topic_dir / f"{topic_dir.name}.py"
+        if py_path.exists():
+            tasks += tasks_for_file(topic_dir.relative_to(root).as_posix(), py_path)
+
+    cache = load_cache(cache_path) if cache_path else {}
+    keys = [task.key() for task in tasks]
+    results: list[BlockResult | None] = [None] * len(tasks)
+    pending = []
+    for i, key in enumerate(keys):
+        if key in cache:
+            results[i] = BlockResult(**{**cache[key], "cached": True})
+        else:
+            pending.append(i)
+
+    # Потоки только ждут дочерние процессы — GIL здесь не мешает.
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for i, result in zip(pending, pool.map(lambda i: run_task(tasks[i], timeout), pending)):
+            results[i] = result
+
+    if cache_path:
+        # Проверенные темы записываются заново: результаты изменённых блоков не копятся.
+        # Остальные темы (запуск с --topic) остаются в кэше как были.
+        # Пропущенные блоки не кэшируются: модуль могут установить, а ключ этого не заметит.
+        checked = {task.topic for task in tasks}
+        merged = {key: entry for key, entry in cache.items() if entry["topic"] not in checked}
+        merged |= {key: asdict(result) | {"cached": False} for key, result in zip(keys, results)
+                   if result.status == "ok"}
+        atomic_write_text(cache_path, json.dumps({"version": CACHE_VERSION, "results": merged},
+                                                 ensure_ascii=False, indent=1))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Проверка блоков «Пример N» в файлах примеров")
+    parser.add_argument("--topic", action="append", help="Путь темы (можно несколько); по умолчанию все")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=20.0, help="Секунд на блок")
+    parser.add_argument("--no-cache", action="store_true", help="Выполнить все блоки заново")
+    parser.add_argument("--report", help="Записать результаты в JSON")
+    args = parser.parse_args()
+
+    topics = [ROOT / t for t in args.topic] if args.topic else find_topics(ROOT)
+    start = time.perf_counter()
+    results = validate(topics, workers=args.workers, timeout=args.timeout,
+                       cache_path=None if args.no_cache else CACHE_PATH)
+
+    marks = {"ok": "[OK]", "failed": "[!]", "skipped": "[~]"}
+    for r in results:
+        if r.status != "ok" or not r.cached:
+            print(f"{marks[r.status]:<4} {r.topic} — Пример {r.number}: {r.title}  {r.detail}")
+    counts = {status: sum(r.status == status for r in results) for status in marks}
+    cached = sum(r.cached for r in results)
+    print(f"[OK] Блоков: {len(results)} (из кэша {cached}), успешно {counts['ok']}, "
+          f"пропущено {counts['skipped']}, с ошибкой {counts['failed']} за {time.perf_counter() - start:.1f} с")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps([asdict(r) for r in results], ensure_ascii=False, indent=1),
+                                     encoding="utf-8")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
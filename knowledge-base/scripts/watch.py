@@ -0,0 +1,357 @@
+"""
+Слежение за файлами тем: индекс и кэши обновляются сразу после правки.
+
+Правка meta.json, <slug>.md или <slug>.py раньше была не видна боту, пока
+кто-нибудь не запустит rebuild_index.py и не перезапустит процессы. В режиме
+слежения скрипт:
+
+    1. получает события файловой системы — через inotify (Linux, ctypes),
+       а если он недоступен, опрашивает mtime файлов тем раз в --poll секунд;
+    2. копит события, пока не наступит пауза --debounce секунд: сохранение
+       в редакторе — это несколько событий, а не несколько пересборок;
+    3. обновляет только затронутые темы:
+           topics_index.json   строки put/delete в журнале (см. index_store.py)
+           rebuild_state.json  состояние этих тем (см. rebuild_index.py)
+           parse_cache.json, search_index.json, quiz_items.json
+                               (строки журналов .jsonl, файлы целиком не
+                               переписываются — см. JournaledJson)
+           kb.snapshot         только с --snapshot: он пересобирается целиком;
+    4. публикует запись в ленту изменений _meta/changes.jsonl (см. changes.py):
+       долгоживущие процессы перечитывают только изменившиеся темы.
+
+При старте скрипт догоняет правки, сделанные без него (по mtime, как
+rebuild_index.py), и публикует reset.
+
+Использование:
+    python scripts/watch.py                  # inotify, без него — опрос
+    python scripts/watch.py --poll 2         # только опрос, раз в 2 с
+    python scripts/watch.py --debounce 0.5
+    python scripts/watch.py --once           # догнать изменения и выйти
+    python scripts/watch.py --snapshot       # и пересобирать kb.snapshot
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+import quiz_store
+from changes import publish
+from index_store import ROOT, IndexStore, JournaledJson
+from parse_cache import CACHE_PATH, ParseCache
+from rebuild_index import SKIP_DIRS, STATE_PATH, STATE_VERSION, find_topics, sync_topic
+from search import INDEX_PATH, SearchIndex
+from snapshot import SNAPSHOT_PATH, build_snapshot
+
+# Константы из <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; за ним имя длиной len
+
+
+def watched_dirs(top: Path, root: Path = ROOT) -> list[Path]:
+    """Каталоги, за которыми следим: как в find_topics, без _meta, scripts и скрытых."""
+    dirs = []
+    for dirpath, dirnames, _ in os.walk(top):
+        dirnames[:] = [
+            d for d in dirnames
+            if not d.startswith((".", "_")) and not (dirpath == str(root) and d in SKIP_DIRS)
+        ]
+        dirs.append(Path(dirpath))
+    return dirs
+
+
+def topic_file_names(topic_dir: Path) -> tuple[str, ...]:
+    return "meta.json", f"{topic_dir.name}.md", f"{topic_dir.name}.py"
+
+
+class InotifyWatcher:
+    """inotify через ctypes: по дескриптору на каталог, новые каталоги добавляются на лету."""
+
+    def __init__(self, root: Path = ROOT) -> None:
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: dict[int, Path] = {}
+        self._add_tree(root)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    def _add_tree(self, top: Path) -> None:
+        for path in watched_dirs(top, self.root):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno == 28:  # ENOSPC: упёрлись в fs.inotify.max_user_watches
+                    raise OSError(errno, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue  # каталог успели удалить
+            self._paths[wd] = path
+
+    def _remove_tree(self, top: Path) -> None:
+        for wd, path in list(self._paths.items()):
+            if path == top or top in path.parents:
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._paths[wd]
+
+    def read(self, timeout: float | None) -> set[Path] | None:
+        """Изменённые пути за время ожидания; None — очередь переполнена, нужен полный обход."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = EVENT.unpack_from(data, pos)
+                name = data[pos + EVENT.size:pos + EVENT.size + length].rstrip(b"\0")
+                pos += EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self._paths.pop(wd, None)
+                    continue
+                parent = self._paths.get(wd)
+                if parent is None or not name:
+                    continue
+                path = parent / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Файлы могли появиться раньше, чем мы подписались на каталог.
+                        self._add_tree(path)
+                    elif mask & IN_MOVED_FROM:
+                        self._remove_tree(path)
+                changed.add(path)
+
+
+class PollingWatcher:
+    """Запасной вариант: раз в interval секунд stat() файлов всех тем."""
+
+    def __init__(self, root: Path = ROOT, interval: float = 1.0) -> None:
+        self.root = root
+        self.interval = interval
+        self._stamps = self._scan()
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stamps = {}
+        for topic_dir in find_topics(self.root):
+            for name in topic_file_names(topic_dir):
+                try:
+                    st = (topic_dir / name).stat()
+                except FileNotFoundError:
+                    continue
+                stamps[topic_dir / name] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def read(self, timeout: float | None) -> set[Path] | None:
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        stamps = self._scan()
+        changed = {p for p in stamps.keys() | self._stamps.keys() if stamps.get(p) != self._stamps.get(p)}
+        self._stamps = stamps
+        return changed
+
+
+class IndexUpdater:
+    """Применяет пачку изменений: индекс, rebuild_state и производные кэши.
+
+    Индекс, состояние тем, ParseCache, SearchIndex и задания загружаются один раз
+    и живут в памяти всё время слежения. Пачка обновляет и сохраняет только свои
+    темы — строками журналов (см. JournaledJson), поэтому правка стоит O(правки),
+    а не O(размера базы). kb.snapshot собирается только из всех тем сразу,
+    поэтому пересобирается лишь с snapshot=True.
+    """
+
+    def __init__(self, root: Path = ROOT, snapshot: bool = False) -> None:
+        self.root = root
+        # Все файлы — в _meta этого root, а не базы по умолчанию.
+        meta_dir = root / "_meta"
+        self.store = IndexStore(meta_dir)
+        self.entries = {e["path"]: e for e in self.store.load()}
+        self.state_store = JournaledJson(meta_dir / STATE_PATH.name, STATE_VERSION, "topics")
+        self.state: dict = self.state_store.load()
+        self.parse_cache = ParseCache(meta_dir / CACHE_PATH.name)
+        self.search = SearchIndex(root, meta_dir / INDEX_PATH.name)
+        self.quiz = quiz_store.QuizFiles(root, meta_dir / quiz_store.STORE_PATH.name)
+        self.snapshot_path = meta_dir / SNAPSHOT_PATH.name if snapshot else None
+
+    def known_topics(self) -> set[str]:
+        return self.state.keys() | self.entries.keys()
+
+    def affected_topics(self, paths: set[Path]) -> set[str]:
+        """Пути событий → темы. Файлы вне тем (.swp, ~) отбрасываются."""
+        topics = set()
+        known = None
+        for path in paths:
+            if path.name in topic_file_names(path.parent):
+                topics.add(path.parent.relative_to(self.root).as_posix())
+                continue
+            # Каталог: создан, удалён или переименован вместе со всеми темами внутри.
+            prefix = path.relative_to(self.root).as_posix()
+            known = self.known_topics() if known is None else known
+            topics |= {t for t in known if t == prefix or t.startswith(prefix + "/")}
+            if path.is_dir():
+                topics |= {t.relative_to(self.root).as_posix() for t in find_topics(path)}
+        return topics
+
+    def catch_up(self) -> tuple[list[str], list[str]]:
+        """Все темы: и те, что в индексе, и те, что есть на диске."""
+        on_disk = {t.relative_to(self.root).as_posix() for t in find_topics(self.root)}
+        return self.apply(on_disk | self.known_topics())
+
+    def apply(self, topics: set[str]) -> tuple[list[str], list[str]]:
+        """Обновить темы. Возвращает (изменённые, удалённые)."""
+        changed, removed, entries = [], [], []
+        for rel in sorted(topics):
+            topic_dir = self.root / rel
+            if not (topic_dir / "meta.json").exists():
+                known = rel in self.state or rel in self.entries
+                if self.state.pop(rel, None) is not None:
+                    self.state_store.delete(rel)
+                self.entries.pop(rel, None)
+                if known:
+                    removed.append(rel)
+                continue
+            cached = self.state.get(rel)
+            try:
+                topic_state, drift, reparsed = sync_topic(topic_dir, cached, full=False, root=self.root)
+            except (OSError, ValueError) as e:  # файл дописывается или битый JSON
+                print(f"[!] {rel}: {e}")
+                continue
+            for line in drift:
+                print(f"[~] {rel}: {line}")
+            if reparsed and (cached is None or cached.get("entry") != topic_state["entry"]):
+                entries.append(topic_state["entry"])
+                self.entries[rel] = topic_state["entry"]
+            if topic_state != cached:
+                self.state[rel] = topic_state
+                self.state_store.put(rel, topic_state)
+            changed.append(rel)
+
+        self.store.append_many(entries)
+        self.store.remove_many(removed)
+        self.state_store.save(self.state)
+        self._update_caches([self.root / rel for rel in changed + removed])
+        return changed, removed
+
+    def _update_caches(self, topic_dirs: list[Path]) -> None:
+        for topic_dir in topic_dirs:
+            try:
+                self.parse_cache.get(topic_dir / f"{topic_dir.name}.md")
+            except FileNotFoundError:
+                pass
+        self.parse_cache.save()
+
+        self.search.update(topic_dirs)
+        self.search.save()
+
+        self.quiz.update(topic_dirs)
+        self.quiz.save()
+
+        if self.snapshot_path is not None:
+            build_snapshot(list(self.entries.values()), self.root, self.snapshot_path)
+
+
+def collect(watcher, debounce: float, max_delay: float) -> set[Path] | None:
+    """Дождаться событий и копить их до паузы debounce (но не дольше max_delay)."""
+    paths = watcher.read(None)
+    if paths is None:
+        return None
+    first = time.monotonic()
+    while True:
+        left = max_delay - (time.monotonic() - first)
+        if left <= 0:
+            return paths
+        more = watcher.read(min(debounce, left))
+        if more is None:
+            return None
+        if not more:
+            return paths
+        paths |= more
+
+
+def report(changed: list[str], removed: list[str], elapsed: float) -> None:
+    for rel in changed:
+        print(f"[OK] {rel}")
+    for rel in removed:
+        print(f"[-] {rel}")
+    print(f"     обновлено за {elapsed * 1e3:.0f} мс", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Следить за темами и обновлять индекс и кэши")
+    parser.add_argument("--poll", type=float, metavar="SECONDS", help="Опрос вместо inotify")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Пауза в событиях перед обновлением, с")
+    parser.add_argument("--max-delay", type=float, default=5.0, help="Максимальная задержка обновления, с")
+    parser.add_argument("--once", action="store_true", help="Догнать изменения и выйти")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Пересобирать kb.snapshot после каждой пачки (O(размера базы))")
+    args = parser.parse_args()
+
+    updater = IndexUpdater(snapshot=args.snapshot)
+    start = time.perf_counter()
+    changed, removed = updater.catch_up()
+    publish({"reset": True})
+    print(f"[OK] Тем: {len(changed)}, удалено: {len(removed)}, {(time.perf_counter() - start) * 1e3:.0f} мс")
+    if args.once:
+        return
+
+    watcher = None
+    if args.poll is None:
+        try:
+            watcher = InotifyWatcher()
+            print("[OK] Слежу через inotify", flush=True)
+        except OSError as e:
+            print(f"[~] inotify недоступен ({e}), перехожу на опрос", flush=True)
+    if watcher is None:
+        watcher = PollingWatcher(interval=args.poll or 1.0)
+        print(f"[OK] Слежу опросом раз в {watcher.interval:g} с", flush=True)
+
+    try:
+        while True:
+            paths = collect(watcher, args.debounce, args.max_delay)
+            start = time.perf_counter()
+            if paths is None:
+                print("[~] Очередь событий переполнена — полный обход", flush=True)
+                changed, removed = updater.catch_up()
+                publish({"reset": True})
+            else:
+                topics = updater.affected_topics(paths)
+                if not topics:
+                    continue
+                changed, removed = updater.apply(topics)
+                publish({"changed": changed, "removed": removed})
+            report(changed, removed, time.perf_counter() - start)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()